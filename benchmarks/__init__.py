@@ -0,0 +1,6 @@
+"""
+    效能測試
+
+    以 datasets.make_decision_table 產生可調整大小、重複率與不一致程度的決策表，
+    在專案根目錄以 python -m benchmarks.<模組> 執行
+"""
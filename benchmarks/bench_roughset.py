@@ -0,0 +1,181 @@
+"""
+    約簡規則、近似集合與指標計算的效能測試
+
+    對每一組決策表參數(rows x features x cardinality x duplicate x inconsistency)執行各個測試項目，
+    每個項目重複 --repeat 次取最短時間，另外以 tracemalloc 執行一次記錄記憶體用量的峰值；
+    每個結果輸出為一行 JSON，可以在不同版本間比較隨資料量變化的曲線
+
+    測試項目:
+        create_reduct_rules: reduct.create_reduct_rules
+        lower_approximation, upper_approximation: relations.get_lower_approximation / get_upper_approximation(所有決策值)
+        evaluate_metrics: evaluate.evaluate_metrics 逐條計算(最多 --max-rules 條規則)
+        evaluate_rules: evaluate.evaluate_rules
+        roughset_evaluate_metrics: RoughSet.evaluate_metrics(不含產生規則的時間)
+
+    使用方式:
+        python -m benchmarks.bench_roughset --rows 1000,10000,100000 --features 6 --output results.jsonl
+        python -m benchmarks.bench_roughset --rows 5000 --duplicate 0,0.5 --inconsistency 0,0.1 --cases create_reduct_rules
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import roughset
+from roughset import RoughSet
+from roughset.evaluate import evaluate_metrics, evaluate_rules
+from roughset.reduct import create_reduct_rules
+from roughset.relations import get_lower_approximation, get_upper_approximation
+
+from .datasets import make_decision_table
+
+NAME_COL, DECISION_COL = "id", "y"
+
+
+def _setup_rules(df, feature_col):
+    return create_reduct_rules(df, NAME_COL, feature_col, DECISION_COL)
+
+
+def _case_create_reduct_rules(df, feature_col, args):
+    return None, lambda _: create_reduct_rules(df, NAME_COL, feature_col, DECISION_COL)
+
+
+def _case_lower_approximation(df, feature_col, args):
+    def run(_):
+        for value in pd.unique(df[DECISION_COL]):
+            get_lower_approximation(df, NAME_COL, feature_col, DECISION_COL, value)
+    return None, run
+
+
+def _case_upper_approximation(df, feature_col, args):
+    def run(_):
+        for value in pd.unique(df[DECISION_COL]):
+            get_upper_approximation(df, NAME_COL, feature_col, DECISION_COL, value)
+    return None, run
+
+
+def _case_evaluate_metrics(df, feature_col, args):
+    rules = _setup_rules(df, feature_col).head(args.max_rules)
+
+    def run(rules):
+        for _, rule in rules.iterrows():
+            evaluate_metrics(rule, df, NAME_COL, feature_col, DECISION_COL)
+    return rules, run
+
+
+def _case_evaluate_rules(df, feature_col, args):
+    rules = _setup_rules(df, feature_col)
+    return rules, lambda rules: evaluate_rules(rules, df, NAME_COL, feature_col, DECISION_COL)
+
+
+def _case_roughset_evaluate_metrics(df, feature_col, args):
+    def setup():
+        RS = RoughSet(df, name_col=NAME_COL, feature_col=feature_col, decision_col=DECISION_COL)
+        RS.create_reduct_rules()
+        return RS
+    # 每次都使用新的 RoughSet，避免量到已經計算好的分割
+    return setup, lambda RS: RS.evaluate_metrics()
+
+
+CASES = {
+    "create_reduct_rules": _case_create_reduct_rules,
+    "lower_approximation": _case_lower_approximation,
+    "upper_approximation": _case_upper_approximation,
+    "evaluate_metrics": _case_evaluate_metrics,
+    "evaluate_rules": _case_evaluate_rules,
+    "roughset_evaluate_metrics": _case_roughset_evaluate_metrics,
+}
+
+
+def measure(setup, run, repeat: int) -> dict:
+    """
+        執行 run(setup()) repeat 次記錄時間，再以 tracemalloc 執行一次記錄記憶體峰值
+
+        Parameters:
+            setup: 每次執行前呼叫取得 run 的參數(不計時)；若不是 callable，直接作為參數
+            run: 要測量的函式
+
+        Returns:
+            dict: seconds(最短時間), mean_seconds, peak_memory(bytes)
+    """
+    prepare = setup if callable(setup) else (lambda: setup)
+    times = []
+    for _ in range(repeat):
+        argument = prepare()
+        start = time.perf_counter()
+        run(argument)
+        times.append(time.perf_counter() - start)
+
+    argument = prepare()
+    tracemalloc.start()
+    try:
+        run(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "mean_seconds": float(np.mean(times)), "peak_memory": peak}
+
+
+def _parse_list(value: str, dtype):
+    return [dtype(item) for item in value.split(",") if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=str, default="1000,5000", help="物件數量，以逗號分隔多個值")
+    parser.add_argument("--features", type=str, default="5", help="特徵數量，以逗號分隔多個值")
+    parser.add_argument("--cardinality", type=str, default="4", help="每個特徵的值數量，以逗號分隔多個值")
+    parser.add_argument("--duplicate", type=str, default="0.2", help="重複率，以逗號分隔多個值")
+    parser.add_argument("--inconsistency", type=str, default="0.05", help="不一致比例，以逗號分隔多個值")
+    parser.add_argument("--missing", type=float, default=0.0, help="缺值比例")
+    parser.add_argument("--cases", type=str, default=",".join(CASES), help="要執行的測試項目，以逗號分隔")
+    parser.add_argument("--repeat", type=int, default=3, help="每個項目的重複次數")
+    parser.add_argument("--max-rules", type=int, default=200, help="evaluate_metrics 逐條計算的規則數量上限")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="結果附加到的 JSON Lines 檔案，預設輸出到 stdout")
+    args = parser.parse_args(argv)
+
+    cases = _parse_list(args.cases, str)
+    for case in cases:
+        assert case in CASES, f"未知的測試項目：{case}，可用的項目為 {list(CASES)}"
+
+    environment = {
+        "roughset": roughset.__version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+    output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    try:
+        grid = itertools.product(_parse_list(args.rows, int), _parse_list(args.features, int), _parse_list(args.cardinality, int),
+                                 _parse_list(args.duplicate, float), _parse_list(args.inconsistency, float))
+        for n_rows, n_features, cardinality, duplicate, inconsistency in grid:
+            params = {
+                "rows": n_rows,
+                "features": n_features,
+                "cardinality": cardinality,
+                "duplicate": duplicate,
+                "inconsistency": inconsistency,
+                "missing": args.missing,
+            }
+            df = make_decision_table(n_rows, n_features, cardinality, duplicate_rate=duplicate, inconsistency=inconsistency,
+                                     missing_rate=args.missing, seed=args.seed)
+            feature_col = [f"f{j}" for j in range(n_features)]
+            for case in cases:
+                setup, run = CASES[case](df, feature_col, args)
+                result = {"case": case, **params, **measure(setup, run, args.repeat), **environment}
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+
+def make_decision_table(n_rows: int, n_features: int, cardinality: int = 4, n_decisions: int = 3,
+                        duplicate_rate: float = 0.0, inconsistency: float = 0.0, missing_rate: float = 0.0,
+                        seed: int = 0) -> pd.DataFrame:
+    """
+        產生隨機的決策表
+
+        決策值由前兩個特徵決定(只有一個特徵時由該特徵決定)，因此沒有重複與雜訊時決策表是一致的
+
+        Parameters:
+            n_rows: int, 物件數量
+            n_features: int, 特徵數量，欄位名稱為 f0, f1, ...
+            cardinality: int, 每個特徵的值數量
+            n_decisions: int, 決策值數量
+            duplicate_rate: float, 特徵值複製自其他物件的比例(物件名稱不同)，用來產生較大的等價類別
+            inconsistency: float, 決策值被隨機改變的比例，與重複的物件一起產生不一致的等價類別
+            missing_rate: float, 特徵為缺值的比例
+            seed: int, 亂數種子
+
+        Returns:
+            pandas.DataFrame, 欄位為 id, f0, ..., y
+    """
+    rng = np.random.default_rng(seed)
+    features = rng.integers(0, cardinality, (n_rows, n_features))
+    decision = features[:, :2].sum(axis=1) % n_decisions
+
+    duplicated = np.flatnonzero(rng.random(n_rows) < duplicate_rate)
+    if len(duplicated):
+        sources = rng.integers(0, n_rows, len(duplicated))
+        features[duplicated] = features[sources]
+        decision[duplicated] = decision[sources]
+
+    noisy = rng.random(n_rows) < inconsistency
+    decision[noisy] = rng.integers(0, n_decisions, noisy.sum())
+
+    df = pd.DataFrame({"id": [f"o{i}" for i in range(n_rows)]})
+    for j in range(n_features):
+        column = features[:, j].astype(float) if missing_rate else features[:, j]
+        if missing_rate:
+            column[rng.random(n_rows) < missing_rate] = np.nan
+        df[f"f{j}"] = column
+    df["y"] = decision
+    return df
@@ -1,10 +1,10 @@
 import streamlit as st
 import pandas as pd
-from roughset.relations import get_equivalence_object, is_set_same, get_lower_approximation, get_upper_approximation
+from roughset import RoughSet
 
-def display_euqivalence_set(df, name_col, target_cols, title):
+def display_euqivalence_set(RS, target_cols, title):
     with st.expander(title):
-        eq = get_equivalence_object(df, name_col, target_cols)
+        eq = RS.equivalence_classes(target_cols)
         st.write("Condition attributes: `{" + ", ".join([str(x) for x in target_cols]) + "}`")
         value_text_list = []
         for k, v in eq.items():
@@ -28,6 +28,9 @@ if st.session_state["file"] is not None:
         name_col = st.selectbox("Object Name", list(df.columns), index=0, help="Select the column that contains the object names.\nDefault is the first column.")
         decision_col = st.selectbox("Decision", list(df.columns), index=len(df.columns)-1, help="Select the column that contains the dicision attribute.\nDefault is the last column.")
         feature_cols = st.multiselect("Features", list(df.columns), default=list(df.columns[1:-1]), help="Select the columns that contain the features.\nDefault is all columns except the first and last columns.")
+        
+        # 共用同一個 RoughSet 的分割快取，避免重複計算相同的等價類別
+        RS = RoughSet(df, name_col, feature_cols, decision_col)
 
     
 
@@ -38,23 +41,34 @@ if st.session_state["file"] is not None:
         st.write("**F**: `{"+ ", ".join([str(x) for x in feature_cols]) + "}`")
         
         target_cols = feature_cols + [decision_col]
-        eq_all_decision = display_euqivalence_set(df, name_col, target_cols, "##### Equivalence relations with all features and decision")
+        eq_all_decision = display_euqivalence_set(RS, target_cols, "##### Equivalence relations with all features and decision")
         st.write("---")
         
         
         target_cols = feature_cols
-        eq_all = display_euqivalence_set(df, name_col, target_cols, "##### Equivalence relations with all features")
+        eq_all = display_euqivalence_set(RS, target_cols, "##### Equivalence relations with all features")
         
+        # 移除後會改變 U|F 的特徵，即為不考慮決策屬性的區別函數的核
+        independent_cols = RS.core(feature_cols, relative=False)
+        # 一次計算移除每個特徵後的相依程度 γ(F-f, D)
+        degrees = RS.dependency_degrees([[c for c in feature_cols if c != col] for col in feature_cols])
+        degrees.insert(0, "removed feature", feature_cols)
+        st.write("---")
+        st.write(f"Dependency degree with all features: `{RS.dependency_degree(feature_cols):.4f}`")
+        st.dataframe(degrees[["removed feature", "n_classes", "positive", "dependency"]], use_container_width=True)
         for col in feature_cols:
             st.write("---")
             target_cols = [c for c in feature_cols if c != col]
-            eq_col = display_euqivalence_set(df, name_col, target_cols, f"##### Equivalence relations without `{col}`")
+            eq_col = display_euqivalence_set(RS, target_cols, f"##### Equivalence relations without `{col}`")
             
-            if is_set_same(list(eq_all.values()), list(eq_col.values())):
+            if col not in independent_cols:
                 st.write(f"`{col}` is a **dependent** feature.")
             else:
                 st.write(f"`{col}` is a **independent** feature.")
         
+        cache_info = RS.partitions.info()
+        st.caption(f"Partition cache: `{cache_info['hits']}` hits, `{cache_info['misses']}` misses")
+        
     with tab3:
         unique_decision = list(df[decision_col].unique())
         X_value = st.selectbox(f"Select decision value for $X$: `{decision_col}`=", unique_decision, index=0)
@@ -67,19 +81,19 @@ if st.session_state["file"] is not None:
         st.write("**F**: `{"+ ", ".join([str(x) for x in feature_cols]) + "}`")
         st.write("---")
 
-        lower_set = get_lower_approximation(df, name_col, feature_cols, decision_col, X_value) 
+        lower_set = RS.lower_approximation(feature_cols, X_value) 
         lower_set = set(sorted(list(lower_set)))
         print("Lower set:", lower_set)
         with st.expander(f"**Lower approximation set** \t(`{len(lower_set)}` objects)", expanded=True):
             st.code("{" + ", ".join([str(x) for x in lower_set]) + "}")
         
-        upper_set = get_upper_approximation(df, name_col, feature_cols, decision_col, X_value)
+        upper_set = RS.upper_approximation(feature_cols, X_value)
         upper_set = set(sorted(list(upper_set)))
         print("Upper set:", upper_set)
         with st.expander(f"**Upper approximation set** \t(`{len(upper_set)}` objects)", expanded=True):
             st.code("{" + ", ".join([str(x) for x in upper_set]) + "}")
         
-        boundary_set = upper_set - lower_set
+        boundary_set = RS.boundary_region(feature_cols, X_value)
         boundary_set = set(sorted(list(boundary_set)))
         print("Boundary set:", boundary_set)
         with st.expander(f"**Boundary set** \t(`{len(boundary_set)}` objects)", expanded=True):
@@ -1,7 +1,10 @@
+import json
+import time
+
 import pandas as pd
 import streamlit as st
-from roughset import RoughSet
-from roughset.evaluate import calculate_rules_ratio, evaluate_metrics, row2dict
+from roughset import CancelToken, Cancelled, RoughSet, profiling
+from roughset.evaluate import calculate_rules_ratio, evaluate_rules
 
 
 def rule_explain(rule: dict, name_col: str, feature_col: list[str], decision_col: str):
@@ -30,6 +33,27 @@ def convert_df(df):
         For the download button in streamlit.
     """
     return df.to_csv(index=False).encode('utf-8-sig')
+
+
+def progress_callback(bar, interval=0.1):
+    """
+        Update a streamlit progress bar with the processed rows(rules) per second and the ETA.
+        The bar is updated at most once per interval seconds.
+    """
+    start = time.perf_counter()
+    last_update = [0.0]
+    
+    def callback(stage, done, total):
+        now = time.perf_counter()
+        if now - last_update[0] < interval and done < total:
+            return
+        last_update[0] = now
+        elapsed = now - start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        unit = "rows" if stage == "reduct" else "rules"
+        bar.progress(min(done / total, 1.0) if total else 1.0, text=f"{stage}: {done:,}/{total:,} {unit} ({rate:,.0f} {unit}/s, ETA {eta:.1f}s)")
+    return callback
    
 
 st.header("Rule Inference")
@@ -37,6 +61,15 @@ st.header("Rule Inference")
 tab1, tab2, tab3 = st.tabs(["Upload data", "Reduct rules", "Select rules"])
 
 st.session_state["file"] = tab1.file_uploader("Data", type="csv")
+if "cancel_token" not in st.session_state:
+    st.session_state["cancel_token"] = CancelToken()
+cancel_token = st.session_state["cancel_token"]
+if cancel_token.cancelled:
+    # the cancel button interrupts the previous run; stop here until the data or settings change
+    cancel_token.reset()
+    st.warning("Rule inference was cancelled. Change the data or settings to run it again.")
+    st.stop()
+
 if st.session_state["file"] is not None:
     with tab1: 
         
@@ -46,13 +79,29 @@ if st.session_state["file"] is not None:
         name_col = st.selectbox("Object Name", list(df.columns), index=0, help="Select the column that contains the object names.\nDefault is the first column.")
         decision_col = st.selectbox("Decision", list(df.columns), index=len(df.columns)-1, help="Select the column that contains the dicision attribute.\nDefault is the last column.")
         feature_cols = st.multiselect("Features", list(df.columns), default=list(df.columns[1:-1]), help="Select the columns that contain the features.\nDefault is all columns except the first and last columns.")
+        discretize = st.selectbox("Discretize numeric features", [None, "mdlp", "consistency", "equal_frequency"], index=0,
+                                  help="Split the float features into intervals before the reduct.\nThe cuts can be downloaded and applied to the test data in Rule Application.")
+        col1, col2 = st.columns(2)
+        minimize = col1.checkbox("Minimize rules", value=False, help="Merge duplicate rules (the name column lists the merged objects) and remove rules subsumed by more general rules.")
+        cover = col2.checkbox("Greedy cover", value=False, disabled=not minimize, help="Only keep the rules greedily selected to cover every object the rules cover.")
 
    
     with tab2:
         rule_info_container = st.container()
         
-        RS = RoughSet(df, name_col, feature_cols, decision_col)
-        rules = RS.create_reduct_rules()
+        progress_container = st.container()
+        progress_container.button("Cancel", on_click=cancel_token.cancel, help="Abort the running rule inference.")
+        progress_bar = progress_container.progress(0.0, text="reduct")
+        profiler = profiling.profile()
+        try:
+            with profiler:
+                RS = RoughSet(df, name_col, feature_cols, decision_col, discretize=discretize)
+                rules = RS.create_reduct_rules(progress=progress_callback(progress_bar), cancel=cancel_token,
+                                               minimize=minimize, cover=minimize and cover)
+        except Cancelled:
+            st.warning("Rule inference was cancelled.")
+            st.stop()
+        progress_container.empty()
         rules_without_name = rules[feature_cols + [decision_col]]
         rules_without_name_dedup = rules_without_name.drop_duplicates() # drop duplicate rows
         
@@ -80,11 +129,19 @@ if st.session_state["file"] is not None:
         
         rules_with_metrics = rules_without_name_dedup.copy()
 
-        rules_with_metrics["__rules_dict"] = rules_with_metrics.apply(lambda x: row2dict(x, feature_cols + [decision_col]), axis=1)
-        rules_with_metrics["__metrics"] = rules_with_metrics["__rules_dict"].apply(lambda x: evaluate_metrics(x, df, name_col, feature_cols, decision_col))
-        rules_with_metrics["Support"] = rules_with_metrics["__metrics"].apply(lambda x: x["support"])
-        rules_with_metrics["Confidence"] = rules_with_metrics["__metrics"].apply(lambda x: x["confidence"])
-        rules_with_metrics["Lift"] = rules_with_metrics["__metrics"].apply(lambda x: x["lift"])
+        progress_bar = st.progress(0.0, text="metrics")
+        try:
+            with profiler:
+                metrics = evaluate_rules(rules_with_metrics, RS.df, name_col, feature_cols, decision_col,
+                                         progress=progress_callback(progress_bar), cancel=cancel_token)
+        except Cancelled:
+            st.warning("Rule evaluation was cancelled.")
+            st.stop()
+        progress_bar.empty()
+        # 分母為 0 的 confidence, lift 為 NaN(float64 欄位)，門檻篩選時不會通過
+        rules_with_metrics["Support"] = metrics["support"].to_numpy()
+        rules_with_metrics["Confidence"] = metrics["confidence"].to_numpy()
+        rules_with_metrics["Lift"] = metrics["lift"].to_numpy()
         
         st.write(f"#### Rules with Metrics(All `{len(rules_with_metrics)}` rules)")
         st.dataframe(rules_with_metrics[feature_cols + [decision_col, "Support", "Confidence", "Lift"]], use_container_width=True)
@@ -106,6 +163,12 @@ if st.session_state["file"] is not None:
         
         st.download_button("Download rules with metrics", convert_df(rules_filtered), file_name=file_name.replace(".csv", "_rules_with_metrics.csv"), mime="text/csv", use_container_width=True)
         st.download_button("Download rules without metrics", convert_df(rules_filtered[feature_cols + [decision_col]]), file_name=file_name.replace(".csv", "_rules.csv"), mime="text/csv", use_container_width=True)
+        if RS.discretizer is not None:
+            st.download_button("Download discretization cuts", json.dumps(RS.discretizer.to_dict()), file_name=file_name.replace(".csv", "_cuts.json"), mime="application/json", use_container_width=True)
+        
+        with st.expander("Profiling"):
+            st.dataframe(profiler.to_frame(), use_container_width=True)
+            st.write(profiler.counters)
 
         
 else:
@@ -1,6 +1,9 @@
+import json
+
 import streamlit as st
 import pandas as pd
-from roughset.evaluate import calculate_rules_ratio, evaluate_metrics, row2dict
+from roughset.discretize import Discretizer
+from roughset.evaluate import calculate_rules_ratio, evaluate_rules
 
 @st.cache_data
 def convert_df(df):
@@ -32,6 +35,9 @@ if file_rule:
 file_data = tab1.file_uploader("Data", type="csv")
 if file_data:
     df_data = pd.read_csv(file_data)
+    file_cuts = tab1.file_uploader("Discretization cuts (optional)", type="json", help="The cuts downloaded from Rule Inference, applied to the numeric features of the data.")
+    if file_cuts:
+        df_data = Discretizer.from_dict(json.load(file_cuts)).transform(df_data)
     tab1.dataframe(df_data, use_container_width=True)
     
     
@@ -49,11 +55,11 @@ if file_rule and file_data:
         rules_with_metrics = df_rule.copy()
         
         
-        rules_with_metrics["__rules_dict"] = rules_with_metrics.apply(lambda x: row2dict(x, feature_cols + [decision_col]), axis=1)
-        rules_with_metrics["__metrics"] = rules_with_metrics["__rules_dict"].apply(lambda x: evaluate_metrics(x, df_data, name_col, feature_cols, decision_col))
-        rules_with_metrics["Support"] = rules_with_metrics["__metrics"].apply(lambda x: x["support"])
-        rules_with_metrics["Confidence"] = rules_with_metrics["__metrics"].apply(lambda x: x["confidence"])
-        rules_with_metrics["Lift"] = rules_with_metrics["__metrics"].apply(lambda x: x["lift"])
+        metrics = evaluate_rules(rules_with_metrics, df_data, name_col, feature_cols, decision_col)
+        # 分母為 0 的 confidence, lift 為 NaN(float64 欄位)，門檻篩選時不會通過
+        rules_with_metrics["Support"] = metrics["support"].to_numpy()
+        rules_with_metrics["Confidence"] = metrics["confidence"].to_numpy()
+        rules_with_metrics["Lift"] = metrics["lift"].to_numpy()
         
         st.write(f"#### Rules with Metrics(All `{len(rules_with_metrics)}` rules)")
         st.dataframe(rules_with_metrics[feature_cols + [decision_col, "Support", "Confidence", "Lift"]], use_container_width=True)
@@ -1,3 +1,6 @@
 __version__ = "0.3.0"
 
 from .__main__ import RoughSet # noqa
+from .rules import RuleSet # noqa
+from .classifier import RuleClassifier # noqa
+from .progress import CancelToken, Cancelled # noqa
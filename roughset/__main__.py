@@ -1,20 +1,129 @@
-from .reduct import create_reduct_rules
+from .reduct import create_reduct_rules_from_table
 import warnings
+import numpy as np
 import pandas as pd
+from .encoding import EncodedTable, encode_table, encode_csv
+from .contingency import Contingency
+from .partition import PartitionCache, approximation_sets, class_regions, region_counts
+from .objectset import ObjectSet
+from .neighbourhood import neighbour_counts, neighbours
+from .storage import save_table, load_table
+from .discretize import Discretizer
+from .profiling import profiled
+from .progress import ProgressReporter, release_on_cancel
+from .discernibility import discernibility_function
+from .parallel import resolve_n_jobs, subset_statistics
 
 class RoughSet:
     def __init__(self, 
                  data: pd.DataFrame, 
                  name_col: str = None, 
                  feature_col: list[str] = None, 
-                 decision_col: list[str] = None
+                 decision_col: list[str] = None,
+                 cache_size: int = 128,
+                 discretize=None
                  ):
-        self.df = data
-        self.name_column = name_col or data.columns[0]  # Simplified if/else syntax
-        self.feature_col = feature_col or list(data.columns[1:-1])
-        self.decision_col = decision_col or data.columns[-1]
+        """
+            Parameters:
+                data: pandas.DataFrame or EncodedTable
+                    決策表；若為 EncodedTable(例如 from_csv 分批讀取的結果)，則不會保留原始的 DataFrame(self.df 為 None)
+                name_col: str, 物件名稱欄位, 預設為第一欄
+                feature_col: list[str], 特徵欄位, 預設為第一欄與最後一欄以外的欄位
+                decision_col: str, 決策欄位, 預設為最後一欄
+                cache_size: int, 分割快取最多保留的數量
+                discretize: str or Discretizer, 將數值特徵離散化成區間後再建立決策表(只適用於 DataFrame)
+                    - str: Discretizer 的 method("equal_frequency", "mdlp", "consistency")，以 data 選擇切點
+                    - Discretizer: 已 fit 的直接套用，否則以 data 選擇切點
+                    - None: 不離散化
+                    self.df 為離散化後的資料，self.discretizer 可以用來轉換測試資料
+        """
+        self.discretizer = None
+        if isinstance(data, EncodedTable):
+            self.df = None
+            self.table = data
+            columns = data.columns
+        else:
+            self.df = data
+            columns = list(data.columns)
+        self.name_column = name_col or columns[0]  # Simplified if/else syntax
+        self.feature_col = feature_col or list(columns[1:-1])
+        self.decision_col = decision_col or columns[-1]
+        if discretize is not None:
+            assert self.df is not None, "discretize 只適用於 DataFrame"
+            self.discretizer = discretize if isinstance(discretize, Discretizer) else Discretizer(discretize)
+            if self.discretizer.cuts is None:
+                self.discretizer.fit(self.df, self.feature_col, self.decision_col)
+            self.df = self.discretizer.transform(self.df)
         self.check_roughset_prerequisites()
         
+        # 整數編碼的決策表與分割快取，供規則、近似集合與指標計算共用
+        if self.df is not None:
+            self.table = encode_table(self.df, [self.name_column] + self.feature_col + [self.decision_col])
+        self.partitions = PartitionCache(self.table, maxsize=cache_size)
+    
+    @classmethod
+    def from_csv(cls, path, name_col: str = None, feature_col: list[str] = None, decision_col: str = None,
+                 chunksize: int = 100_000, cache_size: int = 128, **kwargs) -> "RoughSet":
+        """
+            分批讀取 CSV 建立 RoughSet，只保留用到欄位的整數編碼，不會把整個檔案讀成 DataFrame
+            
+            Parameters:
+                path: str or file-like, CSV 檔案
+                name_col, feature_col, decision_col: 同 RoughSet, 預設值由 CSV 的標題列決定
+                chunksize: int, 每批讀取的列數
+                cache_size: int, 分割快取最多保留的數量
+                **kwargs: 傳給 pandas.read_csv 的其他參數
+                
+            Returns:
+                RoughSet, self.df 為 None
+        """
+        if name_col is None or feature_col is None or decision_col is None:
+            columns = list(pd.read_csv(path, nrows=0, **kwargs).columns)
+            if hasattr(path, "seek"):
+                path.seek(0)
+            name_col = name_col or columns[0]
+            feature_col = feature_col or columns[1:-1]
+            decision_col = decision_col or columns[-1]
+        table = encode_csv(path, [name_col] + list(feature_col) + [decision_col], chunksize=chunksize, **kwargs)
+        return cls(table, name_col, feature_col, decision_col, cache_size=cache_size)
+    
+    def save(self, path: str, partitions: bool = True):
+        """
+            將整數編碼的決策表(每個欄位的編碼與值字典)與快取的分割存成 .npy 檔案的資料夾，參考 storage.save_table
+            
+            Parameters:
+                path: str, 資料夾路徑
+                partitions: bool, 是否一併保存快取中的分割
+        """
+        save_table(path, self.table, list(self.partitions._store.values()) if partitions else [], meta={
+            "name_col": self.name_column,
+            "feature_col": self.feature_col,
+            "decision_col": self.decision_col,
+            "cache_size": self.partitions.maxsize,
+            "discretizer": self.discretizer.to_dict() if self.discretizer is not None else None,
+        })
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "RoughSet":
+        """
+            讀取 save 保存的資料夾
+            
+            Parameters:
+                path: str, 資料夾路徑
+                mmap: bool, 是否以唯讀的 memory map 開啟編碼與分割，開啟大型資料表時幾乎不需要讀取時間，
+                    且多個行程開啟同一個資料夾時共用作業系統的頁面快取
+                    
+            Returns:
+                RoughSet, self.df 為 None，保存時的分割會放回分割快取
+        """
+        table, partitions, meta = load_table(path, mmap=mmap)
+        rs = cls(table, meta["name_col"], meta["feature_col"], meta["decision_col"], cache_size=meta["cache_size"])
+        if meta.get("discretizer") is not None:
+            rs.discretizer = Discretizer.from_dict(meta["discretizer"])
+        for partition in partitions:
+            rs.partitions.add(partition)
+        return rs
+        
     def check_roughset_prerequisites(self):
         """
             檢查物件是否符合RoughSet的前提
@@ -26,22 +135,41 @@ class RoughSet:
             
             return: None
         """
-        columns = self.df.columns
+        columns = self.df.columns if self.df is not None else self.table.columns
         name_col = self.name_column
         feature_col = self.feature_col
         decision_col = self.decision_col
         
         assert name_col in columns, f'物件名稱欄位不存在：{name_col} not in {columns}'
-        assert len(self.df[name_col].unique()) == len(self.df[name_col]), f'物件欄位名稱重複：{name_col} has duplicate values'
+        assert self._n_unique(name_col) == len(self), f'物件欄位名稱重複：{name_col} has duplicate values'
         assert all([col in columns for col in feature_col]), f'{feature_col} not in {columns}'
         assert decision_col in columns, f'決策屬性欄位不存在：{decision_col} not in {columns}'
 
-    
+    def __len__(self) -> int:
+        return len(self.df) if self.df is not None else len(self.table)
+
+    def _n_unique(self, col: str) -> int:
+        # 不同值的數量，缺值視為一個值(與 pandas.Series.unique 相同)
+        if self.df is not None:
+            return len(self.df[col].unique())
+        codes = self.table.codes[col]
+        used = np.bincount(codes[codes >= 0], minlength=self.table.cardinality(col)) > 0 # 移除物件後值字典可能有沒用到的值
+        return int(used.sum()) + int((codes < 0).any())
+
+    def _row(self, index) -> dict:
+        if self.df is not None:
+            return self.df.loc[self.df[self.name_column] == index].squeeze().to_dict()
+        code = self.table.categories[self.name_column].get_indexer([index])[0]
+        if code < 0:
+            return {}
+        row = np.flatnonzero(self.table.codes[self.name_column] == code)[:1]
+        return {col: self.table.decode(col, row)[0] for col in self.table.columns}
+
     def __getitem__(self, index):
         # 將列中的目標物件以字典形式擷取出來，如果條件不符，則拋出異常
-        row = self.df.loc[self.df[self.name_column] == index].squeeze().to_dict()
+        row = self._row(index)
         if not row:
-            raise KeyError(f'物件不存在：{index} not in {self.df[self.name_column]}')
+            raise KeyError(f'物件不存在：{index} not in {self.name_column}')
 
         # 將目標物件轉換成較易讀取的格式
         text = f"物件：{row[self.name_column]}\n{'-'*20}\n"
@@ -52,7 +180,10 @@ class RoughSet:
         
         return row
 
-    def create_reduct_rules(self, include_empty=False) -> pd.DataFrame:
+    @profiled("RoughSet.create_reduct_rules")
+    @release_on_cancel
+    def create_reduct_rules(self, include_empty=False, minimal=False, compress=False, as_ruleset=False, n_jobs=None,
+                            progress=None, cancel=None, minimize=False, cover=False):
         """
             呼叫 reduct.create_reduct_rules 產生規則
             
@@ -61,22 +192,65 @@ class RoughSet:
                     是否包含空規則
                     - True: 包含空規則
                     - False: 不包含空規則
+                minimal: bool, default False
+                    是否只保留最小的規則
+                    - True: 跳過已有一致子組合的特徵組合，跳過的數量記錄在 reduct_rules.attrs
+                    - False: 保留所有一致的特徵組合
+                compress: bool, default False
+                    是否將相同(特徵, 決策)向量的物件合併成一列規則
+                    - True: 物件名稱欄位為 list，並加入 count 欄位
+                    - False: 每個物件各自一列規則
+                as_ruleset: bool, default False
+                    是否回傳以整數編碼儲存的 RuleSet
+                    - True: 回傳 RuleSet，DataFrame 會在需要時(例如 evaluate_metrics)才建立
+                    - False: 回傳 pandas.DataFrame
+                n_jobs: int, default None
+                    以多少個行程產生規則(決策表放在共享記憶體中)，-1 代表使用所有 CPU，結果與單一行程相同
+                progress: callable, default None
+                    每個特徵組合完成後呼叫 progress("reduct", 已掃描的列數, 總列數)
+                cancel: progress.CancelToken, default None
+                    被取消時拋出 progress.Cancelled，原本的規則保持不變
+                minimize: bool, default False
+                    是否以 RuleSet.minimize 縮減規則(合併相同的規則、移除被更一般的規則涵蓋的規則)
+                    - True: 物件名稱欄位為 list，並加入 count 欄位
+                    - False: 不縮減
+                cover: bool, default False
+                    minimize 時是否只保留 greedy set cover 選擇的規則
                     
             Returns:
-                reduct_rules: pandas.DataFrame, 規則
+                reduct_rules: pandas.DataFrame or RuleSet, 規則
                 
         """
-        self.reduct_rules = create_reduct_rules(
-            df=self.df,
+        rule_set = create_reduct_rules_from_table(
+            table=self.table,
             name_col=self.name_column,
             feature_col=self.feature_col,
             decision_col=self.decision_col,
-            include_empty=include_empty
+            include_empty=include_empty,
+            partitions=self.partitions,
+            minimal=minimal,
+            compress=compress,
+            as_ruleset=True,
+            n_jobs=n_jobs,
+            progress=progress,
+            cancel=cancel
         )
+        if minimize:
+            rule_set = rule_set.minimize(self.partitions, cover=cover)
+        self.rule_set = rule_set
+        self._rule_options = dict(include_empty=include_empty, minimal=minimal, compress=compress, n_jobs=n_jobs,
+                                  minimize=minimize, cover=cover)
+        if as_ruleset:
+            if hasattr(self, 'reduct_rules'):
+                del self.reduct_rules # 舊的規則已不適用
+            return self.rule_set
+        self.reduct_rules = self.rule_set.to_frame()
         return self.reduct_rules
     
     
-    def evaluate_metrics(self, support=True, confidence=True, lift=True) -> pd.DataFrame:
+    @profiled("RoughSet.evaluate_metrics")
+    @release_on_cancel
+    def evaluate_metrics(self, support=True, confidence=True, lift=True, progress=None, cancel=None) -> pd.DataFrame:
         """
             計算 support, confidence, lift
             
@@ -87,21 +261,27 @@ class RoughSet:
                     是否計算 confidence
                 lift: bool, default True
                     是否計算 lift
+                progress: callable, default None
+                    每一組規則完成後呼叫 progress("metrics", 已完成的規則數, 總規則數)
+                cancel: progress.CancelToken, default None
+                    被取消時拋出 progress.Cancelled，規則不會加入任何指標
                     
             Returns:
                 reduct_rules: pandas.DataFrame, 包含 support, confidence, lift 的規則
         """ 
         # 先檢查是否有產生規則
-        assert hasattr(self, 'reduct_rules'), '請先產生規則'
-        # 分別建立X(特徵屬性), Y(決策屬性), XY(特徵+決策)的集合
-        X = self.reduct_rules.apply(lambda row: self.row2dict(row, method="X"), axis=1)
-        Y = self.reduct_rules.apply(lambda row: self.row2dict(row, method="Y"), axis=1)
-        XY = self.reduct_rules.apply(lambda row: self.row2dict(row, method="XY"), axis=1)
-        
-        # 計算support, confidence, lift
-        x_score = X.apply(lambda x: self.calculate_precent(x))
-        y_score = Y.apply(lambda y: self.calculate_precent(y))
-        xy_score = XY.apply(lambda xy: self.calculate_precent(xy))
+        assert hasattr(self, 'rule_set'), '請先產生規則'
+        if not hasattr(self, 'reduct_rules'):
+            self.reduct_rules = self.rule_set.to_frame()
+        # 以整數編碼的分割計算X(特徵屬性), Y(決策屬性), XY(特徵+決策)符合的物件數量，只計算需要的部分
+        n = len(self.table)
+        reporter = ProgressReporter(progress, cancel, "metrics", len(self.rule_set) * ((support or confidence or lift) + (confidence or lift) + lift))
+        if support or confidence or lift:
+            x_score = self.rule_set.match_counts(self.partitions, features=True, reporter=reporter) / n
+        if confidence or lift:
+            xy_score = self.rule_set.match_counts(self.partitions, features=True, decision=True, reporter=reporter) / n
+        if lift:
+            y_score = self.rule_set.match_counts(self.partitions, features=False, decision=True, reporter=reporter) / n
         
         # 先檢查support, confidence, lift不在df的columns中，若存在則發起Warning
         if support and "support" in self.reduct_rules.columns:
@@ -112,14 +292,20 @@ class RoughSet:
             warnings.warn("lift already in df's columns", UserWarning)
         
         # 將結果合併到規則中
-        if support:
-            self.reduct_rules["support"] = x_score
-        if confidence:
-            self.reduct_rules["confidence"] = xy_score / x_score
-        if lift:
-            self.reduct_rules["lift"] = xy_score / x_score / y_score
-            
+        self._assign_metrics(x_score if support or confidence or lift else None,
+                             xy_score if confidence or lift else None,
+                             y_score if lift else None, support, confidence, lift)
         return self.reduct_rules
+    
+    def _assign_metrics(self, x_score, xy_score, y_score, support, confidence, lift):
+        # 分母為 0 的 confidence, lift 為 NaN
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if support:
+                self.reduct_rules["support"] = x_score
+            if confidence:
+                self.reduct_rules["confidence"] = xy_score / x_score
+            if lift:
+                self.reduct_rules["lift"] = xy_score / x_score / y_score
         
         
     
@@ -127,6 +313,14 @@ class RoughSet:
         """
             計算給定的規則條件佔所有資料的比例
         """
+        if self.df is None:
+            matched = np.ones(len(self.table), dtype=bool)
+            for col, value in target_dict.items():
+                if value is None:
+                    continue
+                code = self.table.categories[col].get_indexer([value])[0]
+                matched &= (self.table.codes[col] == code) & (code >= 0)
+            return matched.sum() / len(self.table)
         tmp_df = self.df
         for col in target_dict.keys():
             if target_dict[col] == None:
@@ -162,25 +356,509 @@ class RoughSet:
             raise ValueError("method must be X, Y or XY")
         
 
-    def positive_region(self, condition):
-        # calculate positive region of a condition
-        pass
+    def add_objects(self, df_new: pd.DataFrame):
+        """
+            加入新的物件，並更新快取的分割、決策值數量，以及已產生的規則與指標
+            
+            既有物件的類別不會重新分組，只查詢新物件所屬的類別並更新該類別的數量；
+            已產生的規則會以更新後的分割重新產生，指標則由各分割的 decision_counts 查表取得
+            EncodedTable.append 與分割的 labels 仍以串接陣列加入新物件，每次加入是 O(n)，大量加入時請合併成一次呼叫
+            
+            Parameters:
+                df_new: pandas.DataFrame, 新的物件，需要包含名稱、特徵與決策欄位，名稱不可與既有物件重複
+                    有 self.discretizer 時以相同的切點轉換數值特徵
+        """
+        if self.discretizer is not None:
+            df_new = self.discretizer.transform(df_new)
+        for col in [self.name_column] + self.feature_col + [self.decision_col]:
+            assert col in df_new.columns, f'{col} not in {df_new.columns}'
+        names = df_new[self.name_column]
+        assert len(names.unique()) == len(names), f'物件欄位名稱重複：{self.name_column} has duplicate values'
+        existing = self.table.categories[self.name_column].get_indexer(names)
+        assert not np.isin(existing[existing >= 0], self.table.codes[self.name_column]).any(), \
+            f'物件已存在：{self.name_column} has duplicate values'
+        
+        start = self.table.append(df_new)
+        self.partitions.extend(start, self.table.codes[self.decision_col], self.table.cardinality(self.decision_col))
+        if self.df is not None:
+            self.df = pd.concat([self.df, df_new[self.df.columns.intersection(df_new.columns)]], ignore_index=True)
+        self._refresh_rules()
+        
+    def remove_objects(self, names: list):
+        """
+            移除物件，並更新快取的分割、決策值數量，以及已產生的規則與指標
+            
+            只有被移除物件所屬類別的 decision_counts 會被扣除，但 EncodedTable.keep 需要複製每個欄位，
+            分割的 labels 也需要複製並在下次使用類別索引時重新編號，因此每次移除仍是 O(n)；
+            大量移除時請合併成一次呼叫
+            
+            Parameters:
+                names: list, 要移除的物件名稱
+        """
+        codes = self.table.categories[self.name_column].get_indexer(pd.Index(list(names), dtype=object))
+        assert (codes >= 0).all(), f'物件不存在：{[name for name, code in zip(names, codes) if code < 0]}'
+        mask = np.isin(self.table.codes[self.name_column], codes)
+        
+        self.partitions.remove(mask, self.table.codes[self.decision_col], self.table.cardinality(self.decision_col))
+        self.table.keep(~mask)
+        if self.df is not None:
+            self.df = self.df[~mask].reset_index(drop=True)
+        self._refresh_rules()
+        
+    def _refresh_rules(self):
+        # 以更新後的分割重新產生規則；原本有的指標由分割逐類別維護的 decision_counts 查表取得，
+        # 不再重新計算每條規則符合的物件數量
+        if not hasattr(self, 'rule_set'):
+            return
+        metrics = [col for col in ["support", "confidence", "lift"] if col in getattr(self, 'reduct_rules', pd.DataFrame()).columns]
+        as_ruleset = not hasattr(self, 'reduct_rules')
+        self.create_reduct_rules(**self._rule_options, as_ruleset=as_ruleset)
+        if metrics:
+            n = len(self.table)
+            x, xy, y = self.rule_set.decision_match_counts(self.partitions)
+            self._assign_metrics(x / n, xy / n, y / n, *[metric in metrics for metric in ["support", "confidence", "lift"]])
+    
+    def partition(self, attrs: list[str]):
+        """
+            從分割快取取得 attrs 的分割
+            
+            Parameters:
+                attrs: list[str], 屬性
+                
+            Returns:
+                Partition
+        """
+        return self.partitions.get(attrs)
     
-    def negative_region(self, condition):
-        # calculate negative region of a condition
-        pass
+    def names(self, rows) -> set:
+        """
+            將列位置轉換成物件名稱的集合
+        """
+        return set(self.table.decode(self.name_column, rows))
     
-    def boundary_region(self, condition):
-        # calculate boundary region of a condition
-        pass
+    def equivalence_classes(self, attrs: list[str]) -> dict:
+        """
+            取得 attrs 相等的物件，與 relations.get_equivalence_object 的結果相同，但使用分割快取
+            
+            Returns:
+                dict, key是attrs相等的值(單一屬性時為值本身), values是物件名稱的set
+        """
+        partition = self.partition(attrs)
+        equivalence = []
+        for rows in partition.classes():
+            key = tuple(self.table.decode(col, rows[:1])[0] for col in attrs)
+            equivalence.append((key[0] if len(attrs) == 1 else key, self.names(rows)))
+        try:
+            equivalence.sort(key=lambda item: item[0])
+        except TypeError:
+            pass
+        return dict(equivalence)
+    
+    def _decision_code(self, decision_value) -> int:
+        code = self.table.categories[self.decision_col].get_indexer([decision_value])[0]
+        assert code >= 0, f"Decision value [{decision_value}] not in {self.decision_col}!"
+        return code
+    
+    def _decision_counts(self, attrs: list[str]):
+        partition = self.partition(attrs)
+        return partition, partition.decision_counts(self.table.codes[self.decision_col], self.table.cardinality(self.decision_col))
+    
+    def _approximation_sets(self, attrs: list[str], decision_value=None, beta: float = 1.0) -> tuple[ObjectSet, ObjectSet]:
+        # 下近似、上近似的位元集合，decision_value 為 None 代表所有決策值的聯集
+        partition, counts = self._decision_counts(attrs)
+        code = None if decision_value is None else self._decision_code(decision_value)
+        return approximation_sets(partition.labels, counts, code, beta)
+    
+    def _object_names(self, objects: ObjectSet) -> set:
+        # 只在回傳結果時才轉換成物件名稱
+        return self.names(objects.to_indices())
+    
+    def lower_approximation(self, attrs: list[str], decision_value, beta: float = 1.0) -> set:
+        """
+            以分割快取計算下近似集合，beta 為 1 時結果與 relations.get_lower_approximation 相同
+            
+            Parameters:
+                beta: float, default 1.0
+                    VPRS(variable precision rough set) 的精確度 β ∈ (0.5, 1]，
+                    等價類別中至少 β 比例的物件屬於 decision_value 時即在下近似中
+        """
+        lower, upper = self._approximation_sets(attrs, decision_value, beta)
+        return self._object_names(lower)
+    
+    def upper_approximation(self, attrs: list[str], decision_value, beta: float = 1.0) -> set:
+        """
+            以分割快取計算上近似集合，beta 為 1 時結果與 relations.get_upper_approximation 相同
+            
+            Parameters:
+                beta: float, default 1.0
+                    VPRS 的精確度 β ∈ (0.5, 1]，等價類別中不屬於 decision_value 的比例小於 β 時即在上近似中
+        """
+        lower, upper = self._approximation_sets(attrs, decision_value, beta)
+        return self._object_names(upper)
+    
+    def regions(self, condition: list[str], beta: float = 1.0) -> dict:
+        """
+            一次計算所有決策值的正域、邊界域與負域
+            
+            Parameters:
+                condition: list[str], 條件屬性
+                beta: float, VPRS 的精確度，參考 lower_approximation
+                
+            Returns:
+                dict, key 是決策值, value 是 {"positive": set, "boundary": set, "negative": set}
+                    positive: 下近似
+                    boundary: 上近似 - 下近似
+                    negative: U - 上近似
+        """
+        partition, counts = self._decision_counts(condition)
+        regions = {}
+        for code, value in self._present_decisions():
+            lower, upper = approximation_sets(partition.labels, counts, code, beta)
+            regions[value] = {
+                "positive": self._object_names(lower),
+                "boundary": self._object_names(upper - lower),
+                "negative": self._object_names(~upper),
+            }
+        return regions
+    
+    def _present_decisions(self):
+        # (編碼, 決策值)，略過已被移除的決策值
+        decision = self.table.codes[self.decision_col]
+        present = np.bincount(decision[decision >= 0], minlength=self.table.cardinality(self.decision_col)) > 0
+        return [(code, value) for code, value in enumerate(self.table.categories[self.decision_col]) if present[code]]
+    
+    def positive_region(self, condition: list[str], decision_value=None, beta: float = 1.0) -> set:
+        """
+            計算正域
+            
+            Parameters:
+                condition: list[str], 條件屬性
+                decision_value: 決策值, None 代表所有決策值下近似的聯集 POS_B(D)
+                beta: float, VPRS 的精確度，參考 lower_approximation
+        """
+        lower, upper = self._approximation_sets(condition, decision_value, beta)
+        return self._object_names(lower)
+    
+    def negative_region(self, condition: list[str], decision_value=None, beta: float = 1.0) -> set:
+        """
+            計算負域
+            
+            Parameters:
+                condition: list[str], 條件屬性
+                decision_value: 決策值, None 代表不在任何決策值上近似中的物件
+                beta: float, VPRS 的精確度，參考 lower_approximation
+        """
+        lower, upper = self._approximation_sets(condition, decision_value, beta)
+        return self._object_names(~upper)
+    
+    def boundary_region(self, condition: list[str], decision_value=None, beta: float = 1.0) -> set:
+        """
+            計算邊界域
+            
+            Parameters:
+                condition: list[str], 條件屬性
+                decision_value: 決策值, None 代表所有決策值邊界域的聯集 BND_B(D)
+                beta: float, VPRS 的精確度，參考 lower_approximation
+        """
+        lower, upper = self._approximation_sets(condition, decision_value, beta)
+        return self._object_names(upper - lower)
+    
+    def neighbours(self, name, attrs: list[str], delta: dict = None) -> set:
+        """
+            物件的鄰域：缺值可以與任何值相符(容忍關係)，delta 中的數值屬性相差不超過 δ 即相符
+            
+            Parameters:
+                name: 物件名稱
+                attrs: list[str], 條件屬性
+                delta: dict[str, float], 數值屬性的鄰域半徑 δ，其他屬性需要相等
+        """
+        rows = np.flatnonzero(self.table.codes[self.name_column] == self.table.categories[self.name_column].get_indexer([name])[0])
+        assert len(rows), f'物件不存在：{name} not in {self.name_column}'
+        return self.names(neighbours(self.table, attrs, rows[0], delta))
+    
+    def _tolerance_sets(self, attrs: list[str], decision_value=None, delta: dict = None, beta: float = 1.0) -> tuple[ObjectSet, ObjectSet]:
+        # 每個物件的鄰域視為一個類別，套用與等價類別相同的(VPRS)下近似、上近似判斷
+        counts = neighbour_counts(self.table, attrs, self.table.codes[self.decision_col], self.table.cardinality(self.decision_col), delta)
+        code = None if decision_value is None else self._decision_code(decision_value)
+        return approximation_sets(np.arange(len(self.table)), counts, code, beta)
+    
+    def tolerance_lower_approximation(self, attrs: list[str], decision_value, delta: dict = None, beta: float = 1.0) -> set:
+        """
+            以容忍關係/δ 鄰域計算下近似：鄰域(至少 β 比例)包含於決策類別的物件
+            
+            沒有缺值且沒有 delta 時，鄰域就是等價類別，結果與 lower_approximation 相同；
+            鄰域以排序與二分搜尋計數，不需要兩兩比較所有物件，參考 neighbourhood.neighbour_counts
+            
+            Parameters:
+                attrs: list[str], 條件屬性，缺值可以與任何值相符
+                decision_value: 決策值
+                delta: dict[str, float], 數值屬性的鄰域半徑 δ，其他屬性需要相等
+                beta: float, VPRS 的精確度，參考 lower_approximation
+        """
+        lower, upper = self._tolerance_sets(attrs, decision_value, delta, beta)
+        return self._object_names(lower)
+    
+    def tolerance_upper_approximation(self, attrs: list[str], decision_value, delta: dict = None, beta: float = 1.0) -> set:
+        """
+            以容忍關係/δ 鄰域計算上近似：鄰域與決策類別相交的物件，參數參考 tolerance_lower_approximation
+        """
+        lower, upper = self._tolerance_sets(attrs, decision_value, delta, beta)
+        return self._object_names(upper)
+    
+    def tolerance_regions(self, condition: list[str], delta: dict = None, beta: float = 1.0) -> dict:
+        """
+            以容忍關係/δ 鄰域一次計算所有決策值的正域、邊界域與負域，格式與 regions 相同，
+            參數參考 tolerance_lower_approximation
+        """
+        counts = neighbour_counts(self.table, condition, self.table.codes[self.decision_col], self.table.cardinality(self.decision_col), delta)
+        labels = np.arange(len(self.table))
+        regions = {}
+        for code, value in self._present_decisions():
+            lower, upper = approximation_sets(labels, counts, code, beta)
+            regions[value] = {
+                "positive": self._object_names(lower),
+                "boundary": self._object_names(upper - lower),
+                "negative": self._object_names(~upper),
+            }
+        return regions
+    
+    def region_sizes(self, condition: list[str], betas, decision_value=None) -> pd.DataFrame:
+        """
+            一次計算多個 β 的正域、邊界域與負域大小，(類別, 決策值) 的數量只計算一次
+            
+            Parameters:
+                condition: list[str], 條件屬性
+                betas: array-like, VPRS 的精確度，每個都在 (0.5, 1] 之間
+                decision_value: 決策值, None 代表所有決策值的聯集
+                
+            Returns:
+                pandas.DataFrame, 每個 β 一列，欄位為
+                    beta: 精確度
+                    positive, boundary, negative: 各區域的物件數量
+                    dependency: |positive| / |U|，decision_value 為 None 時即 γ_β(B, D)
+        """
+        partition, counts = self._decision_counts(condition)
+        code = None if decision_value is None else self._decision_code(decision_value)
+        lower, upper = region_counts(counts, betas, code)
+        n = len(self.table)
+        return pd.DataFrame({
+            "beta": np.asarray(betas, dtype=float),
+            "positive": lower,
+            "boundary": upper - lower,
+            "negative": n - upper,
+            "dependency": lower / n if n else np.zeros(len(lower)),
+        })
+    
+    def contingency(self, attrs: list[str]) -> Contingency:
+        """
+            (attrs 的等價類別, 決策值) 的稀疏列聯表，以整數編碼一次雜湊分組後保留在分割快取中
+            
+            近似精確度、分類品質、相依程度、正域大小與規則的 support, confidence, lift 都可以由它計算，
+            時間與非零組合的數量成正比，參考 contingency.Contingency
+            
+            Parameters:
+                attrs: list[str], 條件屬性
+                
+            Returns:
+                Contingency, 決策值以原始的值表示
+        """
+        contingency = self.partition(attrs).contingency(self.table.codes[self.decision_col], self.table.cardinality(self.decision_col))
+        contingency.decision_values = self.table.categories[self.decision_col]
+        return contingency
+    
+    def approximation_accuracy(self, condition: list[str], decision_value=None, beta: float = 1.0) -> float:
+        """
+            近似精確度 α = |lower| / |upper|
+            
+            Parameters:
+                decision_value: 決策值, None 代表分類的近似精確度 Σ|lower| / Σ|upper|
+                beta: float, VPRS 的精確度，參考 lower_approximation
+        """
+        return self.contingency(condition).accuracy(decision_value, beta)
+    
+    def classification_quality(self, condition: list[str], beta: float = 1.0) -> float:
+        """
+            分類品質 Σ|lower| / |U|，與 dependency_degree 相同
+        """
+        return self.contingency(condition).quality(beta)
+    
+    def dependency_degree(self, condition: list[str], beta: float = 1.0) -> float:
+        """
+            計算決策屬性對條件屬性的相依程度 γ(B, D) = |POS_B(D)| / |U|
+            
+            Parameters:
+                beta: float, VPRS 的精確度，參考 lower_approximation，1 代表一般的相依程度
+        """
+        return self.contingency(condition).dependency_degree(beta)
         
-    def reduct(self, attributes):
-        # calculate the reduct of a set of attributes
-        pass
+    def dependency_degrees(self, subsets: list[list[str]], n_jobs: int = None, backend: str = "process",
+                           progress=None, cancel=None) -> pd.DataFrame:
+        """
+            一次計算多個條件屬性組合的相依程度 γ(B, D)
+            
+            Parameters:
+                subsets: list[list[str]], 條件屬性組合
+                n_jobs: int, default None
+                    平行數量，None 或 1 代表不平行(使用分割快取)，-1 代表使用所有 CPU
+                backend: str, default "process"
+                    - "process": 行程池，決策表放在共享記憶體中
+                    - "thread": 執行緒池
+                progress: callable, default None
+                    組合完成後呼叫 progress("dependency", 已完成的組合數, 總組合數)
+                cancel: progress.CancelToken, default None
+                    被取消時拋出 progress.Cancelled，執行中的組合完成後即停止，不等待整個區塊
+                    
+            Returns:
+                pandas.DataFrame, 每個組合一列，欄位為
+                    subset: tuple, 條件屬性
+                    size: 屬性數量
+                    n_classes: 等價類別數量
+                    positive: 正域的物件數量
+                    dependency: 相依程度
+        """
+        subsets = [tuple(subset) for subset in subsets]
+        for subset in subsets:
+            assert all([col in self.table.columns for col in subset]), f'{subset} not in {self.table.columns}'
+        n_jobs = resolve_n_jobs(n_jobs)
+        reporter = ProgressReporter(progress, cancel, "dependency", len(subsets))
+        statistics = subset_statistics(self.table, subsets, self.decision_col, n_jobs, backend,
+                                       partitions=self.partitions if n_jobs == 1 else None, reporter=reporter)
+        n = len(self.table)
+        return pd.DataFrame({
+            "subset": pd.Series(subsets, dtype=object),
+            "size": np.array([len(subset) for subset in subsets], dtype=np.int64),
+            "n_classes": statistics[:, 0],
+            "positive": statistics[:, 1],
+            "dependency": statistics[:, 1] / n if n else np.zeros(len(subsets)),
+        })
         
-    def core(self, attributes):
-        # calculate the core of a set of attributes
-        pass
+    def _positive_count(self, partition) -> int:
+        # 正域的物件數量，以整數比較避免浮點誤差
+        counts = partition.decision_counts(self.table.codes[self.decision_col], self.table.cardinality(self.decision_col))
+        pure, touched = class_regions(counts)
+        return int(counts[pure, :-1].sum())
+    
+    def _positive_mask(self, partition) -> np.ndarray:
+        # 正域中的物件(與 _positive_count 的物件相同)；有缺值的物件不屬於任何類別，
+        # 因此 |POS_B(D)| 對 B 不是單調的，約簡需要比較正域的物件而不是數量
+        decision = self.table.codes[self.decision_col]
+        counts = partition.decision_counts(decision, self.table.cardinality(self.decision_col))
+        pure, touched = class_regions(counts)
+        labels = partition.labels
+        mask = np.zeros(len(labels), dtype=bool)
+        valid = labels >= 0
+        mask[valid] = pure[labels[valid]]
+        return mask & (decision >= 0)
+    
+    def reduct(self, attributes: list[str] = None, method: str = "quick", max_exact: int = 20) -> list[str]:
+        """
+            計算一個保留正域 POS_C(D) 的約簡(reduct)
+            
+            Parameters:
+                attributes: list[str], 候選的條件屬性, 預設為所有特徵欄位
+                method: str, default "quick"
+                    - "quick": QuickReduct，每次加入顯著度 γ(R∪{a}) - γ(R) 最大的屬性，
+                        再以反向刪除移除多餘的屬性，時間為屬性數量的多項式
+                    - "exact": 依序搜尋所有屬性組合，回傳屬性數量最少的約簡，只適用於屬性數量少的情況
+                max_exact: int, exact 模式允許的最大屬性數量
+                    
+            Returns:
+                list[str], 約簡中的屬性(依 attributes 的順序)
+        """
+        attributes = list(attributes or self.feature_col)
+        target = self._positive_mask(self.partition(attributes))
+        
+        if method == "quick":
+            reduct = self._quick_reduct(attributes, target)
+        elif method == "exact":
+            assert len(attributes) <= max_exact, f"exact 模式最多支援 {max_exact} 個屬性：{len(attributes)} > {max_exact}"
+            reduct = self._exact_reduct(attributes, target)
+        else:
+            raise ValueError("method must be quick or exact")
+        return [col for col in attributes if col in reduct]
+    
+    def _quick_reduct(self, attributes: list[str], target: np.ndarray) -> list[str]:
+        # 向前選擇：以目前約簡的分割細分出每個候選屬性的分割，選擇正域與 target 相同的物件最多的屬性；
+        # 沒有缺值時 POS_B(D) ⊆ POS_C(D)，與選擇 γ 最大的屬性相同，有缺值時正域可能比 target 多，需要繼續加入屬性
+        reduct = []
+        partition = self.partition(reduct)
+        agreement = int((self._positive_mask(partition) == target).sum())
+        while agreement < len(target):
+            best = None
+            for col in attributes:
+                if col in reduct:
+                    continue
+                candidate = self.partitions.get(reduct + [col], base=partition)
+                candidate_agreement = int((self._positive_mask(candidate) == target).sum())
+                if best is None or candidate_agreement > best[1]:
+                    best = (col, candidate_agreement, candidate)
+            reduct.append(best[0])
+            agreement, partition = best[1], best[2]
+        
+        # 反向刪除：移除後正域不變的屬性
+        for col in list(reduct):
+            remain = [c for c in reduct if c != col]
+            if np.array_equal(self._positive_mask(self.partition(remain)), target):
+                reduct = remain
+        return reduct
+    
+    def _exact_reduct(self, attributes: list[str], target: np.ndarray) -> list[str]:
+        # 以 QuickReduct 的結果作為上界，深度優先搜尋更小的約簡
+        best = self._quick_reduct(attributes, target)
+        partitions = PartitionCache(self.table, maxsize=len(attributes) + 1)
+        
+        def visit(prefix, parent, start):
+            nonlocal best
+            for j in range(start, len(attributes)):
+                features = prefix + [attributes[j]]
+                if len(features) >= len(best):
+                    return
+                partition = partitions.get(features, base=parent)
+                if np.array_equal(self._positive_mask(partition), target):
+                    best = features
+                    return
+                visit(features, partition, j + 1)
+        
+        if np.array_equal(self._positive_mask(self.partition([])), target):
+            return []
+        visit([], None, 0)
+        return best
+        
+    def discernibility(self, attributes: list[str] = None, relative: bool = True):
+        """
+            建立區別函數，子句以位元遮罩儲存並已最小化
+            
+            Parameters:
+                attributes: list[str], 條件屬性, 預設為所有特徵欄位
+                relative: bool, default True
+                    - True: 相對於決策屬性(保留正域)
+                    - False: 不考慮決策屬性(保留整個分割)
+                    
+            Returns:
+                DiscernibilityFunction
+        """
+        attributes = list(attributes or self.feature_col)
+        return discernibility_function(self.table, attributes, self.decision_col, relative=relative, partitions=self.partitions)
+    
+    def core(self, attributes: list[str] = None, relative: bool = True) -> list[str]:
+        """
+            計算核(core)：所有約簡共同包含的屬性
+            
+            Parameters:
+                attributes: list[str], 條件屬性, 預設為所有特徵欄位
+                relative: bool, 是否相對於決策屬性, 參考 discernibility
+        """
+        return self.discernibility(attributes, relative).core()
+    
+    def reducts(self, attributes: list[str] = None, relative: bool = True) -> list[list[str]]:
+        """
+            由區別函數列出所有約簡(依屬性數量排列)
+            
+            Parameters:
+                attributes: list[str], 條件屬性, 預設為所有特徵欄位
+                relative: bool, 是否相對於決策屬性, 參考 discernibility
+        """
+        return self.discernibility(attributes, relative).reducts()
     
     def __repr__(self) -> str:
         repr_ = "RoughSet\n\n"
@@ -189,11 +867,11 @@ class RoughSet:
         repr_ += f"\tFeature columns: {self.feature_col}\n"
         repr_ += f"\tDecision column: {self.decision_col}\n\n"
         
-        repr_ += f"\tNumber of objects: {len(self.df)}\n"
-        repr_ += f"\tNumber of unique decision values: {len(self.df[self.decision_col].unique())}\n"
+        repr_ += f"\tNumber of objects: {len(self)}\n"
+        repr_ += f"\tNumber of unique decision values: {self._n_unique(self.decision_col)}\n"
         
-        if hasattr(self, 'reduct_rules'):
-            repr_ += f"\tNumber of reduct rules: {len(self.reduct_rules)}\n"
+        if hasattr(self, 'rule_set'):
+            repr_ += f"\tNumber of reduct rules: {len(self.rule_set)}\n"
         else:
             repr_ += "\tNo reduct rules now, use create_reduct_rules to generate reduct rules\n"
             
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from .rules import RuleSet
+
+
+class RuleClassifier:
+    """
+        以約簡規則對新的物件做分類
+
+        規則依照「前件包含哪些特徵」(規則的形狀)分組，每一組以值組合建立雜湊索引，
+        每個物件只需要在每種形狀中查詢一次，不需要逐條比對規則；
+        符合的規則以權重投票，得票最多的決策值即為預測結果
+
+        Parameters:
+            rules: pandas.DataFrame or RuleSet, create_reduct_rules 的結果(可以包含 evaluate_metrics 的指標)
+                None 代表規則不限制該特徵；NaN 代表產生規則的物件在該特徵上缺值，這樣的規則不符合任何物件；
+                沒有決策值的規則(空規則)與權重為 NaN 或 0 的規則(例如 support 為 0)不參與投票
+            feature_col: list[str], 特徵欄位, None 代表 rules 中除了第一欄(物件名稱)、decision_col 與指標以外的欄位
+            decision_col: str, 決策欄位
+            weight: str or None, default "auto"
+                每條規則的投票權重(相同的規則只會計算一次)
+                - "auto": 有 support 與 confidence 欄位時使用 "support*confidence"，否則使用 "count"
+                - "support", "confidence", "lift": 使用該指標
+                - "support*confidence": support 與 confidence 的乘積
+                - "count": 產生該規則的物件數量(壓縮後的規則使用 count 欄位)
+                - None: 每條規則權重相同
+            default: 沒有任何規則符合時的預測結果
+
+        Attributes:
+            classes_: numpy.ndarray, 決策值，predict_proba 的欄位順序
+            shapes: list[tuple[str]], 規則形狀
+    """
+
+    _metric_cols = ["support", "confidence", "lift", "count"]
+
+    def __init__(self, rules, feature_col: list[str] = None, decision_col: str = None, weight="auto", default=None):
+        if isinstance(rules, RuleSet):
+            feature_col = feature_col or rules.feature_col
+            decision_col = decision_col or rules.decision_col
+            rules = rules.to_frame()
+        assert decision_col in rules.columns, f'決策屬性欄位不存在：{decision_col} not in {rules.columns}'
+        if feature_col is None:
+            feature_col = [col for col in rules.columns[1:] if col != decision_col and col not in self._metric_cols]
+        assert all([col in rules.columns for col in feature_col]), f'{feature_col} not in {rules.columns}'
+
+        self.feature_col = list(feature_col)
+        self.decision_col = decision_col
+        self.default = default
+
+        rules = rules[~pd.isna(rules[decision_col])]
+        weights = self._rule_weights(rules, weight)
+
+        # 以規則中出現的值建立每個特徵的值字典，不限制(None)的特徵編碼為 -1
+        self.categories = {}
+        codes = np.empty((len(rules), len(self.feature_col)), dtype=np.int64)
+        unmatchable = np.zeros(len(rules), dtype=bool)
+        for j, col in enumerate(self.feature_col):
+            values = rules[col].to_numpy(dtype=object)
+            codes[:, j], self.categories[col] = pd.factorize(rules[col], use_na_sentinel=True)
+            unmatchable |= pd.isna(values) & ~np.equal(values, None)
+        decision, self.classes_ = pd.factorize(rules[decision_col])
+        self.classes_ = np.asarray(self.classes_, dtype=object)
+
+        # 前件有缺值或權重不為正數的規則不會投票
+        keep = ~unmatchable & (weights > 0)
+        codes, decision, weights = codes[keep], decision[keep], weights[keep]
+
+        # 相同的規則只投一次票；count 權重則累加
+        vectors, rule_ids = np.unique(np.column_stack([codes, decision]), axis=0, return_inverse=True)
+        rule_ids = rule_ids.ravel()
+        if self._weight_name == "count":
+            rule_weights = np.bincount(rule_ids, weights=weights, minlength=len(vectors))
+        else:
+            rule_weights = np.zeros(len(vectors))
+            rule_weights[rule_ids[::-1]] = weights[::-1] # 取第一次出現的權重
+        codes, decision = vectors[:, :-1], vectors[:, -1]
+
+        # 依照規則形狀建立索引：值組合 -> 各決策值的累積權重
+        self.shapes = []
+        self._index = []
+        self._scores = []
+        masks, shape_ids = np.unique(codes >= 0, axis=0, return_inverse=True)
+        shape_ids = shape_ids.ravel()
+        for i, mask in enumerate(masks):
+            members = np.flatnonzero(shape_ids == i)
+            keys, key_ids = np.unique(codes[members][:, mask], axis=0, return_inverse=True)
+            scores = np.zeros((len(keys), len(self.classes_)))
+            np.add.at(scores, (key_ids.ravel(), decision[members]), rule_weights[members])
+            self.shapes.append(tuple(col for col, used in zip(self.feature_col, mask) if used))
+            self._index.append(pd.MultiIndex.from_arrays(list(keys.T)) if mask.any() else None)
+            self._scores.append(scores)
+
+    def __repr__(self) -> str:
+        return f"RuleClassifier(n_shapes={len(self.shapes)}, classes={list(self.classes_)})"
+
+    def _rule_weights(self, rules: pd.DataFrame, weight) -> np.ndarray:
+        if weight == "auto":
+            weight = "support*confidence" if {"support", "confidence"} <= set(rules.columns) else "count"
+        self._weight_name = weight
+        if weight is None:
+            return np.ones(len(rules))
+        if weight == "count":
+            return rules["count"].to_numpy(dtype=float) if "count" in rules.columns else np.ones(len(rules))
+        if weight == "support*confidence":
+            return rules["support"].to_numpy(dtype=float) * rules["confidence"].to_numpy(dtype=float)
+        assert weight in rules.columns, f'權重欄位不存在：{weight} not in {rules.columns}，請先執行 evaluate_metrics'
+        return rules[weight].to_numpy(dtype=float)
+
+    def _encode(self, df: pd.DataFrame) -> dict:
+        # 規則中沒有出現過的值(與缺值)編碼為 -1，不會符合任何規則
+        for col in self.feature_col:
+            assert col in df.columns, f'{col} not in {df.columns}'
+        return {col: self.categories[col].get_indexer(df[col]) for col in self.feature_col}
+
+    def decision_scores(self, df: pd.DataFrame) -> np.ndarray:
+        """
+            每個物件在各決策值上得到的權重總和
+
+            Parameters:
+                df: pandas.DataFrame, 要分類的資料，需要包含 feature_col
+
+            Returns:
+                numpy.ndarray, shape 為 (len(df), len(classes_))
+        """
+        codes = self._encode(df)
+        scores = np.zeros((len(df), len(self.classes_)))
+        for shape, index, shape_scores in zip(self.shapes, self._index, self._scores):
+            if index is None: # 沒有前件的規則符合所有物件
+                scores += shape_scores.sum(axis=0)
+                continue
+            found = index.get_indexer(pd.MultiIndex.from_arrays([codes[col] for col in shape]))
+            hit = found >= 0
+            scores[hit] += shape_scores[found[hit]]
+        return scores
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """
+            以符合規則的權重比例作為各決策值的機率，沒有任何規則符合的物件機率皆為 0
+
+            Returns:
+                numpy.ndarray, shape 為 (len(df), len(classes_))
+        """
+        scores = self.decision_scores(df)
+        total = scores.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total > 0, scores / total, 0.0)
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """
+            預測每個物件的決策值，得票相同時取 classes_ 中較前面的決策值
+
+            Returns:
+                numpy.ndarray(object), 沒有任何規則符合的物件為 default
+        """
+        scores = self.decision_scores(df)
+        prediction = np.full(len(df), self.default, dtype=object)
+        covered = scores.sum(axis=1) > 0
+        if len(self.classes_):
+            prediction[covered] = self.classes_[np.argmax(scores[covered], axis=1)]
+        return prediction
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+
+class Contingency:
+    """
+        (條件類別, 決策值) 的稀疏列聯表，只保存數量不為 0 的組合
+
+        近似集合大小、近似精確度、分類品質、相依程度與規則的 support, confidence, lift
+        都可以由這些數量計算，時間與非零組合的數量成正比，不需要再掃描決策表
+
+        Attributes:
+            classes: numpy.ndarray(int64), 每個非零組合的條件類別(與 Partition.labels 的編號相同)
+            decisions: numpy.ndarray(int64), 每個非零組合的決策值編碼, n_decisions 代表決策缺值
+            counts: numpy.ndarray(int64), 每個非零組合的物件數量
+            n_classes: int, 條件類別數量(可能包含移除物件後的空類別)
+            n_decisions: int, 決策值數量
+            n_objects: int, 論域的物件數量(包含在條件屬性上有缺值、不屬於任何類別的物件)
+            decision_sizes: numpy.ndarray(int64), 論域中每個決策值的物件數量，最後一個為決策缺值的數量
+            decision_values: pandas.Index, 決策值編碼對應的值，None 代表只使用編碼
+    """
+
+    def __init__(self, classes: np.ndarray, decisions: np.ndarray, counts: np.ndarray, n_classes: int,
+                 decision_sizes: np.ndarray, decision_values: pd.Index = None):
+        self.classes = classes
+        self.decisions = decisions
+        self.counts = counts
+        self.n_classes = n_classes
+        self.n_decisions = len(decision_sizes) - 1
+        self.n_objects = int(decision_sizes.sum())
+        self.decision_sizes = decision_sizes
+        self.decision_values = decision_values
+
+    def __repr__(self) -> str:
+        return f"Contingency(n_classes={self.n_classes}, n_decisions={self.n_decisions}, nnz={len(self.counts)})"
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @classmethod
+    def from_labels(cls, labels: np.ndarray, n_classes: int, decision: np.ndarray, n_decisions: int) -> "Contingency":
+        """
+            以一次雜湊分組計算 (類別, 決策值) 的數量
+
+            Parameters:
+                labels: numpy.ndarray, 每個物件所屬的類別, -1 代表不屬於任何類別
+                n_classes: int, 類別數量
+                decision: numpy.ndarray, 決策欄位的整數編碼, -1 代表缺值
+                n_decisions: int, 決策值數量
+        """
+        dec = np.where(decision < 0, n_decisions, decision).astype(np.int64)
+        valid = labels >= 0
+        codes, keys = pd.factorize(labels[valid].astype(np.int64) * (n_decisions + 1) + dec[valid])
+        counts = np.bincount(codes, minlength=len(keys))
+        # 依 (類別, 決策值) 排序，只排序非零組合
+        order = np.argsort(keys, kind="stable")
+        keys = np.asarray(keys, dtype=np.int64)[order]
+        return cls(keys // (n_decisions + 1), keys % (n_decisions + 1), counts[order].astype(np.int64),
+                   n_classes, np.bincount(dec, minlength=n_decisions + 1).astype(np.int64))
+
+    def to_dense(self) -> np.ndarray:
+        """
+            Returns:
+                numpy.ndarray, 與 Partition.decision_counts 相同格式的矩陣
+        """
+        dense = np.zeros((self.n_classes, self.n_decisions + 1), dtype=np.int64)
+        dense[self.classes, self.decisions] = self.counts
+        return dense
+
+    @property
+    def class_sizes(self) -> np.ndarray:
+        """
+            每個條件類別的物件數量(包含決策缺值的物件)
+        """
+        return np.bincount(self.classes, weights=self.counts, minlength=self.n_classes).astype(np.int64)
+
+    def _entry_regions(self, beta: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # 每個非零組合(不含決策缺值)的類別大小，以及類別是否在該決策值的下近似、上近似中，判斷方式與 partition.beta_regions 相同
+        from .partition import beta_regions
+        assert 0.5 < beta <= 1, f"beta 需要在 (0.5, 1] 之間：{beta}"
+        present = self.decisions < self.n_decisions
+        sizes = self.class_sizes[self.classes[present]]
+        hits = self.counts[present]
+        return (sizes, *beta_regions(hits / sizes, (sizes - hits) / sizes, beta))
+
+    def _code(self, decision_value) -> int:
+        if self.decision_values is None:
+            return decision_value
+        code = self.decision_values.get_indexer([decision_value])[0]
+        assert code >= 0, f"Decision value [{decision_value}] not in {list(self.decision_values)}!"
+        return code
+
+    def approximation_sizes(self, decision_value=None, beta: float = 1.0) -> tuple[int, int]:
+        """
+            下近似與上近似的物件數量
+
+            Parameters:
+                decision_value: 決策值(沒有 decision_values 時為編碼), None 代表所有決策值的總和 Σ|lower|, Σ|upper|
+                beta: float, VPRS 的精確度 β ∈ (0.5, 1]
+
+            Returns:
+                (lower, upper): int
+        """
+        sizes, lower, upper = self._entry_regions(beta)
+        if decision_value is not None:
+            selected = self.decisions[self.decisions < self.n_decisions] == self._code(decision_value)
+            lower, upper = lower & selected, upper & selected
+        return int(sizes[lower].sum()), int(sizes[upper].sum())
+
+    def positive_size(self, beta: float = 1.0) -> int:
+        """
+            正域 POS_B(D) 的物件數量；β > 0.5 時每個類別最多只在一個決策值的下近似中，因此等於 Σ|lower|
+        """
+        lower, upper = self.approximation_sizes(None, beta)
+        return lower
+
+    def accuracy(self, decision_value=None, beta: float = 1.0) -> float:
+        """
+            近似精確度 α = |lower| / |upper|
+
+            Parameters:
+                decision_value: 決策值, None 代表分類的近似精確度 Σ|lower| / Σ|upper|
+        """
+        lower, upper = self.approximation_sizes(decision_value, beta)
+        return lower / upper if upper else 0.0
+
+    def quality(self, beta: float = 1.0) -> float:
+        """
+            分類品質 Σ|lower| / |U|，與相依程度 γ(B, D) 相同
+        """
+        return self.positive_size(beta) / self.n_objects if self.n_objects else 0.0
+
+    def dependency_degree(self, beta: float = 1.0) -> float:
+        """
+            相依程度 γ(B, D) = |POS_B(D)| / |U|
+        """
+        return self.quality(beta)
+
+    def rule_metrics(self) -> pd.DataFrame:
+        """
+            每個 (條件類別, 決策值) 組合視為一條規則的 support, confidence, lift，
+            定義與 evaluate.evaluate_rules 相同(support 為條件類別佔論域的比例)
+
+            Returns:
+                pandas.DataFrame, 每個非零組合(不含決策缺值)一列，欄位為 class, decision, count, support, confidence, lift
+        """
+        present = self.decisions < self.n_decisions
+        classes, decisions, counts = self.classes[present], self.decisions[present], self.counts[present]
+        n = self.n_objects
+        x_score = self.class_sizes[classes] / n
+        y_score = self.decision_sizes[decisions] / n
+        xy_score = counts / n
+        return pd.DataFrame({
+            "class": classes,
+            "decision": decisions if self.decision_values is None else self.decision_values[decisions],
+            "count": counts,
+            "support": x_score,
+            "confidence": xy_score / x_score,
+            "lift": xy_score / (x_score * y_score),
+        })
@@ -0,0 +1,180 @@
+import numpy as np
+
+from .objectset import popcount
+from .partition import PartitionCache, class_regions
+
+
+def pack_masks(masks: np.ndarray, n_words: int) -> np.ndarray:
+    """
+        將布林矩陣(每列為一個屬性集合)壓縮成 uint64 位元遮罩，第 j 個屬性對應第 j 個位元
+
+        Parameters:
+            masks: numpy.ndarray(bool), shape 為 (n, n_attrs)
+            n_words: int, 每個遮罩使用的 uint64 數量
+
+        Returns:
+            numpy.ndarray(uint64), shape 為 (n, n_words)
+    """
+    packed = np.packbits(masks, axis=1, bitorder="little")
+    padded = np.zeros((len(masks), n_words * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view("<u8")
+
+
+def absorb(clauses: np.ndarray) -> np.ndarray:
+    """
+        吸收律：若子句 a 是子句 b 的子集合，則 a ∧ b = a，移除 b
+
+        Parameters:
+            clauses: numpy.ndarray(uint64), 不重複的子句
+
+        Returns:
+            numpy.ndarray(uint64), 最小化後的子句(依位元數量由少到多排列)
+    """
+    order = np.argsort(popcount(clauses), kind="stable")
+    # 預先配置結果陣列，只比較已保留的前 n_kept 列
+    kept = np.empty_like(clauses)
+    n_kept = 0
+    for clause in clauses[order]:
+        if n_kept and np.any(np.all((kept[:n_kept] & clause) == kept[:n_kept], axis=1)):
+            continue
+        kept[n_kept] = clause
+        n_kept += 1
+    return kept[:n_kept].copy()
+
+
+def minimal_transversals(masks: list[int]) -> list[int]:
+    """
+        以 Berge 演算法計算子句集合的所有最小擊中集合(即合取範式轉成析取範式的所有質蘊涵項)
+
+        Parameters:
+            masks: list[int], 以整數位元遮罩表示的子句
+
+        Returns:
+            list[int], 所有最小擊中集合
+    """
+    transversals = [0]
+    for clause in sorted(masks, key=lambda mask: bin(mask).count("1")):
+        extended = set()
+        for transversal in transversals:
+            if transversal & clause:
+                extended.add(transversal)
+                continue
+            remain = clause
+            while remain:
+                bit = remain & -remain
+                extended.add(transversal | bit)
+                remain ^= bit
+        # 移除不是最小的集合
+        minimal = []
+        for transversal in sorted(extended, key=lambda mask: bin(mask).count("1")):
+            if not any(m & transversal == m for m in minimal):
+                minimal.append(transversal)
+        transversals = minimal
+    return transversals
+
+
+class DiscernibilityFunction:
+    """
+        以位元遮罩儲存的區別函數(discernibility function)
+
+        每個子句代表一對需要被區別的物件，在哪些屬性上的值不同；
+        子句已去除重複並套用吸收律，不會以 Python 的 set 儲存
+
+        Attributes:
+            attributes: list[str], 屬性，第 j 個屬性對應第 j 個位元
+            clauses: numpy.ndarray(uint64), shape 為 (n_clauses, n_words)
+    """
+
+    def __init__(self, attributes: list[str], clauses: np.ndarray):
+        self.attributes = attributes
+        self.clauses = clauses
+
+    def __len__(self) -> int:
+        return len(self.clauses)
+
+    def __repr__(self) -> str:
+        return f"DiscernibilityFunction(attributes={self.attributes}, n_clauses={len(self)})"
+
+    def _to_int(self, words: np.ndarray) -> int:
+        return int.from_bytes(words.astype("<u8").tobytes(), "little")
+
+    def _to_attrs(self, mask: int) -> list[str]:
+        return [col for j, col in enumerate(self.attributes) if mask >> j & 1]
+
+    def to_sets(self) -> list[set]:
+        """
+            將子句轉換成屬性集合，方便顯示
+        """
+        return [set(self._to_attrs(self._to_int(clause))) for clause in self.clauses]
+
+    def core(self) -> list[str]:
+        """
+            核(core)：只包含單一屬性的子句中的屬性
+        """
+        singles = self.clauses[popcount(self.clauses) == 1]
+        mask = 0
+        for clause in singles:
+            mask |= self._to_int(clause)
+        return self._to_attrs(mask)
+
+    def reducts(self) -> list[list[str]]:
+        """
+            所有約簡：區別函數的所有質蘊涵項
+        """
+        masks = [self._to_int(clause) for clause in self.clauses]
+        transversals = minimal_transversals(masks)
+        transversals.sort(key=lambda mask: (bin(mask).count("1"), [j for j in range(len(self.attributes)) if mask >> j & 1]))
+        return [self._to_attrs(mask) for mask in transversals]
+
+
+def discernibility_function(table, attributes: list[str], decision_col: str, relative: bool = True,
+                            partitions: PartitionCache = None, block_size: int = 2 ** 22) -> DiscernibilityFunction:
+    """
+        建立區別函數
+
+        以 attributes 的等價類別(不同的條件向量)代替物件兩兩比較，有缺值的物件不列入比較。
+
+        Parameters:
+            table: EncodedTable, 整數編碼的決策表
+            attributes: list[str], 條件屬性
+            decision_col: str, 決策欄位
+            relative: bool, default True
+                - True: 只保留需要區別的類別對(至少一方在正域中，且決策不同)，保留正域的約簡
+                - False: 保留所有類別對，保留整個分割 U/attributes 的約簡
+            partitions: PartitionCache, 分割快取
+            block_size: int, 每次比較的元素數量上限，用來限制記憶體用量
+
+        Returns:
+            DiscernibilityFunction
+    """
+    partitions = partitions or PartitionCache(table, maxsize=1)
+    partition = partitions.get(attributes)
+    n_attrs = len(attributes)
+    n_words = max(1, (n_attrs + 63) // 64)
+
+    # 每個類別取第一個物件作為代表
+    first = partition.representatives
+    representatives = np.column_stack([table.codes[col][first] for col in attributes]) if n_attrs else np.zeros((partition.n_classes, 0))
+
+    counts = partition.decision_counts(table.codes[decision_col], table.cardinality(decision_col))
+    pure, touched = class_regions(counts)
+    decision = np.argmax(touched, axis=1)
+
+    n_classes = partition.n_classes
+    rows_per_block = max(1, block_size // max(1, n_classes * max(1, n_attrs)))
+    clauses = np.zeros((0, n_words), dtype=np.uint64)
+    for start in range(0, n_classes, rows_per_block):
+        stop = min(n_classes, start + rows_per_block)
+        i, j = np.nonzero(np.arange(start, stop)[:, None] < np.arange(n_classes)[None, :])
+        i += start
+        if relative:
+            need = (pure[i] | pure[j]) & ~(pure[i] & pure[j] & (decision[i] == decision[j]))
+            i, j = i[need], j[need]
+        if len(i) == 0:
+            continue
+        diff = representatives[i] != representatives[j]
+        block = np.unique(pack_masks(diff, n_words), axis=0)
+        clauses = np.unique(np.vstack([clauses, block]), axis=0)
+
+    return DiscernibilityFunction(list(attributes), absorb(clauses))
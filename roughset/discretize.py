@@ -0,0 +1,298 @@
+import numpy as np
+import pandas as pd
+
+from .encoding import refine_labels
+
+METHODS = ("equal_frequency", "mdlp", "consistency")
+
+
+def _sorted_values(values: np.ndarray, decision: np.ndarray = None):
+    # 移除缺值(與決策缺值)後排序，回傳排序後的值、決策值，以及相異值之間的切點位置
+    values = np.asarray(values, dtype=float)
+    keep = ~np.isnan(values)
+    if decision is not None:
+        keep &= decision >= 0
+    order = np.argsort(values[keep], kind="stable")
+    sorted_values = values[keep][order]
+    sorted_decision = None if decision is None else decision[keep][order]
+    boundaries = np.flatnonzero(sorted_values[1:] > sorted_values[:-1]) + 1
+    return sorted_values, sorted_decision, boundaries
+
+
+def _midpoints(sorted_values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    # 切點取在兩個相鄰相異值的中間
+    return (sorted_values[positions - 1] + sorted_values[positions]) / 2
+
+
+def equal_frequency_cuts(values: np.ndarray, n_bins: int = 5) -> np.ndarray:
+    """
+        等頻切點：每個區間的物件數量大致相同，切點只會落在兩個相異值之間
+
+        Parameters:
+            values: numpy.ndarray, 數值(NaN 為缺值，不參與計算)
+            n_bins: int, 區間數量
+
+        Returns:
+            numpy.ndarray, 由小到大的切點
+    """
+    assert n_bins >= 1, f"n_bins 需要至少為 1：{n_bins}"
+    sorted_values, _, boundaries = _sorted_values(values)
+    if not len(boundaries):
+        return np.zeros(0)
+    targets = np.arange(1, n_bins) * len(sorted_values) / n_bins
+    # 每個目標位置取最近的相異值邊界
+    index = np.searchsorted(boundaries, targets)
+    left = boundaries[np.maximum(index - 1, 0)]
+    right = boundaries[np.minimum(index, len(boundaries) - 1)]
+    positions = np.unique(np.where(targets - left <= right - targets, left, right))
+    return _midpoints(sorted_values, positions)
+
+
+def _entropy(counts: np.ndarray) -> np.ndarray:
+    # 每一列的 entropy(以 2 為底)
+    totals = counts.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(totals > 0, counts / totals, 0.0)
+        return -np.sum(np.where(p > 0, p * np.log2(p), 0.0), axis=-1)
+
+
+def mdlp_cuts(values: np.ndarray, decision: np.ndarray, n_decisions: int = None) -> np.ndarray:
+    """
+        以 Fayyad & Irani 的 MDLP(minimum description length principle) 遞迴選擇切點
+
+        排序一次後以各決策值的累加數量計算任一區段的 entropy，
+        每一層遞迴只需要對區段中的相異值邊界做向量運算
+
+        Parameters:
+            values: numpy.ndarray, 數值(NaN 為缺值，不參與計算)
+            decision: numpy.ndarray, 決策欄位的整數編碼, -1 代表缺值(不參與計算)
+            n_decisions: int, 決策值數量, None 代表 decision.max() + 1
+
+        Returns:
+            numpy.ndarray, 由小到大的切點
+    """
+    decision = np.asarray(decision, dtype=np.int64)
+    n_decisions = n_decisions or int(decision.max(initial=-1)) + 1
+    sorted_values, sorted_decision, boundaries = _sorted_values(values, decision)
+    n = len(sorted_values)
+    prefix = np.zeros((n + 1, max(n_decisions, 1)), dtype=np.int64)
+    prefix[np.arange(1, n + 1), sorted_decision] = 1
+    prefix = np.cumsum(prefix, axis=0)
+
+    positions = []
+    segments = [(0, n)]
+    while segments:
+        start, stop = segments.pop()
+        candidates = boundaries[(boundaries > start) & (boundaries < stop)]
+        if not len(candidates):
+            continue
+        total = prefix[stop] - prefix[start]
+        left = prefix[candidates] - prefix[start]
+        right = total - left
+        size = stop - start
+        weighted = ((candidates - start) * _entropy(left) + (stop - candidates) * _entropy(right)) / size
+        best = int(np.argmin(weighted))
+
+        entropy = _entropy(total)
+        gain = entropy - weighted[best]
+        k, k1, k2 = (total > 0).sum(), (left[best] > 0).sum(), (right[best] > 0).sum()
+        delta = np.log2(3.0 ** k - 2) - (k * entropy - k1 * _entropy(left[best]) - k2 * _entropy(right[best]))
+        if gain <= (np.log2(size - 1) + delta) / size:
+            continue
+        cut = candidates[best]
+        positions.append(cut)
+        segments += [(start, cut), (cut, stop)]
+    return _midpoints(sorted_values, np.sort(np.asarray(positions, dtype=np.int64)))
+
+
+def _rank_in_group(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # 每個物件在同一組中排在前面的物件數量，以及所在組的大小(雜湊分組，不需要排序)
+    codes, _ = pd.factorize(keys)
+    rank = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+    return rank, np.bincount(codes)[codes]
+
+
+def _cut_scores(blocks: np.ndarray, sorted_values: np.ndarray, order: np.ndarray, decision: np.ndarray, n_decisions: int):
+    """
+        一個屬性上每個切點新區分的(不同決策值)物件對數量
+
+        將物件依數值排序後，切點每往右移過一個物件 x(區塊 b, 決策值 d)，
+        區分的物件對增加 (|R_b| - |L_b|) - (|R_bd| - |L_bd|)，以累加和一次算出所有切點
+
+        Returns:
+            (positions, scores): 相異值之間的切點位置與其分數
+    """
+    b = blocks[order]
+    left_b, size_b = _rank_in_group(b)
+    left_bd, size_bd = _rank_in_group(b * n_decisions + decision[order])
+    scores = np.cumsum((size_b - 2 * left_b) - (size_bd - 2 * left_bd))
+    positions = np.flatnonzero(sorted_values[1:] > sorted_values[:-1]) + 1
+    return positions, scores[positions - 1]
+
+
+def consistency_cuts(values: dict, decision: np.ndarray, blocks: np.ndarray = None) -> dict:
+    """
+        保持決策表一致程度的切點(MD heuristic)：每次在所有數值屬性中選擇區分最多
+        「決策值不同但尚未被區分」物件對的切點，直到所有能被數值區分的物件對都已區分
+
+        因此離散化後的正域與原本的決策表相同；每個屬性只排序一次，
+        之後每選一個切點只需要掃描仍在混合區塊(有多個決策值)中的物件
+
+        Parameters:
+            values: dict[str, numpy.ndarray], 要離散化的數值屬性(NaN 為缺值)
+            decision: numpy.ndarray, 決策欄位的整數編碼, -1 代表缺值(不參與計算)
+            blocks: numpy.ndarray, 其他(類別)屬性形成的分組，只需要區分同一組中的物件, None 代表全部同一組
+
+        Returns:
+            dict[str, numpy.ndarray], 每個屬性由小到大的切點
+    """
+    decision = np.asarray(decision, dtype=np.int64)
+    n_decisions = int(decision.max(initial=0)) + 1
+    blocks = np.zeros(len(decision), dtype=np.int64) if blocks is None else np.asarray(blocks, dtype=np.int64)
+    values = {col: np.asarray(column, dtype=float) for col, column in values.items()}
+    orders = {}
+    for col, column in values.items():
+        rows = np.flatnonzero(~np.isnan(column) & (decision >= 0))
+        orders[col] = rows[np.argsort(column[rows], kind="stable")]
+
+    cuts = {col: [] for col in values}
+    active = decision >= 0
+    while True:
+        # 只有一個決策值的區塊不會再增加分數，其中的物件不需要再掃描
+        pairs = np.unique(blocks[active] * n_decisions + decision[active])
+        mixed_blocks, n_values = np.unique(pairs // n_decisions, return_counts=True)
+        active &= np.isin(blocks, mixed_blocks[n_values > 1])
+        best = None
+        for col, order in orders.items():
+            order = orders[col] = order[active[order]]
+            sorted_values = values[col][order]
+            positions, scores = _cut_scores(blocks, sorted_values, order, decision, n_decisions)
+            if len(scores) and (best is None or scores.max() > best[0]):
+                i = int(np.argmax(scores))
+                best = (int(scores[i]), col, (sorted_values[positions[i] - 1] + sorted_values[positions[i]]) / 2)
+        if best is None or best[0] <= 0:
+            break
+        _, col, cut = best
+        cuts[col].append(cut)
+        # 以新的切點細分區塊，缺值自成一組
+        side = np.where(np.isnan(values[col]), 2, (values[col] >= cut).astype(np.int64))
+        blocks, _ = refine_labels(blocks, side)
+    return {col: np.sort(np.asarray(col_cuts, dtype=float)) for col, col_cuts in cuts.items()}
+
+
+def _format(value: float) -> str:
+    # 15 位有效數字：不顯示 0.6499999999999999 這類誤差，相近的切點也不會產生相同的區間名稱
+    return f"{value:.15g}"
+
+
+def bin_labels(cuts: np.ndarray) -> list[str]:
+    """
+        每個區間的名稱，例如 "(-inf, 1.5)", "[1.5, 3)", "[3, inf)"
+    """
+    edges = ["-inf"] + [_format(cut) for cut in cuts] + ["inf"]
+    return [f"{'(' if i == 0 else '['}{edges[i]}, {edges[i + 1]})" for i in range(len(edges) - 1)]
+
+
+class Discretizer:
+    """
+        將數值特徵離散化成區間，讓約簡與近似集合在少量的區間編碼上計算
+
+        以 fit 在訓練資料上選擇切點，再以 transform 套用到訓練與測試資料(相同的區間名稱)，
+        切點可以用 to_dict/from_dict 保存成 JSON
+
+        Parameters:
+            method: str, default "mdlp"
+                - "equal_frequency": 等頻切點(不需要決策欄位)
+                - "mdlp": 以 entropy 與 MDLP 準則在每個屬性上選擇切點
+                - "consistency": 保持決策表一致程度的切點，參考 consistency_cuts
+            n_bins: int, equal_frequency 的區間數量
+
+        Attributes:
+            cuts: dict[str, numpy.ndarray], 每個屬性由小到大的切點，fit 之前為 None
+    """
+
+    def __init__(self, method: str = "mdlp", n_bins: int = 5):
+        assert method in METHODS, f"method must be one of {METHODS}, got {method}"
+        self.method = method
+        self.n_bins = n_bins
+        self.cuts = None
+
+    def __repr__(self) -> str:
+        fitted = {col: len(cuts) for col, cuts in self.cuts.items()} if self.cuts is not None else None
+        return f"Discretizer(method={self.method!r}, cuts={fitted})"
+
+    def fit(self, df: pd.DataFrame, feature_col: list[str], decision_col: str = None, columns: list[str] = None) -> "Discretizer":
+        """
+            選擇切點
+
+            Parameters:
+                df: pandas.DataFrame, 訓練資料
+                feature_col: list[str], 特徵欄位
+                decision_col: str, 決策欄位(mdlp 與 consistency 需要)
+                columns: list[str], 要離散化的欄位, None 代表 feature_col 中的浮點數欄位
+                    consistency 會以其他特徵欄位分組，只區分在其他特徵上相同的物件
+
+            Returns:
+                self
+        """
+        if columns is None:
+            columns = [col for col in feature_col if df[col].dtype.kind == "f"]
+        for col in columns:
+            assert col in df.columns, f"{col} not in {df.columns}"
+            assert df[col].dtype.kind in "iufb", f"{col} 不是數值欄位"
+        assert self.method == "equal_frequency" or decision_col in df.columns, f"{self.method} 需要決策欄位：{decision_col}"
+
+        values = {col: df[col].to_numpy(dtype=float) for col in columns}
+        if self.method == "equal_frequency":
+            self.cuts = {col: equal_frequency_cuts(column, self.n_bins) for col, column in values.items()}
+            return self
+        if self.method == "mdlp":
+            decision, uniques = pd.factorize(df[decision_col])
+            self.cuts = {col: mdlp_cuts(column, decision, len(uniques)) for col, column in values.items()}
+            return self
+        # 決策缺值的物件不在任何決策值的下近似中，視為另一個決策值才能保持正域
+        decision, _ = pd.factorize(df[decision_col], use_na_sentinel=False)
+        blocks = None
+        for col in [col for col in feature_col if col not in values]:
+            codes, _ = pd.factorize(df[col], use_na_sentinel=False) # 缺值自成一組
+            blocks, _ = refine_labels(blocks, codes)
+        self.cuts = consistency_cuts(values, decision, blocks)
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+            將已選擇切點的欄位轉換成區間名稱，缺值保持為缺值，其他欄位不變
+
+            Returns:
+                pandas.DataFrame, 新的 DataFrame
+        """
+        assert self.cuts is not None, "請先執行 fit"
+        df = df.copy()
+        for col, cuts in self.cuts.items():
+            assert col in df.columns, f"{col} not in {df.columns}"
+            values = df[col].to_numpy(dtype=float)
+            labels = np.asarray(bin_labels(cuts), dtype=object)
+            binned = labels[np.searchsorted(cuts, np.nan_to_num(values), side="right")]
+            binned[np.isnan(values)] = None
+            df[col] = binned
+        return df
+
+    def fit_transform(self, df: pd.DataFrame, feature_col: list[str], decision_col: str = None, columns: list[str] = None) -> pd.DataFrame:
+        return self.fit(df, feature_col, decision_col, columns).transform(df)
+
+    def to_dict(self) -> dict:
+        """
+            可以轉換成 JSON 的切點
+        """
+        return {
+            "method": self.method,
+            "n_bins": self.n_bins,
+            "cuts": None if self.cuts is None else {col: cuts.tolist() for col, cuts in self.cuts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Discretizer":
+        discretizer = cls(data["method"], data["n_bins"])
+        if data["cuts"] is not None:
+            discretizer.cuts = {col: np.asarray(cuts, dtype=float) for col, cuts in data["cuts"].items()}
+        return discretizer
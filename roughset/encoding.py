@@ -0,0 +1,262 @@
+import numpy as np
+import pandas as pd
+
+from .profiling import stage
+
+
+def _code_dtype(n_categories: int):
+    """
+        依照類別數量選擇最小的有號整數型別(保留 -1 作為缺值)
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class EncodedTable:
+    """
+        以整數編碼儲存的決策表
+
+        每個欄位都被 factorize 成 0 ~ (類別數-1) 的整數，缺值(NaN)編碼為 -1，
+        原始的值則保存在 categories 中，可以透過 decode 還原。
+
+        Attributes:
+            codes: dict[str, numpy.ndarray], 每個欄位的整數編碼
+            categories: dict[str, pandas.Index], 每個欄位的值字典，codes 即為其索引
+            columns: list[str], 欄位順序
+    """
+
+    def __init__(self, codes: dict, categories: dict):
+        self.codes = codes
+        self.categories = categories
+        self.columns = list(codes)
+
+    def __len__(self) -> int:
+        if not self.columns:
+            return 0
+        return len(self.codes[self.columns[0]])
+
+    def cardinality(self, col: str) -> int:
+        """
+            回傳欄位的類別數量(不含缺值)
+        """
+        return len(self.categories[col])
+
+    def take(self, rows) -> "EncodedTable":
+        """
+            取出部分列，值字典與原本的資料表共用
+        """
+        return EncodedTable({col: codes[rows] for col, codes in self.codes.items()}, self.categories)
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+            將 df 的列編碼後加到資料表最後(原地修改)，新的值依首次出現的順序加到值字典最後
+
+            Returns:
+                int, 新加入的第一列的位置
+        """
+        start = len(self)
+        for col in self.columns:
+            categories = self.categories[col]
+            col_codes = categories.get_indexer(df[col]) if len(categories) else np.full(len(df), -1)
+            new = (col_codes < 0) & ~pd.isna(df[col]).to_numpy()
+            if new.any():
+                new_codes, uniques = pd.factorize(df[col].to_numpy()[new])
+                col_codes[new] = new_codes + len(categories)
+                self.categories[col] = categories.append(pd.Index(uniques))
+            dtype = _code_dtype(len(self.categories[col]))
+            self.codes[col] = np.concatenate([self.codes[col].astype(dtype, copy=False), col_codes.astype(dtype)])
+        return start
+
+    def keep(self, mask: np.ndarray):
+        """
+            只保留 mask 為 True 的列(原地修改)，值字典不變
+        """
+        for col in self.columns:
+            self.codes[col] = self.codes[col][mask]
+
+    def decode(self, col: str, rows=None) -> np.ndarray:
+        """
+            將欄位的整數編碼還原為原始值(object 陣列)，缺值還原為 NaN
+
+            Parameters:
+                col: str, 欄位名稱
+                rows: array-like, 要還原的列位置, None 代表全部
+        """
+        codes = self.codes[col] if rows is None else self.codes[col][rows]
+        values = np.asarray(self.categories[col], dtype=object)
+        if len(values) == 0:
+            return np.full(len(codes), np.nan, dtype=object)
+        decoded = values[codes]
+        decoded[codes < 0] = np.nan
+        return decoded
+
+
+def encode_table(df: pd.DataFrame, columns: list[str]) -> EncodedTable:
+    """
+        將 df 中的 columns 逐欄 factorize 成整數編碼
+
+        Parameters:
+            df: pandas.DataFrame
+            columns: list[str], 要編碼的欄位
+
+        Returns:
+            EncodedTable
+    """
+    codes = {}
+    categories = {}
+    with stage("encoding.encode_table", rows=len(df)):
+        for col in columns:
+            if col in codes:
+                continue
+            col_codes, uniques = pd.factorize(df[col])
+            codes[col] = col_codes.astype(_code_dtype(len(uniques)))
+            categories[col] = pd.Index(uniques)
+    return EncodedTable(codes, categories)
+
+
+def encode_csv(path, columns: list[str], chunksize: int = 100_000, **kwargs) -> EncodedTable:
+    """
+        分批讀取 CSV 並逐批 factorize 成整數編碼，不會把整個檔案讀成 DataFrame
+
+        每個欄位維護一份跨批次共用的值字典，新的值依首次出現的順序編號，
+        因此結果與先讀入整個檔案再呼叫 encode_table 相同
+
+        Parameters:
+            path: str or file-like, CSV 檔案
+            columns: list[str], 要編碼的欄位
+            chunksize: int, 每批讀取的列數
+            **kwargs: 傳給 pandas.read_csv 的其他參數
+
+        Returns:
+            EncodedTable
+    """
+    columns = list(dict.fromkeys(columns))
+    lookups = {col: {} for col in columns}
+    chunks = {col: [] for col in columns}
+    dtypes = {col: [] for col in columns}
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize, **kwargs):
+        for col in columns:
+            chunk_codes, uniques = pd.factorize(chunk[col])
+            dtypes[col].append(chunk[col].dtype)
+            lookup = lookups[col]
+            # 將這一批的編碼轉換成共用字典的編碼
+            mapping = np.array([lookup.setdefault(value, len(lookup)) for value in uniques], dtype=np.int64)
+            codes = np.where(chunk_codes >= 0, mapping[np.maximum(chunk_codes, 0)] if len(mapping) else -1, -1)
+            chunks[col].append(codes.astype(_code_dtype(len(lookup))))
+
+    codes = {}
+    categories = {}
+    for col in columns:
+        n_categories = len(lookups[col])
+        codes[col] = np.concatenate(chunks[col]).astype(_code_dtype(n_categories)) if chunks[col] else np.zeros(0, dtype=np.int8)
+        values = list(lookups[col])
+        if dtypes[col] and all(dtype.kind in "biuf" for dtype in dtypes[col]):
+            # 各批次的型別可能不同(例如只有部分批次有缺值而成為 float)，統一成共同型別
+            values = np.array(values, dtype=np.result_type(*dtypes[col]))
+        categories[col] = pd.Index(values)
+        chunks[col] = None # 釋放批次的編碼
+    return EncodedTable(codes, categories)
+
+
+def refine_labels(labels, codes: np.ndarray) -> tuple[np.ndarray, int]:
+    """
+        以一個欄位的編碼細分既有的分割(partition)
+
+        Parameters:
+            labels: numpy.ndarray or None, 既有分割中每個物件所屬的類別, -1 代表不屬於任何類別
+                None 代表整個論域為同一類別
+            codes: numpy.ndarray, 新欄位的整數編碼, -1 代表缺值
+
+        Returns:
+            (labels, n_classes): 細分後每個物件的類別(依首次出現的順序編號)與類別數量
+                在任一欄位為缺值的物件，類別為 -1
+    """
+    codes = codes.astype(np.int64)
+    if labels is None:
+        key = codes
+    else:
+        key = labels * (int(codes.max(initial=-1)) + 1) + codes
+        key[labels < 0] = -1
+    key[codes < 0] = -1
+
+    valid = key >= 0
+    new_labels = np.full(len(key), -1, dtype=np.int64)
+    new_labels[valid], uniques = pd.factorize(key[valid])
+    return new_labels, len(uniques)
+
+
+def pure_classes(labels: np.ndarray, n_classes: int, decision: np.ndarray) -> np.ndarray:
+    """
+        判斷分割中的每個類別是否只包含單一決策值
+
+        Parameters:
+            labels: numpy.ndarray, 每個物件所屬的類別, -1 代表不屬於任何類別
+            n_classes: int, 類別數量
+            decision: numpy.ndarray, 決策欄位的整數編碼
+
+        Returns:
+            numpy.ndarray(bool), 長度為 n_classes, True 代表該類別為純類別
+    """
+    valid = labels >= 0
+    lab = labels[valid]
+    dec = decision[valid]
+
+    representative = np.full(n_classes, -1, dtype=np.int64)
+    representative[lab] = dec  # 任取一個決策值作為代表
+    conflict = dec != representative[lab]
+
+    pure = np.ones(n_classes, dtype=bool)
+    pure[lab[conflict]] = False
+    return pure
+
+
+def distinct_rows(table: EncodedTable, columns: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+        找出 columns 上不同的值組合(缺值也視為一個值)
+
+        Parameters:
+            table: EncodedTable, 整數編碼的決策表
+            columns: list[str], 欄位
+
+        Returns:
+            (labels, first_rows)
+                labels: numpy.ndarray, 每一列所屬的值組合(依首次出現的順序編號)
+                first_rows: numpy.ndarray, 每個值組合第一次出現的列位置(由小到大)
+    """
+    labels = np.zeros(len(table), dtype=np.int64)
+    for col in columns:
+        labels, n_distinct = refine_labels(labels, table.codes[col].astype(np.int64) + 1)
+    first_rows = np.unique(labels, return_index=True)[1]
+    return labels, first_rows
+
+
+def lookup_rows(data_codes: list[np.ndarray], query_codes: list[np.ndarray]) -> np.ndarray:
+    """
+        找出每個查詢的值組合在資料中對應的列(資料的值組合需不重複，例如分割中每個類別的代表物件)
+
+        資料與查詢一起做一次分組，不需要逐一查詢過濾資料
+
+        Parameters:
+            data_codes: list[numpy.ndarray], 每個欄位的資料編碼
+            query_codes: list[numpy.ndarray], 與 data_codes 對應的查詢編碼, -1 代表資料中不存在的值
+
+        Returns:
+            numpy.ndarray, 每個查詢對應的資料列位置, -1 代表沒有對應
+    """
+    assert len(data_codes) > 0 and len(data_codes) == len(query_codes), "data_codes 與 query_codes 需要有相同且至少一個欄位"
+    n_data = len(data_codes[0])
+    n_query = len(query_codes[0])
+
+    labels = None
+    for data, query in zip(data_codes, query_codes):
+        stacked = np.concatenate([data.astype(np.int64), query.astype(np.int64)]) + 1
+        labels, n_labels = refine_labels(labels, stacked)
+    owner = np.full(n_labels, -1, dtype=np.int64)
+    owner[labels[:n_data]] = np.arange(n_data)
+    found = owner[labels[n_data:]]
+
+    for query in query_codes:
+        found[query < 0] = -1
+    return found
@@ -1,5 +1,11 @@
+import numpy as np
 import pandas as pd
+from .encoding import encode_table, lookup_rows
+from .partition import PartitionCache
+from .profiling import profiled
+from .progress import ProgressReporter, release_on_cancel
 
+@profiled("evaluate.calculate_rules_ratio")
 def calculate_rules_ratio(target_dict: dict, dada_df, name_col=None) -> float:
     """
         計算 給定的規則條件 佔 所有資料 的比例
@@ -32,6 +38,7 @@ def row2dict(row, target_cols):
             retr_dict[key] = None
     return retr_dict
 
+@profiled("evaluate.evaluate_metrics")
 def evaluate_metrics(target_dict, df_data, name_col, feature_col, decision_col) -> dict:
         """
             計算 target_dict 規則 在 df_data中的 support, confidence, lift        
@@ -54,4 +61,105 @@ def evaluate_metrics(target_dict, df_data, name_col, feature_col, decision_col)
             "confidence": xy_score / x_score if x_score != 0 else None,
             "lift": xy_score / (x_score * y_score) if x_score != 0 and y_score != 0 else None
         }
-        return metrics
\ No newline at end of file
+        return metrics
+
+
+@profiled("evaluate.count_rules_matches")
+def count_rules_matches(rule_values: dict, partitions: PartitionCache, cols: list[str], reporter: ProgressReporter = None) -> np.ndarray:
+    """
+        計算每條規則在資料中符合的筆數
+        
+        規則依照「有限制的欄位組合」分組，每一組從分割快取取得資料的等價類別，
+        再將規則對應到類別，以類別大小作為符合筆數
+        
+        Parameters:
+            rule_values: dict[str, numpy.ndarray], 每個欄位的規則值(object 陣列), None/NaN 代表不限制
+            partitions: PartitionCache, 資料的分割快取
+            cols: list[str], 要比對的欄位
+            reporter: ProgressReporter, 每一組規則完成後回報進度並檢查是否取消
+            
+        Returns:
+            numpy.ndarray, 每條規則符合的資料筆數
+    """
+    table = partitions.table
+    n_rules = len(rule_values[cols[0]]) if cols else 0
+    wildcard = np.column_stack([pd.isna(rule_values[col]) for col in cols]) if cols else np.zeros((0, 0), dtype=bool)
+    # 將規則值轉換成資料的編碼，資料中不存在的值為 -1
+    codes = {}
+    for col in cols:
+        values = rule_values[col]
+        codes[col] = np.full(n_rules, -1, dtype=np.int64)
+        restricted = ~pd.isna(values)
+        if restricted.any():
+            codes[col][restricted] = table.categories[col].get_indexer(pd.Index(list(values[restricted]), dtype=object))
+    
+    matched = np.zeros(n_rules, dtype=np.int64)
+    patterns, pattern_ids = np.unique(wildcard, axis=0, return_inverse=True)
+    for i, pattern in enumerate(patterns):
+        rules = np.flatnonzero(pattern_ids.ravel() == i)
+        pattern_cols = [col for col, is_wildcard in zip(cols, pattern) if not is_wildcard]
+        if not pattern_cols:
+            matched[rules] = len(table) # 沒有任何限制，符合所有資料
+            if reporter is not None:
+                reporter.advance(len(rules))
+            continue
+        partition = partitions.get(pattern_cols)
+        representatives = partition.representatives
+        classes = lookup_rows(
+            [table.codes[col][representatives] for col in pattern_cols],
+            [codes[col][rules] for col in pattern_cols],
+        )
+        # 找不到類別的規則(包括整組欄位皆為缺值、沒有任何類別時)符合 0 筆
+        found = classes >= 0
+        matched[rules[found]] = partition.sizes[classes[found]]
+        if reporter is not None:
+            reporter.advance(len(rules))
+    return matched
+
+
+@profiled("evaluate.evaluate_rules")
+@release_on_cancel
+def evaluate_rules(rules_df, data_df, name_col, feature_col, decision_col, support=True, confidence=True, lift=True,
+                   progress=None, cancel=None) -> pd.DataFrame:
+    """
+        一次計算所有規則在 data_df 中的 support, confidence, lift
+        
+        結果與逐條呼叫 evaluate_metrics 相同；evaluate_metrics 回傳 None 的情況(分母為 0)以 NaN 表示，
+        讓欄位維持 float64(原本逐列以 Series.apply 取出指標時，pandas 也會把 None 轉成 NaN)
+        
+        Parameters:
+            rules_df: pandas.DataFrame, 規則, None/NaN 代表不限制
+            data_df: pandas.DataFrame, 資料
+            name_col: str, 物件名稱欄位
+            feature_col: list[str], 特徵欄位
+            decision_col: str, 決策欄位
+            support, confidence, lift: bool, 是否計算該指標，只會計算需要的符合筆數
+            progress: callable, 每一組規則完成後呼叫 progress("metrics", 已完成的規則數, 總規則數)，每種符合筆數各算一次
+            cancel: CancelToken, 被取消時拋出 progress.Cancelled
+            
+        Returns:
+            pandas.DataFrame, 欄位為 support, confidence, lift(依設定), index 與 rules_df 相同
+    """
+    cols = [col for col in feature_col + [decision_col] if col != name_col]
+    table = encode_table(data_df, cols)
+    partitions = PartitionCache(table, maxsize=None) # X 與 XY 的等價類別可以互相細分
+    rule_values = {col: rules_df[col].to_numpy(dtype=object) for col in cols}
+    features = [col for col in feature_col if col != name_col]
+    n = len(table)
+    reporter = ProgressReporter(progress, cancel, "metrics", len(rules_df) * (1 + (confidence or lift) + lift))
+    
+    x_score = count_rules_matches(rule_values, partitions, features, reporter) / n
+    if confidence or lift:
+        xy_score = count_rules_matches(rule_values, partitions, features + [decision_col], reporter) / n
+    if lift:
+        y_score = count_rules_matches(rule_values, partitions, [decision_col], reporter) / n
+    
+    metrics = pd.DataFrame(index=rules_df.index)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if support:
+            metrics["support"] = x_score
+        if confidence:
+            metrics["confidence"] = np.where(x_score != 0, xy_score / x_score, np.nan)
+        if lift:
+            metrics["lift"] = np.where((x_score != 0) & (y_score != 0), xy_score / (x_score * y_score), np.nan)
+    return metrics
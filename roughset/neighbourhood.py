@@ -0,0 +1,160 @@
+import numpy as np
+
+from .encoding import EncodedTable, refine_labels
+
+_MAX_PAIRS = 1 << 22 # 多個數值屬性時，每批展開的候選(物件, 鄰居)數量上限
+
+
+def numeric_values(table: EncodedTable, col: str) -> np.ndarray:
+    """
+        將數值欄位的編碼轉換回數值，缺值為 NaN
+    """
+    categories = table.categories[col]
+    assert categories is not None and categories.dtype.kind in "iufb", f"{col} 不是數值欄位，無法使用 δ 鄰域"
+    codes = table.codes[col]
+    values = np.asarray(categories, dtype=float)[np.maximum(codes, 0)] if len(categories) else np.zeros(len(codes))
+    return np.where(codes >= 0, values, np.nan)
+
+
+def _missing_patterns(table: EncodedTable, attrs: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    # 每個物件的缺值模式(以位元表示哪些屬性為缺值)
+    pattern = np.zeros(len(table), dtype=np.int64)
+    for j, col in enumerate(attrs):
+        pattern |= (table.codes[col] < 0).astype(np.int64) << j
+    return np.unique(pattern, return_inverse=True)
+
+
+def _windows(x_keys, y_keys, x_values, y_values, delta):
+    """
+        將 Y 依 (類別, 數值) 排序，找出每個 X 的鄰居在排序後的範圍 [lo, hi)
+
+        數值先轉換成在 X ∪ Y 中的名次，與類別合併成整數鍵，因此 y ∈ [x - δ, x + δ] 的判斷沒有浮點誤差
+    """
+    if x_values is None:
+        order = np.argsort(y_keys, kind="stable")
+        sorted_keys = y_keys[order]
+        return order, np.searchsorted(sorted_keys, x_keys, "left"), np.searchsorted(sorted_keys, x_keys, "right")
+    uniques = np.unique(np.concatenate([x_values, y_values]))
+    base = len(uniques) + 1
+    y_rank = np.searchsorted(uniques, y_values)
+    low_rank = np.searchsorted(uniques, x_values - delta, "left")
+    high_rank = np.searchsorted(uniques, x_values + delta, "right") - 1
+    y_composite = y_keys * base + y_rank
+    order = np.argsort(y_composite, kind="stable")
+    sorted_keys = y_composite[order]
+    lo = np.searchsorted(sorted_keys, x_keys * base + low_rank, "left")
+    hi = np.searchsorted(sorted_keys, x_keys * base + high_rank, "right")
+    return order, lo, hi
+
+
+def _count_pairs(lo, hi, order, x_filter, y_filter, deltas, y_decision, width):
+    # 多個數值屬性：在第一個屬性的範圍內展開候選鄰居，再以其他屬性過濾
+    counts = np.zeros((len(lo), width), dtype=np.int64)
+    lengths = hi - lo
+    cumulative = np.cumsum(lengths)
+    start = 0
+    while start < len(lo):
+        budget = (cumulative[start - 1] if start else 0) + _MAX_PAIRS
+        stop = max(start + 1, int(np.searchsorted(cumulative, budget, "right")))
+        chunk = np.arange(start, stop)
+        start = stop
+        sizes = lengths[chunk]
+        xs = np.repeat(chunk, sizes)
+        offsets = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        ys = order[np.repeat(lo[chunk], sizes) + offsets]
+        keep = np.ones(len(xs), dtype=bool)
+        for x_values, y_values, delta in zip(x_filter, y_filter, deltas):
+            keep &= (y_values[ys] >= x_values[xs] - delta) & (y_values[ys] <= x_values[xs] + delta)
+        np.add.at(counts, (xs[keep], y_decision[ys[keep]]), 1)
+    return counts
+
+
+def neighbour_counts(table: EncodedTable, attrs: list[str], decision: np.ndarray, n_decisions: int,
+                     delta: dict = None) -> np.ndarray:
+    """
+        計算每個物件的鄰域中各決策值的物件數量
+
+        y 在 x 的鄰域中，若對每個屬性 a:
+            - a(x) 或 a(y) 為缺值(容忍關係，缺值可以與任何值相符)
+            - a 在 delta 中(數值屬性): a(x) - δ_a <= a(y) <= a(x) + δ_a
+            - 其他屬性: a(x) == a(y)
+        沒有數值屬性也沒有缺值時，鄰域就是等價類別
+
+        依缺值模式分組，每一對模式只比較兩者都有值的屬性：類別屬性以整數鍵分組，
+        第一個數值屬性以排序後的二分搜尋找出範圍，因此不需要 O(n²) 的兩兩比較；
+        只有一個數值屬性時以累加和計數，多個數值屬性時才在範圍內逐一過濾其他數值屬性
+
+        Parameters:
+            table: EncodedTable, 整數編碼的決策表
+            attrs: list[str], 條件屬性
+            decision: numpy.ndarray, 決策欄位的整數編碼, -1 代表缺值
+            n_decisions: int, 決策值數量
+            delta: dict[str, float], 數值屬性的鄰域半徑 δ, None 代表沒有數值屬性
+
+        Returns:
+            numpy.ndarray(int64), shape 為 (物件數量, n_decisions + 1)，最後一欄為決策缺值的數量，
+                與 Partition.decision_counts 的格式相同(每個物件視為一個類別)
+    """
+    delta = delta or {}
+    for col in list(attrs) + list(delta):
+        assert col in table.codes, f"{col} not in {table.columns}"
+    assert set(delta) <= set(attrs), f"delta 的欄位需要在 attrs 中：{list(delta)}"
+    numeric = {col: numeric_values(table, col) for col in attrs if col in delta}
+    width = n_decisions + 1
+    decision = np.where(decision < 0, n_decisions, decision).astype(np.int64)
+
+    patterns, pattern_ids = _missing_patterns(table, attrs)
+    groups = [np.flatnonzero(pattern_ids == i) for i in range(len(patterns))]
+    counts = np.zeros((len(table), width), dtype=np.int64)
+    for x_pattern, x_rows in zip(patterns, groups):
+        for y_pattern, y_rows in zip(patterns, groups):
+            common = [col for j, col in enumerate(attrs) if not (int(x_pattern) | int(y_pattern)) >> j & 1]
+            categorical = [col for col in common if col not in delta]
+            numerical = [col for col in common if col in delta]
+
+            # X 與 Y 一起分組，類別屬性相同的物件有相同的鍵
+            rows = np.concatenate([x_rows, y_rows])
+            keys = None
+            for col in categorical:
+                keys, _ = refine_labels(keys, table.codes[col][rows])
+            keys = np.zeros(len(rows), dtype=np.int64) if keys is None else keys
+            x_keys, y_keys = keys[:len(x_rows)], keys[len(x_rows):]
+
+            first = numerical[0] if numerical else None
+            order, lo, hi = _windows(x_keys, y_keys,
+                                     numeric[first][x_rows] if first else None,
+                                     numeric[first][y_rows] if first else None,
+                                     delta.get(first, 0))
+            y_decision = decision[y_rows]
+            if len(numerical) <= 1:
+                one_hot = np.zeros((len(y_rows) + 1, width), dtype=np.int64)
+                one_hot[np.arange(1, len(y_rows) + 1), y_decision[order]] = 1
+                cumulative = np.cumsum(one_hot, axis=0)
+                counts[x_rows] += cumulative[hi] - cumulative[lo]
+            else:
+                others = numerical[1:]
+                counts[x_rows] += _count_pairs(lo, hi, order,
+                                               [numeric[col][x_rows] for col in others],
+                                               [numeric[col][y_rows] for col in others],
+                                               [delta[col] for col in others], y_decision, width)
+    return counts
+
+
+def neighbours(table: EncodedTable, attrs: list[str], row: int, delta: dict = None) -> np.ndarray:
+    """
+        一個物件的鄰域(列位置)，判斷方式與 neighbour_counts 相同，只需要掃描一次決策表
+    """
+    delta = delta or {}
+    matched = np.ones(len(table), dtype=bool)
+    for col in attrs:
+        if col in delta:
+            values = numeric_values(table, col)
+            if np.isnan(values[row]):
+                continue
+            matched &= np.isnan(values) | ((values >= values[row] - delta[col]) & (values <= values[row] + delta[col]))
+        else:
+            codes = table.codes[col]
+            if codes[row] < 0:
+                continue
+            matched &= (codes < 0) | (codes == codes[row])
+    return np.flatnonzero(matched)
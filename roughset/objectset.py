@@ -0,0 +1,131 @@
+import numpy as np
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """
+        計算每一列 uint64 位元遮罩中 1 的數量
+
+        Parameters:
+            words: numpy.ndarray(uint64), shape 為 (n, n_words)
+
+        Returns:
+            numpy.ndarray(int64), 長度為 n
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    bits = np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=1)
+    return bits.sum(axis=1, dtype=np.int64)
+
+
+def pack_mask(mask: np.ndarray) -> np.ndarray:
+    """
+        將布林陣列壓縮成 uint64 位元陣列，第 i 個元素對應第 i 個位元(little endian)，多出來的位元為 0
+    """
+    n_words = (len(mask) + 63) // 64
+    padded = np.zeros(n_words * 8, dtype=np.uint8)
+    packed = np.packbits(mask, bitorder="little")
+    padded[:len(packed)] = packed
+    return padded.view("<u8")
+
+
+class ObjectSet:
+    """
+        以 uint64 位元陣列表示論域中物件(列位置)的集合
+
+        每個物件只佔 1 bit，聯集、交集、差集、子集合判斷與計數都是對整個陣列的向量運算；
+        只有在需要物件名稱時，才由 RoughSet 轉換成 Python 的 set
+
+        Attributes:
+            words: numpy.ndarray(uint64), 位元陣列
+            n: int, 論域大小(物件數量)
+    """
+
+    __slots__ = ("words", "n")
+
+    def __init__(self, words: np.ndarray, n: int):
+        assert len(words) == (n + 63) // 64, f"words 的長度需要是 {(n + 63) // 64}"
+        self.words = words
+        self.n = n
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> "ObjectSet":
+        return cls(pack_mask(np.asarray(mask, dtype=bool)), len(mask))
+
+    @classmethod
+    def from_indices(cls, indices, n: int) -> "ObjectSet":
+        mask = np.zeros(n, dtype=bool)
+        mask[np.asarray(indices, dtype=np.int64)] = True
+        return cls.from_mask(mask)
+
+    @classmethod
+    def empty(cls, n: int) -> "ObjectSet":
+        return cls(np.zeros((n + 63) // 64, dtype=np.uint64), n)
+
+    @classmethod
+    def full(cls, n: int) -> "ObjectSet":
+        return ~cls.empty(n)
+
+    def to_mask(self) -> np.ndarray:
+        return np.unpackbits(self.words.view(np.uint8), count=self.n, bitorder="little").astype(bool)
+
+    def to_indices(self) -> np.ndarray:
+        return np.flatnonzero(self.to_mask())
+
+    def __len__(self) -> int:
+        return int(popcount(self.words[None, :])[0]) if len(self.words) else 0
+
+    def __repr__(self) -> str:
+        return f"ObjectSet(n_objects={len(self)}, universe={self.n})"
+
+    def __contains__(self, index: int) -> bool:
+        return bool(self.words[index >> 6] >> np.uint64(index & 63) & np.uint64(1))
+
+    def __iter__(self):
+        return iter(self.to_indices().tolist())
+
+    def _check(self, other: "ObjectSet"):
+        assert isinstance(other, ObjectSet) and other.n == self.n, "只能與相同論域的 ObjectSet 運算"
+
+    def __or__(self, other: "ObjectSet") -> "ObjectSet":
+        self._check(other)
+        return ObjectSet(self.words | other.words, self.n)
+
+    def __and__(self, other: "ObjectSet") -> "ObjectSet":
+        self._check(other)
+        return ObjectSet(self.words & other.words, self.n)
+
+    def __sub__(self, other: "ObjectSet") -> "ObjectSet":
+        self._check(other)
+        return ObjectSet(self.words & ~other.words, self.n)
+
+    def __xor__(self, other: "ObjectSet") -> "ObjectSet":
+        self._check(other)
+        return ObjectSet(self.words ^ other.words, self.n)
+
+    def __invert__(self) -> "ObjectSet":
+        # 論域中的補集，最後一個 word 多出來的位元保持為 0
+        words = ~self.words
+        if self.n % 64:
+            words[-1] &= np.uint64((1 << (self.n % 64)) - 1)
+        return ObjectSet(words, self.n)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ObjectSet):
+            return NotImplemented
+        return self.n == other.n and bool(np.array_equal(self.words, other.words))
+
+    def __le__(self, other: "ObjectSet") -> bool:
+        return self.issubset(other)
+
+    def __ge__(self, other: "ObjectSet") -> bool:
+        return other.issubset(self)
+
+    __hash__ = None
+
+    def issubset(self, other: "ObjectSet") -> bool:
+        self._check(other)
+        return not np.any(self.words & ~other.words)
+
+    def isdisjoint(self, other: "ObjectSet") -> bool:
+        self._check(other)
+        return not np.any(self.words & other.words)
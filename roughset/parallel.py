@@ -0,0 +1,278 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .encoding import EncodedTable
+from .partition import PartitionCache
+
+_POLL_SECONDS = 0.05 # 等待區塊完成時檢查取消的間隔
+
+
+def resolve_n_jobs(n_jobs) -> int:
+    """
+        將 n_jobs 轉換成行程數量：None 為 1，負數代表 CPU 數量加一減去 |n_jobs| (-1 為全部 CPU)
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        n_jobs = (os.cpu_count() or 1) + 1 + n_jobs
+    return max(1, n_jobs)
+
+
+class SharedTable:
+    """
+        將整數編碼的決策表放進 multiprocessing.shared_memory，讓子行程不需要複製資料就能讀取
+
+        以 with 使用，離開時釋放共享記憶體；共享記憶體最後一個 byte 為停止旗標，
+        因例外(例如取消)離開時會先設定旗標，執行中的子行程在下一個組合之間檢查到後停止
+
+        Parameters:
+            table: EncodedTable, 整數編碼的決策表
+            columns: list[str], 要共享的欄位
+    """
+
+    def __init__(self, table: EncodedTable, columns: list[str]):
+        self.columns = list(columns)
+        dtype = np.result_type(*[table.codes[col].dtype for col in self.columns]) if self.columns else np.int8
+        shape = (len(self.columns), len(table))
+        self._shm = shared_memory.SharedMemory(create=True, size=_flag_offset(shape, dtype) + 1)
+        self._shm.buf[_flag_offset(shape, dtype)] = 0
+        codes = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        for i, col in enumerate(self.columns):
+            codes[i] = table.codes[col]
+        self.spec = (self._shm.name, shape, np.dtype(dtype).str, self.columns)
+
+    def __enter__(self) -> "SharedTable":
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self.stop()
+        self._shm.close()
+        self._shm.unlink()
+
+    def stop(self):
+        # 通知執行中的子行程停止
+        name, shape, dtype, columns = self.spec
+        self._shm.buf[_flag_offset(shape, dtype)] = 1
+
+
+def _flag_offset(shape, dtype) -> int:
+    return int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+
+def _stopped(shm: shared_memory.SharedMemory, spec) -> bool:
+    name, shape, dtype, columns = spec
+    return shm.buf[_flag_offset(shape, dtype)] != 0
+
+
+@contextmanager
+def pool(executor_cls, n_jobs: int):
+    """
+        建立行程池或執行緒池；因例外(例如取消)離開時取消尚未開始的區塊，且不等待執行中的區塊
+
+        執行中的區塊以 SharedTable 的停止旗標(或執行緒的停止事件)在下一個組合之間停止
+    """
+    executor = executor_cls(max_workers=n_jobs)
+    try:
+        yield executor
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+
+
+def gather(futures: list, reporter=None, units: list[int] = None):
+    """
+        依完成的順序產生 (區塊位置, 結果)
+
+        等待時每 _POLL_SECONDS 秒檢查一次取消，不需要等執行中的區塊完成就能拋出 Cancelled
+
+        Parameters:
+            futures: list[Future], 每個區塊的 Future
+            reporter: ProgressReporter, 每個區塊完成後回報 units[i] 的進度
+            units: list[int], 每個區塊的進度單位
+    """
+    position = {future: i for i, future in enumerate(futures)}
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=_POLL_SECONDS, return_when=FIRST_COMPLETED)
+        if reporter is not None:
+            reporter.check()
+        for future in sorted(done, key=position.get):
+            i = position[future]
+            yield i, future.result()
+            if reporter is not None:
+                reporter.advance(units[i])
+
+
+def attach_table(spec) -> tuple[shared_memory.SharedMemory, EncodedTable]:
+    """
+        在子行程中以 SharedTable.spec 取得共享的決策表(值字典為空，只能使用編碼)
+
+        Returns:
+            (shm, table): 使用完畢後需要呼叫 shm.close()
+    """
+    name, shape, dtype, columns = spec
+    shm = shared_memory.SharedMemory(name=name)
+    codes = np.ndarray(shape, dtype=dtype, buffer=shm.buf[:_flag_offset(shape, dtype)])
+    table = EncodedTable({col: codes[i] for i, col in enumerate(columns)}, {col: None for col in columns})
+    return shm, table
+
+
+def _consistent_worker(spec, feature_col: list[str], decision_col: str, subsets: list[tuple]) -> list[np.ndarray]:
+    # 子行程：計算每個特徵組合下的一致物件，以位元壓縮回傳；已取消時回傳 None
+    try:
+        shm, table = attach_table(spec)
+    except FileNotFoundError: # 取消後共享記憶體已釋放
+        return None
+    try:
+        return _consistent_packed(table, feature_col, decision_col, subsets, lambda: _stopped(shm, spec))
+    finally:
+        del table # 需要先釋放指向共享記憶體的陣列才能 close
+        shm.close()
+
+
+def _consistent_packed(table: EncodedTable, feature_col: list[str], decision_col: str, subsets: list[tuple],
+                       stopped=None) -> list[np.ndarray]:
+    from .reduct import consistent_mask
+
+    partitions = PartitionCache(table, maxsize=len(feature_col))
+    decision = table.codes[decision_col]
+    masks = []
+    for features in subsets:
+        if stopped is not None and stopped():
+            return None
+        masks.append(np.packbits(consistent_mask(partitions.get([feature_col[i] for i in features]), decision)))
+    return masks
+
+
+def consistent_masks(table: EncodedTable, feature_col: list[str], decision_col: str, subsets: list[tuple],
+                     n_jobs: int, executor: ProcessPoolExecutor = None, spec=None, reporter=None) -> list[np.ndarray]:
+    """
+        以多個行程計算每個特徵組合下的一致物件(位元壓縮)，結果依 subsets 的順序排列，與單一行程相同
+
+        特徵組合依字典序切成連續的區塊，讓同一個行程可以從前一個組合的分割細分
+
+        Parameters:
+            table: EncodedTable, 整數編碼的決策表
+            feature_col: list[str], 特徵欄位
+            decision_col: str, 決策欄位
+            subsets: list[tuple], 特徵組合
+            n_jobs: int, 行程數量
+            executor, spec: 已建立的行程池(parallel.pool)與 SharedTable.spec，用來在多次呼叫間共用
+            reporter: ProgressReporter, 每個區塊完成後回報進度，等待時每 _POLL_SECONDS 秒檢查是否取消；
+                取消時不再執行尚未開始的區塊，執行中的區塊由 SharedTable 的停止旗標停止
+
+        Returns:
+            list[numpy.ndarray(uint8)], 與 subsets 對應，np.packbits 後的一致物件遮罩
+    """
+    if not subsets:
+        return []
+    order = sorted(range(len(subsets)), key=lambda i: subsets[i])
+    n_chunks = min(len(order), n_jobs * 4)
+    chunks = [list(chunk) for chunk in np.array_split(order, n_chunks)]
+
+    def run(executor, spec):
+        futures = [executor.submit(_consistent_worker, spec, feature_col, decision_col, [subsets[i] for i in chunk])
+                   for chunk in chunks]
+        masks = [None] * len(subsets)
+        for j, chunk_masks in gather(futures, reporter, [len(chunk) * len(table) for chunk in chunks]):
+            for i, mask in zip(chunks[j], chunk_masks):
+                masks[i] = mask
+        return masks
+
+    if executor is not None:
+        return run(executor, spec)
+    with SharedTable(table, feature_col + [decision_col]) as shared, pool(ProcessPoolExecutor, n_jobs) as executor:
+        return run(executor, shared.spec)
+
+
+def _statistics_packed(table: EncodedTable, subsets: list[tuple], decision_col: str, n_decisions: int,
+                       partitions: PartitionCache = None, reporter=None, stopped=None) -> np.ndarray:
+    # reporter: 不平行時每個組合完成後回報進度；stopped: 平行時每個組合之前檢查是否需要停止，停止時回傳 None
+    partitions = partitions or PartitionCache(table, maxsize=max([len(subset) for subset in subsets], default=1))
+    decision = table.codes[decision_col]
+    result = np.zeros((len(subsets), 2), dtype=np.int64)
+    for i, subset in enumerate(subsets):
+        if stopped is not None and stopped():
+            return None
+        partition = partitions.get(subset)
+        counts = partition.decision_counts(decision, n_decisions)
+        pure = (counts > 0).sum(axis=1) == 1
+        result[i] = partition.n_classes, counts[pure, :-1].sum()
+        if reporter is not None:
+            reporter.advance(1)
+    return result
+
+
+def _statistics_worker(spec, subsets: list[tuple], decision_col: str, n_decisions: int) -> np.ndarray:
+    # 子行程：計算每個屬性組合的類別數量與正域物件數量；已取消時回傳 None
+    try:
+        shm, table = attach_table(spec)
+    except FileNotFoundError:
+        return None
+    try:
+        return _statistics_packed(table, subsets, decision_col, n_decisions, stopped=lambda: _stopped(shm, spec))
+    finally:
+        del table
+        shm.close()
+
+
+def subset_statistics(table: EncodedTable, subsets: list[tuple], decision_col: str, n_jobs: int = 1,
+                      backend: str = "process", partitions: PartitionCache = None, reporter=None) -> np.ndarray:
+    """
+        計算每個屬性組合的類別數量與正域 POS_B(D) 的物件數量
+
+        Parameters:
+            table: EncodedTable, 整數編碼的決策表
+            subsets: list[tuple[str]], 屬性組合
+            decision_col: str, 決策欄位
+            n_jobs: int, 平行數量
+            backend: str, default "process"
+                - "process": 行程池，決策表放在共享記憶體中
+                - "thread": 執行緒池，直接共用同一個決策表
+            partitions: PartitionCache, 不平行計算時使用的分割快取
+            reporter: ProgressReporter, 回報完成的組合數量；不平行時每個組合之後檢查是否取消，
+                平行時等待中每 _POLL_SECONDS 秒檢查，取消時執行中的區塊在下一個組合之前停止
+
+        Returns:
+            numpy.ndarray(int64), shape 為 (len(subsets), 2)，欄位為 (類別數量, 正域物件數量)
+    """
+    assert backend in ("process", "thread"), f"backend must be process or thread, got {backend}"
+    n_decisions = table.cardinality(decision_col)
+    subsets = [tuple(subset) for subset in subsets]
+    if n_jobs <= 1 or len(subsets) <= 1:
+        return _statistics_packed(table, subsets, decision_col, n_decisions, partitions, reporter)
+
+    # 依欄位順序排序後切成連續的區塊，讓同一個區塊中的組合可以互相細分
+    order = sorted(range(len(subsets)), key=lambda i: sorted(table.columns.index(col) for col in subsets[i]))
+    chunks = [list(chunk) for chunk in np.array_split(order, min(len(order), n_jobs * 4))]
+    result = np.zeros((len(subsets), 2), dtype=np.int64)
+    if backend == "thread":
+        stop = threading.Event()
+        try:
+            with pool(ThreadPoolExecutor, n_jobs) as executor:
+                # 每個工作在呼叫者 context 的複本中執行，讓呼叫者啟用的 Profiler 可以記錄
+                futures = [executor.submit(contextvars.copy_context().run, _statistics_packed, table, [subsets[i] for i in chunk],
+                                           decision_col, n_decisions, stopped=stop.is_set)
+                           for chunk in chunks]
+                for j, chunk_result in gather(futures, reporter, [len(chunk) for chunk in chunks]):
+                    result[chunks[j]] = chunk_result
+        except BaseException:
+            stop.set()
+            raise
+        return result
+
+    columns = sorted({col for subset in subsets for col in subset} | {decision_col}, key=table.columns.index)
+    with SharedTable(table, columns) as shared, pool(ProcessPoolExecutor, n_jobs) as executor:
+        futures = [executor.submit(_statistics_worker, shared.spec, [subsets[i] for i in chunk], decision_col, n_decisions)
+                   for chunk in chunks]
+        for j, chunk_result in gather(futures, reporter, [len(chunk) for chunk in chunks]):
+            result[chunks[j]] = chunk_result
+    return result
@@ -0,0 +1,437 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .contingency import Contingency
+from .encoding import refine_labels
+from .objectset import ObjectSet
+from .profiling import count, stage
+
+
+class Partition:
+    """
+        一組屬性在論域上形成的分割(等價類別)
+
+        Attributes:
+            attrs: frozenset[str], 形成分割的屬性
+            labels: numpy.ndarray, 每個物件所屬的類別(依首次出現的順序編號), -1 代表該物件在某個屬性上有缺值
+            n_classes: int, 類別數量
+    """
+
+    def __init__(self, attrs: frozenset, labels: np.ndarray, n_classes: int):
+        self.attrs = attrs
+        self.labels = labels
+        self.n_classes = n_classes
+        self._order = None
+        self._offsets = None
+        self._decision_counts = None
+        self._contingency = None
+        self._keys = None
+        self._canonical = True # 類別是否依首次出現的順序編號且沒有空類別
+
+    def __repr__(self) -> str:
+        return f"Partition(attrs={sorted(self.attrs)}, n_classes={self.n_classes})"
+
+    def _build_indices(self):
+        self._canonicalize()
+        # 將物件依類別排序，第 i 個類別的物件位於 order[offsets[i]:offsets[i+1]]
+        valid = np.flatnonzero(self.labels >= 0)
+        self._order = valid[np.argsort(self.labels[valid], kind="stable")]
+        sizes = np.bincount(self.labels[valid], minlength=self.n_classes)
+        self._offsets = np.concatenate([[0], np.cumsum(sizes)])
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """
+            每個類別的物件數量
+        """
+        if self._decision_counts is not None:
+            return self._decision_counts.sum(axis=1)
+        if self._offsets is None:
+            return np.bincount(self.labels[self.labels >= 0], minlength=self.n_classes)
+        return np.diff(self._offsets)
+
+    @property
+    def representatives(self) -> np.ndarray:
+        """
+            每個類別第一個物件的列位置
+        """
+        self._canonicalize()
+        # 類別依首次出現的順序編號，每個新類別第一次出現時，累積最大值會加一
+        running = np.maximum.accumulate(np.concatenate([[-1], self.labels]))
+        return np.flatnonzero(np.diff(running) > 0)
+
+    def class_indices(self, i: int) -> np.ndarray:
+        """
+            第 i 個類別中物件的列位置(由小到大)
+        """
+        if self._order is None:
+            self._build_indices()
+        return self._order[self._offsets[i]:self._offsets[i + 1]]
+
+    def classes(self) -> list[np.ndarray]:
+        """
+            所有類別中物件的列位置
+        """
+        self._canonicalize()
+        return [self.class_indices(i) for i in range(self.n_classes)]
+
+    def decision_counts(self, decision: np.ndarray, n_decisions: int) -> np.ndarray:
+        """
+            以一次 bincount 計算每個類別中各決策值的物件數量，第一次計算後保留
+
+            Parameters:
+                decision: numpy.ndarray, 決策欄位的整數編碼, -1 代表缺值
+                n_decisions: int, 決策值數量
+
+            Returns:
+                numpy.ndarray, shape 為 (n_classes, n_decisions + 1), 最後一欄為決策缺值的數量
+        """
+        if self._decision_counts is None:
+            count("partition.decision_counts")
+            valid = self.labels >= 0
+            dec = np.where(decision[valid] < 0, n_decisions, decision[valid])
+            pairs = self.labels[valid] * (n_decisions + 1) + dec
+            counts = np.bincount(pairs, minlength=self.n_classes * (n_decisions + 1))
+            self._decision_counts = counts.reshape(self.n_classes, n_decisions + 1)
+        return self._decision_counts
+
+    def contingency(self, decision: np.ndarray, n_decisions: int) -> Contingency:
+        """
+            以一次雜湊分組計算 (類別, 決策值) 的稀疏列聯表，第一次計算後保留，參考 contingency.Contingency
+
+            Parameters:
+                decision: numpy.ndarray, 決策欄位的整數編碼, -1 代表缺值
+                n_decisions: int, 決策值數量
+        """
+        if self._contingency is None:
+            count("partition.contingency")
+            self._contingency = Contingency.from_labels(self.labels, self.n_classes, decision, n_decisions)
+        return self._contingency
+
+    def _canonicalize(self):
+        # 移除物件後可能有空類別，且類別不再依首次出現的順序編號；需要時才重新編號
+        if self._canonical:
+            return
+        rows = np.flatnonzero(self.labels >= 0)[::-1]
+        first = np.full(self.n_classes, -1, dtype=np.int64)
+        first[self.labels[rows]] = rows
+        kept = np.flatnonzero(first >= 0)
+        kept = kept[np.argsort(first[kept], kind="stable")]
+        mapping = np.full(self.n_classes + 1, -1, dtype=np.int64) # 最後一個位置給 -1 使用
+        mapping[kept] = np.arange(len(kept))
+        self.labels = mapping[self.labels]
+        self.n_classes = len(kept)
+        self._contingency = None
+        if self._decision_counts is not None:
+            self._decision_counts = self._decision_counts[kept]
+        self._order = self._offsets = self._keys = None
+        self._canonical = True
+
+    def _key_index(self, table, attrs: list[str]) -> dict:
+        # (屬性編碼, ...) -> 類別，第一次需要時由每個類別的代表物件建立
+        if self._keys is None:
+            representatives = self.representatives
+            # 沒有屬性時所有物件同一類別，鍵為空的 tuple
+            keys = zip(*[table.codes[col][representatives].tolist() for col in attrs]) if attrs else [()] * len(representatives)
+            self._keys = dict(zip(keys, range(self.n_classes)))
+        return self._keys
+
+    def extend(self, table, start: int, decision: np.ndarray = None, n_decisions: int = None):
+        """
+            將資料表從 start 開始的新物件加入分割(原地修改)，只查詢新物件的類別，不重新分組既有的物件
+
+            Parameters:
+                table: EncodedTable, 已加入新物件的資料表
+                start: int, 第一個新物件的列位置
+                decision: numpy.ndarray, 決策欄位的整數編碼，用來更新已計算的 decision_counts
+                n_decisions: int, 決策值數量(可能因新物件而增加)
+        """
+        attrs = [col for col in table.columns if col in self.attrs]
+        n_new = len(table) - start
+        codes = [table.codes[col][start:].tolist() for col in attrs]
+        keys = self._key_index(table, attrs)
+        new_labels = np.empty(n_new, dtype=np.int64)
+        for i, key in enumerate(zip(*codes) if attrs else [()] * n_new):
+            if any(code < 0 for code in key):
+                new_labels[i] = -1
+                continue
+            label = keys.get(key)
+            if label is None:
+                label = keys[key] = self.n_classes
+                self.n_classes += 1
+            new_labels[i] = label
+        self.labels = np.concatenate([self.labels, new_labels])
+        self._order = self._offsets = self._contingency = None
+
+        if self._decision_counts is not None:
+            old = self._decision_counts
+            counts = np.zeros((self.n_classes, n_decisions + 1), dtype=old.dtype)
+            counts[:len(old), :old.shape[1] - 1] = old[:, :-1]
+            counts[:len(old), -1] = old[:, -1]
+            self._add_counts(counts, new_labels, decision[start:], n_decisions, 1)
+            self._decision_counts = counts
+
+    def remove(self, mask: np.ndarray, decision: np.ndarray = None, n_decisions: int = None):
+        """
+            從分割中移除 mask 為 True 的物件(原地修改)，只更新被移除物件所屬類別的數量
+
+            Parameters:
+                mask: numpy.ndarray(bool), 要移除的物件
+                decision: numpy.ndarray, 移除前的決策欄位整數編碼，用來更新已計算的 decision_counts
+                n_decisions: int, 決策值數量
+        """
+        if self._decision_counts is not None:
+            self._add_counts(self._decision_counts, self.labels[mask], decision[mask], n_decisions, -1)
+        self.labels = self.labels[~mask]
+        self._order = self._offsets = self._contingency = None
+        self._canonical = False
+
+    @staticmethod
+    def _add_counts(counts, labels, decision, n_decisions, sign):
+        valid = labels >= 0
+        dec = np.where(decision[valid] < 0, n_decisions, decision[valid])
+        np.add.at(counts, (labels[valid], dec), sign)
+
+    def refine(self, col: str, codes: np.ndarray) -> "Partition":
+        """
+            以一個欄位細分此分割
+        """
+        labels = None if not self.attrs else self.labels
+        new_labels, n_classes = refine_labels(labels, codes)
+        return Partition(self.attrs | {col}, new_labels, n_classes)
+
+
+class PartitionCache:
+    """
+        以屬性集合(frozenset)為鍵的分割快取，採用 LRU 策略
+
+        取得新的屬性集合時，會從快取中最大的子集合開始細分，而不是重新分組整個資料表
+
+        Parameters:
+            table: EncodedTable, 整數編碼的決策表
+            maxsize: int, 最多保留的分割數量, None 代表不限制
+    """
+
+    def __init__(self, table, maxsize: int = 128):
+        self.table = table
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._store = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, attrs) -> bool:
+        return frozenset(attrs) in self._store
+
+    def info(self) -> dict:
+        """
+            回傳快取的使用狀況
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._store),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self):
+        """
+            清除所有快取的分割與計數
+        """
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def extend(self, start: int, decision: np.ndarray = None, n_decisions: int = None):
+        """
+            資料表從 start 開始加入了新物件，更新所有快取的分割，參考 Partition.extend
+        """
+        for partition in self._store.values():
+            partition.extend(self.table, start, decision, n_decisions)
+
+    def remove(self, mask: np.ndarray, decision: np.ndarray = None, n_decisions: int = None):
+        """
+            資料表將要移除 mask 為 True 的物件，更新所有快取的分割，參考 Partition.remove
+        """
+        for partition in self._store.values():
+            partition.remove(mask, decision, n_decisions)
+
+    def add(self, partition: Partition):
+        """
+            放入已經計算好的分割(例如從磁碟讀取的分割)，超過上限時移除最久沒有使用的分割
+        """
+        assert len(partition.labels) == len(self.table), "分割的物件數量需要與資料表相同"
+        self._store[partition.attrs] = partition
+        self._store.move_to_end(partition.attrs)
+        if self.maxsize is not None and len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
+
+    def _root(self) -> Partition:
+        # 空的屬性集合：所有物件同一類別
+        n = len(self.table)
+        return Partition(frozenset(), np.zeros(n, dtype=np.int64), 1 if n else 0)
+
+    def _largest_cached_subset(self, key: frozenset):
+        best = None
+        for attrs, partition in self._store.items():
+            if attrs <= key and (best is None or len(attrs) > len(best.attrs)):
+                best = partition
+        return best
+
+    def get(self, attrs, base: Partition = None) -> Partition:
+        """
+            取得 attrs 的分割
+
+            Parameters:
+                attrs: iterable[str], 屬性
+                base: Partition, 已知的子集合分割，若有提供則從它開始細分
+
+            Returns:
+                Partition
+        """
+        key = frozenset(attrs)
+        for col in key:
+            assert col in self.table.codes, f"{col} not in {self.table.columns}"
+
+        if key in self._store:
+            self.hits += 1
+            count("partition.hits")
+            self._store.move_to_end(key)
+            return self._store[key]
+        self.misses += 1
+        count("partition.misses")
+
+        if base is None or not base.attrs <= key:
+            base = self._largest_cached_subset(key)
+        partition = base or self._root()
+        # 依欄位在資料表中的順序細分剩下的屬性
+        with stage("partition.compute", rows=len(self.table)):
+            for col in [c for c in self.table.columns if c in key - partition.attrs]:
+                partition = partition.refine(col, self.table.codes[col])
+
+        self._store[key] = partition
+        if self.maxsize is not None and len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
+        return partition
+
+
+def class_regions(counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+        由 (類別, 決策值) 的數量標記每個類別是純類別或混合類別
+
+        Parameters:
+            counts: numpy.ndarray, Partition.decision_counts 的結果
+
+        Returns:
+            (pure, touched)
+                pure: numpy.ndarray(bool), 類別只包含單一決策值
+                touched: numpy.ndarray(bool), touched[i, d] 代表類別 i 包含決策值 d
+    """
+    touched = counts > 0
+    pure = touched.sum(axis=1) == 1
+    return pure, touched
+
+
+def _check_beta(beta):
+    assert np.all((0.5 < np.asarray(beta)) & (np.asarray(beta) <= 1)), f"beta 需要在 (0.5, 1] 之間：{beta}"
+
+
+BETA_TOLERANCE = 1e-9 # 包含程度與 β 比較時容許的捨入誤差
+
+
+def beta_regions(inclusion: np.ndarray, exclusion: np.ndarray, beta) -> tuple[np.ndarray, np.ndarray]:
+    """
+        以 VPRS 的精確度 β 判斷類別是否在下近似(inclusion >= β)與上近似(exclusion < β)中
+
+        包含程度是浮點數比值，β 也可能是計算出來的值(例如 0.1 * 7 = 0.7000000000000001)，
+        因此以 β - BETA_TOLERANCE 比較：比值剛好等於 β(例如 7/10 與 β = 0.7)時在下近似中、不在上近似中；
+        空類別的比值為 NaN，兩者皆不包含
+
+        Parameters:
+            inclusion, exclusion: numpy.ndarray, class_inclusion 的結果
+            beta: float, VPRS 的精確度 β ∈ (0.5, 1]
+
+        Returns:
+            (lower, upper): numpy.ndarray(bool)
+    """
+    threshold = beta - BETA_TOLERANCE
+    return inclusion >= threshold, exclusion < threshold
+
+
+def class_inclusion(counts: np.ndarray, code: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+        每個類別 E 包含於決策類別 X 的程度 P(X|E) = |E ∩ X| / |E|，與不包含的程度 (|E| - |E ∩ X|) / |E|
+
+        以 VPRS(variable precision rough set) 的精確度 β 判斷：
+            下近似: P(X|E) >= β
+            上近似: (|E| - |E ∩ X|) / |E| < β，即 E 中不屬於 X 的比例小於 β(與 ¬X 的下近似互補)
+        比值以浮點數計算，與 β 的比較參考 beta_regions；β = 1 時與一般的下近似、上近似完全相同
+
+        Parameters:
+            counts: numpy.ndarray, Partition.decision_counts 的結果，|E| 包含決策值缺值的物件
+            code: int, 決策值的編碼, None 代表所有決策值(不含缺值)中最大的包含程度(與最小的不包含程度)
+
+        Returns:
+            (inclusion, exclusion): numpy.ndarray(float), 長度為類別數量
+    """
+    sizes = counts.sum(axis=1)
+    hits = counts[:, :-1].max(axis=1, initial=0) if code is None else counts[:, code]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return hits / sizes, (sizes - hits) / sizes
+
+
+def approximation_sets(labels: np.ndarray, counts: np.ndarray, code: int = None, beta: float = 1.0) -> tuple[ObjectSet, ObjectSet]:
+    """
+        計算一個決策值的下近似與上近似，以位元集合表示
+
+        Parameters:
+            labels: numpy.ndarray, 每個物件所屬的類別, -1 代表不屬於任何類別
+            counts: numpy.ndarray, Partition.decision_counts 的結果
+            code: int, 決策值的編碼, None 代表所有決策值(不含缺值)的聯集
+            beta: float, VPRS 的精確度 β ∈ (0.5, 1]，參考 class_inclusion，1 代表一般的粗糙集
+
+        Returns:
+            (lower, upper): ObjectSet
+    """
+    _check_beta(beta)
+    if len(counts) == 0:
+        return ObjectSet.empty(len(labels)), ObjectSet.empty(len(labels))
+    inclusion, exclusion = class_inclusion(counts, code)
+    class_lower, class_upper = beta_regions(inclusion, exclusion, beta)
+    valid = labels >= 0
+    lab = np.where(valid, labels, 0)
+    return ObjectSet.from_mask(class_lower[lab] & valid), ObjectSet.from_mask(class_upper[lab] & valid)
+
+
+def region_counts(counts: np.ndarray, betas, code: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+        一次計算多個 β 的下近似與上近似大小
+
+        每個類別的包含程度只計算一次並排序，每個 β 只需要一次二分搜尋
+
+        Parameters:
+            counts: numpy.ndarray, Partition.decision_counts 的結果
+            betas: array-like, VPRS 的精確度，每個都在 (0.5, 1] 之間
+            code: int, 決策值的編碼, None 代表所有決策值的聯集
+
+        Returns:
+            (lower, upper): numpy.ndarray(int64), 與 betas 對應的物件數量
+    """
+    betas = np.asarray(betas, dtype=float)
+    _check_beta(betas)
+    sizes = counts.sum(axis=1)
+    inclusion, exclusion = class_inclusion(counts, code)
+    # 與 beta_regions 相同，以 β - BETA_TOLERANCE 比較
+    thresholds = betas - BETA_TOLERANCE
+    # 包含程度由小到大排序，>= β 的類別在 searchsorted(β, "left") 之後
+    order = np.argsort(inclusion, kind="stable")
+    above = np.concatenate([np.cumsum(sizes[order][::-1])[::-1], [0]])
+    lower = above[np.searchsorted(inclusion[order], thresholds, side="left")]
+    # 不包含程度 < β 的類別在 searchsorted(β, "left") 之前
+    order = np.argsort(exclusion, kind="stable")
+    below = np.concatenate([[0], np.cumsum(sizes[order])])
+    upper = below[np.searchsorted(exclusion[order], thresholds, side="left")]
+    return lower.astype(np.int64), upper.astype(np.int64)
@@ -0,0 +1,136 @@
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# 目前啟用中的 Profiler；每個執行緒(例如 Streamlit 的每個 session)與 asyncio task 各自獨立，
+# 不會記錄到其他執行緒的工作
+_profilers = contextvars.ContextVar("roughset_profilers", default=())
+
+
+class Profiler:
+    """
+        記錄各個階段的執行時間、呼叫次數、掃描的資料列數，以及分割快取等計數
+
+        沒有啟用任何 Profiler 時，各階段的記錄只會檢查一次 tuple 是否為空，不會計時
+
+        Profiler 只在啟用它的執行緒(context)中記錄；其他執行緒需要以 contextvars.copy_context().run 執行才會被記錄
+
+        使用方式:
+            with profiling.profile() as profiler:
+                RS.create_reduct_rules()
+            profiler.to_frame()
+
+        階段的時間包含其中的子階段(例如 reduct.create_reduct_rules 包含 partition.compute)
+
+        Parameters:
+            callback: callable, 每個階段結束時呼叫 callback(name, seconds, rows)，例如用來即時輸出記錄
+
+        Attributes:
+            stages: dict[str, dict], 各階段的 calls, seconds, rows
+            counters: dict[str, int], 計數，例如 partition.hits, partition.misses
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.stages = {}
+        self.counters = {}
+        self._tokens = []
+
+    def __enter__(self) -> "Profiler":
+        self._tokens.append(_profilers.set(_profilers.get() + (self,)))
+        return self
+
+    def __exit__(self, *exc):
+        _profilers.reset(self._tokens.pop())
+
+    def __repr__(self) -> str:
+        return f"Profiler(n_stages={len(self.stages)}, counters={self.counters})"
+
+    def record(self, name: str, seconds: float, rows: int = 0):
+        stats = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "rows": 0})
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["rows"] += rows
+        if self.callback is not None:
+            self.callback(name, seconds, rows)
+
+    def increment(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        self.stages.clear()
+        self.counters.clear()
+
+    def to_dict(self) -> dict:
+        """
+            Returns:
+                dict: {"stages": {階段: {"calls", "seconds", "rows"}}, "counters": {名稱: 數量}}
+        """
+        return {
+            "stages": {name: dict(stats) for name, stats in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+            Returns:
+                pandas.DataFrame, index 為階段名稱，欄位為 calls, seconds, rows，依時間由多到少排列
+        """
+        frame = pd.DataFrame.from_dict(self.stages, orient="index", columns=["calls", "seconds", "rows"])
+        frame.index.name = "stage"
+        return frame.sort_values("seconds", ascending=False, kind="stable")
+
+
+def profile(callback=None) -> Profiler:
+    """
+        建立 Profiler，以 with 啟用；可以巢狀使用，每個啟用中的 Profiler 都會收到記錄
+    """
+    return Profiler(callback)
+
+
+@contextmanager
+def stage(name: str, rows: int = 0):
+    """
+        記錄一個階段的執行時間
+
+        Parameters:
+            name: str, 階段名稱
+            rows: int, 此階段掃描的資料列數
+    """
+    profilers = _profilers.get()
+    if not profilers:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for profiler in profilers:
+            profiler.record(name, elapsed, rows)
+
+
+def count(name: str, n: int = 1):
+    """
+        增加計數
+    """
+    for profiler in _profilers.get():
+        profiler.increment(name, n)
+
+
+def profiled(name: str):
+    """
+        將整個函式記錄為一個階段的 decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profilers.get():
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,83 @@
+import functools
+import threading
+import traceback
+
+
+class Cancelled(Exception):
+    """
+        計算被 CancelToken 取消
+    """
+
+
+class CancelToken:
+    """
+        合作式取消：其他執行緒(例如 UI)呼叫 cancel()，計算在下一個批次之間檢查到後拋出 Cancelled
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def __repr__(self) -> str:
+        return f"CancelToken(cancelled={self.cancelled})"
+
+    def cancel(self):
+        self._event.set()
+
+    def reset(self):
+        self._event.clear()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled("計算已取消")
+
+
+class ProgressReporter:
+    """
+        在批次之間檢查取消並回報進度
+
+        Parameters:
+            callback: callable, 呼叫 callback(stage, done, total)，None 代表不回報
+            cancel: CancelToken, None 代表不能取消
+            stage: str, 階段名稱
+                - "reduct": 單位為掃描的資料列數(物件數量 x 特徵組合數量)
+                - "metrics": 單位為規則數量(每個指標的符合筆數各算一次)
+                - "dependency": 單位為屬性組合數量
+            total: int, 總數量
+    """
+
+    def __init__(self, callback=None, cancel: CancelToken = None, stage: str = "", total: int = 0):
+        self.callback = callback
+        self.cancel = cancel
+        self.stage = stage
+        self.total = total
+        self.done = 0
+
+    def check(self):
+        # 只檢查取消，不增加進度
+        if self.cancel is not None:
+            self.cancel.check()
+
+    def advance(self, n: int = 1):
+        self.check()
+        self.done += n
+        if self.callback is not None:
+            self.callback(self.stage, self.done, self.total)
+
+
+def release_on_cancel(func):
+    """
+        被取消時清除 traceback 中已結束的 frame 的區域變數，
+        即使呼叫端保留 Cancelled 例外，分割、遮罩等中間結果也會立即釋放
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Cancelled as exc:
+            traceback.clear_frames(exc.__traceback__)
+            raise
+    return wrapper
@@ -1,5 +1,13 @@
+import numpy as np
 import pandas as pd
 from itertools import combinations
+from .encoding import encode_table, pure_classes, distinct_rows
+from .partition import PartitionCache
+from .rules import RuleSet
+from .profiling import profiled, stage
+from .progress import ProgressReporter, release_on_cancel
+from .parallel import SharedTable, consistent_masks, pool, resolve_n_jobs
+from concurrent.futures import ProcessPoolExecutor
 
 DEBUG = False
 
@@ -109,51 +117,303 @@ def filter_reduct_dict_by_row(row, name_col, decision_dict, reduct_dict):
 #%% 建立reduct rules dataframe
 def create_reduct_rules_by_row(df, row, columns, name_col, decision_col, reduct_result, include_empty=False):
 
-    # 針對產生出來的結果，建立一個新的dataframe
-    df_rule = pd.DataFrame(columns=columns)
-    # 先建立一個empty的row
-    empty_row = pd.Series([None] * len(columns), index=columns)
-
-
+    # 針對產生出來的結果，先收集成 list，最後一次建立 dataframe
+    records = []
+    
     for rule in reduct_result:
     
-        new_row = empty_row.copy()
+        new_row = dict.fromkeys(columns) # 先建立一個empty的row
         for feature in rule:
             new_row[feature] = row[feature]
         new_row[name_col] = row[name_col]
         new_row[decision_col] = row[decision_col]
+        records.append([new_row[col] for col in columns])
         
-        df_rule = pd.concat([df_rule, new_row.to_frame().T], ignore_index=True)
-        
-    # 若df_rule是空的，則仍然加入一個row
-    if df_rule.empty and include_empty:
-        new_row = empty_row.copy()
+    # 若沒有任何規則，則仍然加入一個row
+    if not records and include_empty:
+        new_row = dict.fromkeys(columns)
         new_row[name_col] = row[name_col]
-        df_rule = pd.concat([df_rule, new_row.to_frame().T], ignore_index=True)
+        records.append([new_row[col] for col in columns])
         
-    return df_rule
+    return pd.DataFrame(records, columns=columns, dtype=object)
+    
+
+
+#%% 以整數編碼計算每個特徵組合下的一致物件
+def iter_subset_partitions(partitions, feature_col):
+    """
+    依字典序深度優先走訪特徵組合(不含全部特徵)，並以父組合的分割細分出子組合的分割
+    partitions: PartitionCache, 分割快取
+    feature_col: list, 特徵欄位
+    
+    yield: (features, partition)
+        features: tuple, 特徵在 feature_col 中的位置
+        partition: Partition, 此特徵組合的分割, labels 為 -1 代表有缺值
+    """
+    num_features = len(feature_col)
     
+    def visit(prefix, parent, start):
+        for j in range(start, num_features):
+            features = prefix + (j,)
+            if len(features) == num_features:
+                continue
+            partition = partitions.get([feature_col[i] for i in features], base=parent)
+            yield features, partition
+            yield from visit(features, partition, j + 1)
+    
+    yield from visit((), None, 0)
+
+
+def consistent_mask(partition, decision):
+    """
+    回傳每個物件在此分割下是否一致(所屬類別為決策類別的子集合)
+    """
+    labels = partition.labels
+    pure = pure_classes(labels, partition.n_classes, decision)
+    # 有缺值的物件過濾後為空集合，空集合必定是決策類別的子集合
+    mask = np.ones(len(labels), dtype=bool)
+    valid = labels >= 0
+    mask[valid] = pure[labels[valid]]
+    return mask
+
+
+def find_consistent_objects(table, feature_col, decision_col, partitions=None, minimal=False, n_jobs=None, reporter=None):
+    """
+    找出每個特徵組合下，等價類別為決策類別子集合的物件
+    table: EncodedTable, 整數編碼的決策表
+    feature_col: list, 特徵欄位
+    decision_col: str, 決策欄位
+    partitions: PartitionCache, 分割快取, None 代表只在這次計算中使用的暫時快取
+    minimal: bool, default False
+        - False: 保留所有一致的特徵組合
+        - True: 逐層走訪特徵組合，若物件已有一致的子組合，則跳過它的所有超集合，只留下最小的規則
+    n_jobs: int, default None
+        以多少個行程計算(決策表放在共享記憶體中)，None 或 1 代表不使用多行程，-1 代表使用所有 CPU
+        minimal=True 時逐層平行計算同一層的特徵組合；結果與單一行程相同
+    reporter: ProgressReporter, 每個特徵組合(多行程時為每個區塊)完成後回報進度並檢查是否取消
+    
+    return: (subsets, consistent, stats)
+        subsets: list[tuple], 依特徵數量、字典序排列的特徵組合(特徵在 feature_col 中的位置)
+        consistent: list[numpy.ndarray], 與 subsets 對應，為一致物件的列位置
+        stats: dict, skipped_candidates 為被跳過的(物件, 特徵組合)數量，skipped_subsets 為完全不需計算的特徵組合數量
+    """
+    subsets = [features for num_features in range(1, len(feature_col)) 
+               for features in combinations(range(len(feature_col)), num_features)]
+    subset_index = {features: i for i, features in enumerate(subsets)}
+    decision = table.codes[decision_col]
+    stats = {"skipped_candidates": 0, "skipped_subsets": 0}
+    
+    consistent = [None] * len(subsets)
+    num_objects = len(table)
+    reporter = reporter or ProgressReporter()
+    reporter.total = len(subsets) * num_objects
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs > 1:
+        return _find_consistent_objects_parallel(table, feature_col, decision_col, subsets, minimal, n_jobs, reporter)
+    if not minimal:
+        if partitions is None:
+            partitions = PartitionCache(table, maxsize=len(feature_col))
+        for features, partition in iter_subset_partitions(partitions, feature_col):
+            consistent[subset_index[features]] = np.flatnonzero(consistent_mask(partition, decision))
+            reporter.advance(num_objects)
+        return subsets, consistent, stats
+    
+    if partitions is None:
+        partitions = PartitionCache(table, maxsize=2 * len(feature_col))
+    covered = {(): np.zeros((num_objects + 7) // 8, dtype=np.uint8)} # 已有一致子組合的物件(以位元壓縮)
+    for num_features in range(1, len(feature_col)):
+        next_covered = {}
+        for features in combinations(range(len(feature_col)), num_features):
+            # 任一個少一個特徵的子組合已涵蓋的物件，在此組合下都不是最小規則
+            dominated = covered[features[1:]].copy()
+            for drop in range(1, num_features):
+                dominated |= covered[features[:drop] + features[drop + 1:]]
+            dominated_mask = np.unpackbits(dominated, count=num_objects).astype(bool)
+            n_dominated = int(dominated_mask.sum())
+            stats["skipped_candidates"] += n_dominated
+            reporter.advance(num_objects)
+            
+            if n_dominated == num_objects:
+                stats["skipped_subsets"] += 1
+                consistent[subset_index[features]] = np.zeros(0, dtype=np.int64)
+                next_covered[features] = dominated
+                continue
+            
+            partition = partitions.get([feature_col[i] for i in features])
+            is_consistent = consistent_mask(partition, decision)
+            consistent[subset_index[features]] = np.flatnonzero(is_consistent & ~dominated_mask)
+            next_covered[features] = dominated | np.packbits(is_consistent)
+        covered = next_covered
+    return subsets, consistent, stats
+
+
+def _find_consistent_objects_parallel(table, feature_col, decision_col, subsets, minimal, n_jobs, reporter):
+    """
+    find_consistent_objects 的多行程版本，各行程以位元壓縮回傳一致物件，依特徵組合的位置合併
+    """
+    num_objects = len(table)
+    stats = {"skipped_candidates": 0, "skipped_subsets": 0}
+    with SharedTable(table, feature_col + [decision_col]) as shared, pool(ProcessPoolExecutor, n_jobs) as executor:
+        if not minimal:
+            masks = consistent_masks(table, feature_col, decision_col, subsets, n_jobs, executor, shared.spec, reporter)
+            consistent = [np.flatnonzero(np.unpackbits(mask, count=num_objects)) for mask in masks]
+            return subsets, consistent, stats
+        
+        consistent = []
+        covered = {(): np.zeros((num_objects + 7) // 8, dtype=np.uint8)}
+        for num_features in range(1, len(feature_col)):
+            level = list(combinations(range(len(feature_col)), num_features))
+            dominated = {}
+            for features in level:
+                dominated[features] = covered[features[1:]].copy()
+                for drop in range(1, num_features):
+                    dominated[features] |= covered[features[:drop] + features[drop + 1:]]
+            # 已完全被涵蓋的組合不需要計算
+            dominated_masks = {features: np.unpackbits(dominated[features], count=num_objects).astype(bool) for features in level}
+            todo = [features for features in level if not dominated_masks[features].all()]
+            reporter.advance((len(level) - len(todo)) * num_objects)
+            masks = dict(zip(todo, consistent_masks(table, feature_col, decision_col, todo, n_jobs, executor, shared.spec, reporter)))
+            
+            next_covered = {}
+            for features in level:
+                n_dominated = int(dominated_masks[features].sum())
+                stats["skipped_candidates"] += n_dominated
+                if features not in masks:
+                    stats["skipped_subsets"] += 1
+                    consistent.append(np.zeros(0, dtype=np.int64))
+                    next_covered[features] = dominated[features]
+                    continue
+                is_consistent = np.unpackbits(masks[features], count=num_objects).astype(bool)
+                consistent.append(np.flatnonzero(is_consistent & ~dominated_masks[features]))
+                next_covered[features] = dominated[features] | masks[features]
+            covered = next_covered
+    return subsets, consistent, stats
+
+
+def collect_rules(subsets, consistent, num_objects, include_empty=False):
+    """
+    將每個特徵組合的一致物件整理成(物件, 特徵組合)的規則列表
+    
+    return: (rule_rows, rule_subsets)
+        依物件排序，同一物件內依特徵組合的順序排列，沒有規則的物件以特徵組合 -1 表示空規則
+    """
+    rule_rows = [rows for rows in consistent]
+    rule_subsets = [np.full(len(rows), i, dtype=np.int64) for i, rows in enumerate(consistent)]
+    if include_empty:
+        # 沒有任何規則的物件，仍然加入一個空的規則(subset 以 -1 表示)
+        has_rule = np.zeros(num_objects, dtype=bool)
+        for rows in consistent:
+            has_rule[rows] = True
+        empty_rows = np.flatnonzero(~has_rule)
+        rule_rows.append(empty_rows)
+        rule_subsets.append(np.full(len(empty_rows), -1, dtype=np.int64))
+    rule_rows = np.concatenate(rule_rows) if rule_rows else np.zeros(0, dtype=np.int64)
+    rule_subsets = np.concatenate(rule_subsets) if rule_subsets else np.zeros(0, dtype=np.int64)
+    
+    # 依物件排序，同一物件內保持特徵組合的順序
+    order = np.argsort(rule_rows, kind="stable")
+    return rule_rows[order], rule_subsets[order]
+
+
+def expand_rules(rule_vectors, rule_subsets, vector_labels):
+    """
+    將以不同條件向量計算的規則展開到每個物件
+    rule_vectors: numpy.ndarray, 規則所屬的條件向量(已排序)
+    rule_subsets: numpy.ndarray, 規則的特徵組合
+    vector_labels: numpy.ndarray, 每個物件所屬的條件向量
+    
+    return: (rule_rows, rule_subsets), 依物件排序，同一物件內保持特徵組合的順序
+    """
+    num_vectors = int(vector_labels.max(initial=-1)) + 1
+    counts = np.bincount(rule_vectors, minlength=num_vectors)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    
+    lengths = counts[vector_labels]
+    rule_rows = np.repeat(np.arange(len(vector_labels)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = np.repeat(starts[vector_labels], lengths) + offsets
+    return rule_rows, rule_subsets[positions]
+
+
+@release_on_cancel
+def create_reduct_rules_from_table(table, name_col, feature_col, decision_col, include_empty=False, partitions=None, minimal=False, compress=False, as_ruleset=False, n_jobs=None,
+                                   progress=None, cancel=None):
+    """
+    以整數編碼的決策表建立 reduct rules
+    結果與逐列(create_reduct_dict_by_row)計算的結果相同：
+        依物件順序排列，同一物件的規則依特徵數量、字典序排列
+    相同(特徵, 決策)向量的物件只計算一次，再展開到每個物件
+    
+    partitions: PartitionCache, 分割快取, 可與其他計算共用(只有在沒有重複向量時使用)
+    minimal: bool, 只保留最小的規則, 參考 find_consistent_objects
+    n_jobs: int, 行程數量, 參考 find_consistent_objects
+    compress: bool, default False
+        - False: 每個物件各自一列規則
+        - True: 相同向量的物件合併成一列，name_col 為物件名稱的 list，並加入 count 欄位
+    as_ruleset: bool, default False
+        - False: 回傳 pandas.DataFrame
+        - True: 回傳以整數編碼儲存的 RuleSet
+    progress: callable, 每個特徵組合完成後呼叫 progress("reduct", 已掃描的列數, 總列數)
+    cancel: CancelToken, 被取消時在下一個特徵組合之前拋出 progress.Cancelled，並釋放計算到一半的結果
+    
+    return: pandas.DataFrame or RuleSet, 規則，跳過的候選數量(以不同向量計)記錄在 attrs/stats 中
+    """
+    # 不同的(特徵, 決策)向量，以第一次出現的物件作為代表
+    with stage("reduct.distinct_rows", rows=len(table)):
+        vector_labels, representatives = distinct_rows(table, feature_col + [decision_col])
+        if len(representatives) == len(table):
+            reduced = table
+        else:
+            reduced, partitions = table.take(representatives), None
+    with stage("reduct.find_consistent_objects", rows=len(reduced)):
+        reporter = ProgressReporter(progress, cancel, "reduct")
+        subsets, consistent, stats = find_consistent_objects(reduced, feature_col, decision_col, partitions, minimal, n_jobs, reporter)
+    with stage("reduct.collect_rules"):
+        rule_vectors, rule_subsets = collect_rules(subsets, consistent, len(reduced), include_empty)
+    
+    with stage("reduct.assemble_rules"):
+        counts, members = None, None
+        if compress:
+            rule_rows = representatives[rule_vectors]
+            order = np.argsort(vector_labels, kind="stable")
+            vector_sizes = np.bincount(vector_labels, minlength=len(representatives))
+            vector_members = [list(names) for names in np.split(table.decode(name_col, order), np.cumsum(vector_sizes)[:-1])]
+            members = [vector_members[v] for v in rule_vectors] # 同一向量的規則共用同一個 list
+            counts = vector_sizes[rule_vectors]
+        else:
+            rule_rows, rule_subsets = expand_rules(rule_vectors, rule_subsets, vector_labels)
+        
+        rule_set = RuleSet(table, name_col, feature_col, decision_col, rule_rows, rule_subsets, subsets,
+                           counts=counts, members=members, stats=stats)
+        return rule_set if as_ruleset else rule_set.to_frame()
 
 
 #%% 建立整個流程
-def create_reduct_rules(df, name_col, feature_col, decision_col, include_empty=False):
+@profiled("reduct.create_reduct_rules")
+def create_reduct_rules(df, name_col, feature_col, decision_col, include_empty=False, minimal=False, compress=False, as_ruleset=False, n_jobs=None,
+                        progress=None, cancel=None):
     """
     建立整個流程
+    minimal: bool, default False
+        - False: 所有一致的特徵組合都產生規則
+        - True: 只產生最小的規則(已有一致子組合的特徵組合會被跳過)，
+            跳過的數量記錄在 df_rule.attrs["skipped_candidates"]、df_rule.attrs["skipped_subsets"]
+    compress: bool, default False
+        - False: 每個物件各自一列規則
+        - True: 相同(特徵, 決策)向量的物件合併成一列，name_col 為物件名稱的 list，count 為物件數量
+    as_ruleset: bool, default False
+        - False: 回傳 pandas.DataFrame
+        - True: 回傳以整數編碼儲存的 RuleSet，可再以 to_frame() 轉換成 DataFrame
+    n_jobs: int, default None
+        以多少個行程產生規則，-1 代表使用所有 CPU，結果與單一行程相同
+    progress, cancel: 進度回報與取消，參考 create_reduct_rules_from_table
     """
     # 檢查columns
     check_df(df, name_col, feature_col, decision_col)
     columns = [name_col] + feature_col + [decision_col]
     
-    # 建立決策目標的值的集合
-    decision_dict = create_decision_dict(df, name_col, decision_col)
+    # 將所有欄位編碼成整數，只做一次
+    table = encode_table(df, columns)
     
-    df_rule = pd.DataFrame(columns=columns)
-    # 依照每一個row進行處理
-    for index, row in df.iterrows():
-        reduct_dict = create_reduct_dict_by_row(df, row, name_col, feature_col) # 建立這個row的不同數量特徵產生的約略集合
-        reduct_result = filter_reduct_dict_by_row(row, name_col, decision_dict, reduct_dict) # 過濾約略集合，只留下決策目標的子集合
-        row_rules = create_reduct_rules_by_row(df, row, columns, name_col, decision_col, reduct_result, include_empty) # 建立reduct rules dataframe
-        df_rule = pd.concat([df_rule, row_rules], ignore_index=True)
-    return df_rule
-
-
+    return create_reduct_rules_from_table(table, name_col, feature_col, decision_col, include_empty, minimal=minimal, compress=compress, as_ruleset=as_ruleset, n_jobs=n_jobs,
+                                          progress=progress, cancel=cancel)
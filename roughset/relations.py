@@ -1,5 +1,9 @@
 import pandas as pd
+from .encoding import encode_table
+from .partition import PartitionCache, approximation_sets
+from .profiling import profiled
 
+@profiled("relations.get_equivalence_object")
 def get_equivalence_object(df:pd.DataFrame, name_col: str, target_cols: list[str]) -> dict:
     """
         取得 target_cols 相等的物件，相同的物件會被放在同一個set中
@@ -43,6 +47,24 @@ def get_equivalence_object(df:pd.DataFrame, name_col: str, target_cols: list[str
     return equivalence_dict
 
 
+def _approximation_sets(df, name_col: str, target_cols: list[str], decision_col: str, decision_value):
+    """
+        以整數編碼的分割，一次標記每個等價類別是否只包含單一決策值，
+        回傳 decision_value 的下近似、上近似(ObjectSet)
+    """
+    table = encode_table(df, [name_col] + target_cols + [decision_col])
+    partition = PartitionCache(table).get(target_cols) # 條件欄位的等價類別
+    counts = partition.decision_counts(table.codes[decision_col], table.cardinality(decision_col)) # (類別, 決策值) 的數量
+    code = table.categories[decision_col].get_indexer([decision_value])[0]
+    return approximation_sets(partition.labels, counts, code)
+
+
+def _object_names(df, name_col: str, objects) -> set:
+    # 只在回傳結果時才把位元集合轉換成物件名稱
+    return set(df[name_col].to_numpy()[objects.to_indices()])
+
+
+@profiled("relations.get_lower_approximation")
 def get_lower_approximation(df, name_col: str, target_cols: list[str], decision_col: str, decision_value) -> set:
     """
     Get the lower approximation set based on the given decision value.
@@ -79,19 +101,10 @@ def get_lower_approximation(df, name_col: str, target_cols: list[str], decision_
     # decision_col 等於 decision_value 的資料筆數不為0
     assert len(df[df[decision_col] == decision_value]) != 0, f"Decision value [{decision_value}] not in {decision_col}!"
     
-    D_dict = get_equivalence_object(df=df, name_col=name_col, target_cols=target_cols) # 條件欄位的等價物件
-    X_all = get_equivalence_object(df=df, name_col=name_col, target_cols=[decision_col]) # 目標欄位的等價物件
-    
-    X = X_all[decision_value] # 取得目標欄位的等價物件
-    
-    lower_set = [] # 雖然命名為set,但必須要用list儲存(set內不能存放set)
-    for x in X:
-        for d in D_dict.values():
-            if x in d and d <= X:
-                lower_set.append(x)
-                break
-    return set(lower_set)
+    lower, upper = _approximation_sets(df, name_col, target_cols, decision_col, decision_value)
+    return _object_names(df, name_col, lower)
 
+@profiled("relations.get_upper_approximation")
 def get_upper_approximation(df, name_col: str, target_cols: list[str], decision_col: str, decision_value) -> set:
     """
     Get the upper approximation set based on the given decision value.
@@ -129,20 +142,8 @@ def get_upper_approximation(df, name_col: str, target_cols: list[str], decision_
     # decision_col 等於 decision_value 的資料筆數不為0
     assert len(df[df[decision_col] == decision_value]) != 0, f"Decision value [{decision_value}] not in {decision_col}!"
     
-    D_dict = get_equivalence_object(df=df, name_col=name_col, target_cols=target_cols) # 條件欄位的等價物件
-    X_all = get_equivalence_object(df=df, name_col=name_col, target_cols=[decision_col]) # 目標欄位的等價物件
-    
-    X = X_all[decision_value] # 取得目標欄位的等價物件
-    
-    upper_set = [] # 雖然命名為set,但必須要用list儲存(set內不能存放set)
-
-    for x in X:
-        for d in D_dict.values():
-            if x in d:
-                upper_set.extend(d)
-                break
-
-    return set(upper_set)
+    lower, upper = _approximation_sets(df, name_col, target_cols, decision_col, decision_value)
+    return _object_names(df, name_col, upper)
 
 def is_set_same(set1: list[set], set2:list[set]):
     """
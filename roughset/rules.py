@@ -0,0 +1,335 @@
+import heapq
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .encoding import refine_labels
+from .partition import PartitionCache
+
+_HASH_SEED = 0x5EED # 規則雜湊的權重，固定以便結果可以重現
+
+
+class RuleSet:
+    """
+        以整數編碼儲存的規則集合
+
+        每條規則只記錄產生它的物件(列位置)與特徵組合，規則的值由整數編碼的決策表取得，
+        需要時再以 to_frame 轉換成與 create_reduct_rules 相同的 DataFrame
+
+        Attributes:
+            table: EncodedTable, 整數編碼的決策表
+            name_col: str, 物件名稱欄位
+            feature_col: list[str], 特徵欄位
+            decision_col: str, 決策欄位
+            rows: numpy.ndarray, 產生規則的物件列位置
+            subset_ids: numpy.ndarray, 規則的特徵組合在 subsets 中的位置, -1 代表空規則
+            subsets: list[tuple], 特徵組合(特徵在 feature_col 中的位置)
+            counts: numpy.ndarray or None, 壓縮後每條規則代表的物件數量
+            members: list[list] or None, 壓縮後每條規則代表的物件名稱
+            stats: dict, 產生規則時的統計資訊
+    """
+
+    def __init__(self, table, name_col, feature_col, decision_col, rows, subset_ids, subsets,
+                 counts=None, members=None, stats=None):
+        self.table = table
+        self.name_col = name_col
+        self.feature_col = list(feature_col)
+        self.decision_col = decision_col
+        self.rows = rows
+        self.subset_ids = subset_ids
+        self.subsets = subsets
+        self.counts = counts
+        self.members = members
+        self.stats = stats or {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __repr__(self) -> str:
+        return f"RuleSet(n_rules={len(self)}, feature_col={self.feature_col}, decision_col={self.decision_col})"
+
+    @property
+    def columns(self) -> list[str]:
+        return [self.name_col] + self.feature_col + [self.decision_col]
+
+    @property
+    def antecedents(self) -> np.ndarray:
+        """
+            每條規則包含哪些特徵, shape 為 (n_rules, n_features)
+        """
+        membership = np.zeros((len(self.subsets) + 1, len(self.feature_col)), dtype=bool)
+        for i, features in enumerate(self.subsets):
+            membership[i, list(features)] = True
+        # 最後一列(-1)為空規則
+        return membership[self.subset_ids]
+
+    @property
+    def has_decision(self) -> np.ndarray:
+        """
+            規則是否有決策值(空規則沒有)
+        """
+        return self.subset_ids >= 0
+
+    def feature_codes(self) -> np.ndarray:
+        """
+            產生規則的物件在每個特徵上的整數編碼, shape 為 (n_rules, n_features)
+            不在規則中的特徵請以 antecedents 排除
+        """
+        return np.column_stack([self.table.codes[col][self.rows] for col in self.feature_col]) \
+            if self.feature_col else np.zeros((len(self), 0), dtype=np.int64)
+
+    def decision_codes(self) -> np.ndarray:
+        """
+            規則決策值的整數編碼，空規則請以 has_decision 排除
+        """
+        return self.table.codes[self.decision_col][self.rows]
+
+    @property
+    def masks(self) -> np.ndarray:
+        """
+            每條規則的特徵組合以位元表示(第 j 個位元代表 feature_col[j])，空規則為 0
+        """
+        return self.antecedents.astype(np.int64) @ (np.int64(1) << np.arange(len(self.feature_col), dtype=np.int64))
+
+    def _subset(self, keep: np.ndarray, counts: np.ndarray, members: list, stats: dict) -> "RuleSet":
+        return RuleSet(self.table, self.name_col, self.feature_col, self.decision_col, self.rows[keep], self.subset_ids[keep],
+                       self.subsets, counts=counts, members=members, stats=stats)
+
+    def _merge_duplicates(self) -> "RuleSet":
+        # 相同(特徵組合, 特徵值, 決策值)的規則以雜湊分組合併，保留第一次出現的規則，數量相加、物件名稱依序合併
+        antecedents, codes, decision = self.antecedents, self.feature_codes(), self.decision_codes()
+        keys, n_keys = refine_labels(None, self.subset_ids + 1)
+        for j in range(len(self.feature_col)):
+            keys, n_keys = refine_labels(keys, np.where(antecedents[:, j], codes[:, j].astype(np.int64) + 2, 0))
+        keys, n_keys = refine_labels(keys, np.where(self.has_decision, decision.astype(np.int64) + 2, 0))
+
+        counts = self.counts if self.counts is not None else np.ones(len(self), dtype=np.int64)
+        if self.members is None:
+            names, owners = self.table.decode(self.name_col, self.rows), keys
+        else:
+            lengths = np.fromiter(map(len, self.members), dtype=np.int64, count=len(self))
+            names = np.empty(int(lengths.sum()), dtype=object)
+            names[:] = list(itertools.chain.from_iterable(self.members))
+            owners = np.repeat(keys, lengths)
+        # refine_labels 依第一次出現的順序編號，同一組的物件名稱保持原本的順序
+        order = np.argsort(owners, kind="stable")
+        members = [list(group) for group in np.split(names[order], np.cumsum(np.bincount(owners, minlength=n_keys))[:-1])]
+        first = np.full(n_keys, len(self), dtype=np.int64)
+        np.minimum.at(first, keys, np.arange(len(self)))
+        return self._subset(first, np.bincount(keys, weights=counts, minlength=n_keys).astype(np.int64), members, self.stats)
+
+    def _subsumed(self) -> np.ndarray:
+        """
+            每條規則是否被更一般的規則涵蓋：另一條規則的特徵組合是它的真子集合，在這些特徵上的值與決策值都相同
+
+            reduct 規則都是一致的，因此更一般的規則成立時，較特定的規則是多餘的；
+            條件中有缺值的規則不符合任何物件，不會作為更一般的規則
+
+            每條規則在每個特徵上的值以隨機權重雜湊，任一特徵組合上的雜湊值只需要相加，
+            每個特徵組合(位元)只需要一次向量查詢，雜湊相同時再比對整數編碼確認
+        """
+        masks = self.masks
+        codes = self.feature_codes().astype(np.int64)
+        decision = self.decision_codes().astype(np.int64)
+        rng = np.random.default_rng(_HASH_SEED)
+        weights = rng.integers(1, np.iinfo(np.int64).max, size=len(self.feature_col) + 1, dtype=np.int64).astype(np.uint64)
+        hashed = (codes.astype(np.uint64) * weights[:-1]) if len(self.feature_col) else np.zeros((len(self), 0), dtype=np.uint64)
+        decision_hash = decision.astype(np.uint64) * weights[-1]
+        valid = self.has_decision
+        complete = ~((codes < 0) & self.antecedents).any(axis=1)
+
+        subsumed = np.zeros(len(self), dtype=bool)
+        for mask in np.unique(masks[valid & complete]):
+            features = [j for j in range(len(self.feature_col)) if mask >> j & 1]
+            general = np.flatnonzero(valid & complete & (masks == mask))
+            specific = np.flatnonzero(valid & ~subsumed & (masks & mask == mask) & (masks != mask))
+            if not len(specific):
+                continue
+            with np.errstate(over="ignore"):
+                general_keys = hashed[general][:, features].sum(axis=1, dtype=np.uint64) + decision_hash[general]
+                specific_keys = hashed[specific][:, features].sum(axis=1, dtype=np.uint64) + decision_hash[specific]
+            order = np.argsort(general_keys)
+            general_keys, general = general_keys[order], general[order]
+            position = np.minimum(np.searchsorted(general_keys, specific_keys), len(general) - 1)
+            hit = general_keys[position] == specific_keys
+            matched = general[position[hit]]
+            hit[hit] = (codes[specific[hit]][:, features] == codes[matched][:, features]).all(axis=1) & \
+                (decision[specific[hit]] == decision[matched])
+            subsumed[specific[hit]] = True
+        return subsumed
+
+    def _greedy_cover(self, partitions: PartitionCache) -> np.ndarray:
+        """
+            以 lazy greedy 選擇規則，每次選擇涵蓋最多尚未涵蓋物件的規則，直到所有被規則涵蓋的物件(規則描述的正域)都被涵蓋
+
+            規則涵蓋的物件就是產生它的物件在規則特徵上的等價類別，由分割快取取得；
+            規則的增益只會減少，因此只需要在取出時重新計算
+        """
+        masks, rows = self.masks, self.rows
+        labels = np.full(len(self), -1, dtype=np.int64)
+        partition_of = {}
+        for mask in np.unique(masks[self.has_decision]):
+            rules = np.flatnonzero(self.has_decision & (masks == mask))
+            partition = partition_of[mask] = partitions.get([col for j, col in enumerate(self.feature_col) if mask >> j & 1])
+            # 移除物件後類別編號會在 class_indices 時重新編號，先重新編號再讀取 labels
+            partition._canonicalize()
+            labels[rules] = partition.labels[rows[rules]]
+        sizes = self.match_counts(partitions)
+
+        covered = np.zeros(len(self.table), dtype=bool)
+        selected = np.zeros(len(self), dtype=bool)
+        heap = [(-int(sizes[i]), i) for i in np.flatnonzero(labels >= 0)]
+        heapq.heapify(heap)
+        while heap:
+            gain, i = heapq.heappop(heap)
+            objects = partition_of[masks[i]].class_indices(labels[i])
+            new_gain = int((~covered[objects]).sum())
+            if new_gain == 0:
+                continue
+            if heap and new_gain < -heap[0][0]:
+                heapq.heappush(heap, (-new_gain, i))
+                continue
+            selected[i] = True
+            covered[objects] = True
+        return selected
+
+    def minimize(self, partitions: PartitionCache = None, subsume: bool = True, cover: bool = False) -> "RuleSet":
+        """
+            縮減規則集合
+
+                1. 合併相同的規則，count 為合併的規則代表的物件數量，物件名稱合併成 list
+                2. subsume=True 時移除被更一般的規則涵蓋的規則
+                3. cover=True 時以 greedy set cover 只保留涵蓋所有被規則涵蓋的物件所需的規則
+
+            空規則(沒有決策值)只會合併，不會被移除
+
+            Parameters:
+                partitions: PartitionCache, 同一個決策表的分割快取(cover 使用), None 代表只在這次計算中使用的暫時快取
+                subsume: bool, 是否移除被涵蓋的規則
+                cover: bool, 是否只保留 greedy set cover 選擇的規則
+
+            Returns:
+                RuleSet, 壓縮後的規則集合(有 counts 與 members)，縮減的數量記錄在 stats 的
+                    merged_rules, subsumed_rules, uncovered_rules
+        """
+        merged = self._merge_duplicates()
+        stats = dict(self.stats, merged_rules=len(self) - len(merged), subsumed_rules=0, uncovered_rules=0)
+        result = merged
+        if subsume:
+            keep = ~merged._subsumed()
+            result = merged._subset(keep, merged.counts[keep], [m for m, k in zip(merged.members, keep) if k], stats)
+            stats["subsumed_rules"] = len(merged) - len(result)
+        if cover:
+            if partitions is None:
+                partitions = PartitionCache(self.table, maxsize=None)
+            assert partitions.table is self.table, "partitions 需要建立在同一個決策表上"
+            keep = result._greedy_cover(partitions) | ~result.has_decision
+            stats["uncovered_rules"] = len(result) - int(keep.sum())
+            result = result._subset(keep, result.counts[keep], [m for m, k in zip(result.members, keep) if k], stats)
+        result.stats = stats
+        return result
+
+    def match_counts(self, partitions, features: bool = True, decision: bool = False, reporter=None) -> np.ndarray:
+        """
+            計算每條規則的條件在決策表中符合的物件數量
+
+            規則的值取自產生它的物件，因此符合的物件就是該物件在規則屬性上的等價類別；
+            規則依照屬性組合分組，每一組只需從分割快取取得一次分割
+
+            Parameters:
+                partitions: PartitionCache, 同一個決策表的分割快取
+                features: bool, 是否包含規則中的特徵(X)
+                decision: bool, 是否包含決策值(Y)
+                reporter: ProgressReporter, 每一組規則完成後回報進度並檢查是否取消
+
+            Returns:
+                numpy.ndarray, 每條規則符合的物件數量，規則中有缺值時為 0
+        """
+        assert partitions.table is self.table, "partitions 需要建立在同一個決策表上"
+        antecedents = self.antecedents if features else np.zeros((len(self), len(self.feature_col)), dtype=bool)
+        with_decision = self.has_decision if decision else np.zeros(len(self), dtype=bool)
+        patterns, pattern_ids = np.unique(np.column_stack([antecedents, with_decision]), axis=0, return_inverse=True)
+
+        counts = np.zeros(len(self), dtype=np.int64)
+        for i, pattern in enumerate(patterns):
+            rules = np.flatnonzero(pattern_ids.ravel() == i)
+            attrs = [col for col, used in zip(self.feature_col + [self.decision_col], pattern) if used]
+            partition = partitions.get(attrs)
+            labels = partition.labels[self.rows[rules]]
+            # 只查詢有類別的規則，欄位全為缺值時分割沒有任何類別
+            found = labels >= 0
+            counts[rules[found]] = partition.sizes[labels[found]]
+            if reporter is not None:
+                reporter.advance(len(rules))
+        return counts
+
+    def decision_match_counts(self, partitions) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+            由分割的 decision_counts 一次取得 X, XY, Y 符合的物件數量，結果與分別呼叫 match_counts 相同
+
+            每個特徵組合只需要一個分割；分割在加入或移除物件時只更新受影響類別的 decision_counts，
+            因此物件變動後不需要重新掃描決策表，只需要依規則查表
+
+            Parameters:
+                partitions: PartitionCache, 同一個決策表的分割快取
+
+            Returns:
+                (x, xy, y): numpy.ndarray, 每條規則符合特徵、特徵與決策、決策的物件數量
+        """
+        assert partitions.table is self.table, "partitions 需要建立在同一個決策表上"
+        decision = self.table.codes[self.decision_col]
+        n_decisions = self.table.cardinality(self.decision_col)
+        rule_decision = self.decision_codes()
+        # 決策缺值的規則沒有符合 XY, Y 的物件；空規則不限制決策
+        with_decision = self.has_decision & (rule_decision >= 0)
+        x, xy, y = (np.zeros(len(self), dtype=np.int64) for _ in range(3))
+
+        for subset_id in np.unique(self.subset_ids):
+            rules = np.flatnonzero(self.subset_ids == subset_id)
+            attrs = [self.feature_col[j] for j in self.subsets[subset_id]] if subset_id >= 0 else []
+            partition = partitions.get(attrs)
+            counts = partition.decision_counts(decision, n_decisions)
+            labels = partition.labels[self.rows[rules]]
+            found = labels >= 0
+            rules, labels = rules[found], labels[found]
+            x[rules] = counts[labels].sum(axis=1)
+            rules, labels = rules[with_decision[rules]], labels[with_decision[rules]]
+            xy[rules] = counts[labels, rule_decision[rules]]
+
+        # 論域中每個決策值的數量取自空集合的分割(所有物件同一類別)
+        totals = partitions.get([]).decision_counts(decision, n_decisions)
+        totals = totals[0] if len(totals) else np.zeros(n_decisions + 1, dtype=np.int64)
+        y[with_decision] = totals[rule_decision[with_decision]]
+        without_decision = ~self.has_decision
+        xy[without_decision] = x[without_decision]
+        y[without_decision] = len(self.table)
+        return x, xy, y
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+            轉換成與 create_reduct_rules 相同的 DataFrame(所有欄位皆為 object)
+            不在規則中的特徵為 None；壓縮後的規則集合會多一個 count 欄位
+        """
+        antecedents = self.antecedents
+        if self.members is None:
+            names = self.table.decode(self.name_col, self.rows)
+        else:
+            names = np.empty(len(self), dtype=object)
+            for i, member in enumerate(self.members): # 逐一指定，避免等長的 list 被轉換成二維陣列
+                names[i] = member
+
+        data = {self.name_col: names}
+        for j, feature in enumerate(self.feature_col):
+            values = np.full(len(self), None, dtype=object)
+            values[antecedents[:, j]] = self.table.decode(feature, self.rows[antecedents[:, j]])
+            data[feature] = values
+        values = np.full(len(self), None, dtype=object)
+        values[self.has_decision] = self.table.decode(self.decision_col, self.rows[self.has_decision])
+        data[self.decision_col] = values
+
+        df_rule = pd.DataFrame(data, columns=self.columns, dtype=object)
+        if self.counts is not None:
+            df_rule["count"] = self.counts
+        df_rule.attrs.update(self.stats)
+        return df_rule
@@ -0,0 +1,102 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .encoding import EncodedTable
+from .partition import Partition
+
+FORMAT_VERSION = 1
+
+
+def _save_categories(path: str, categories: pd.Index) -> str:
+    # 數值與字串的值字典存成可以 mmap 的 .npy，其他型別(混合型別等)才使用 pickle
+    values = categories.to_numpy()
+    if values.dtype != object:
+        np.save(path, values)
+        return "array"
+    if all(isinstance(value, str) for value in values):
+        np.save(path, values.astype(str))
+        return "str"
+    np.save(path, values, allow_pickle=True)
+    return "object"
+
+
+def _load_categories(path: str, kind: str, mmap_mode) -> pd.Index:
+    if kind == "object":
+        return pd.Index(np.load(path, allow_pickle=True), dtype=object)
+    values = np.load(path, mmap_mode=mmap_mode)
+    if kind == "str":
+        return pd.Index(values.astype(object), dtype=object)
+    return pd.Index(values)
+
+
+def save_table(path: str, table: EncodedTable, partitions: list[Partition] = (), meta: dict = None):
+    """
+        將整數編碼的決策表與分割存成資料夾，每個欄位的編碼、值字典與分割的 labels 各為一個 .npy 檔案
+
+        資料夾內容:
+            meta.json: 欄位、列數、分割的屬性與類別數量，以及 meta 中的其他資訊
+            codes_{i}.npy, categories_{i}.npy: 第 i 個欄位的編碼與值字典
+            partition_{i}.npy: 第 i 個分割的 labels
+
+        Parameters:
+            path: str, 資料夾路徑(不存在時會建立)
+            table: EncodedTable, 整數編碼的決策表
+            partitions: list[Partition], 要一併保存的分割
+            meta: dict, 其他要保存的資訊(需要可以轉換成 JSON)
+    """
+    os.makedirs(path, exist_ok=True)
+    columns = []
+    for i, col in enumerate(table.columns):
+        np.save(os.path.join(path, f"codes_{i}.npy"), table.codes[col])
+        kind = _save_categories(os.path.join(path, f"categories_{i}.npy"), table.categories[col])
+        columns.append({"name": col, "categories": kind})
+
+    saved_partitions = []
+    for i, partition in enumerate(partitions):
+        partition._canonicalize()
+        np.save(os.path.join(path, f"partition_{i}.npy"), partition.labels)
+        saved_partitions.append({"attrs": [col for col in table.columns if col in partition.attrs], "n_classes": partition.n_classes})
+
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "format": FORMAT_VERSION,
+            "n_rows": len(table),
+            "columns": columns,
+            "partitions": saved_partitions,
+            **(meta or {}),
+        }, f, ensure_ascii=False, indent=2)
+
+
+def load_table(path: str, mmap: bool = True) -> tuple[EncodedTable, list[Partition], dict]:
+    """
+        讀取 save_table 保存的資料夾
+
+        Parameters:
+            path: str, 資料夾路徑
+            mmap: bool, default True
+                - True: 編碼與分割以唯讀的 memory map 開啟，只有用到的部分才會從磁碟讀取，多個行程共用作業系統的快取
+                - False: 全部讀入記憶體
+
+        Returns:
+            (table, partitions, meta)
+    """
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    assert meta.get("format") == FORMAT_VERSION, f"不支援的格式版本：{meta.get('format')}"
+    mmap_mode = "r" if mmap else None
+
+    codes, categories = {}, {}
+    for i, column in enumerate(meta["columns"]):
+        col = column["name"]
+        codes[col] = np.load(os.path.join(path, f"codes_{i}.npy"), mmap_mode=mmap_mode)
+        categories[col] = _load_categories(os.path.join(path, f"categories_{i}.npy"), column["categories"], mmap_mode)
+    table = EncodedTable(codes, categories)
+
+    partitions = []
+    for i, saved in enumerate(meta["partitions"]):
+        labels = np.load(os.path.join(path, f"partition_{i}.npy"), mmap_mode=mmap_mode)
+        partitions.append(Partition(frozenset(saved["attrs"]), labels, saved["n_classes"]))
+    return table, partitions, meta
@@ -0,0 +1,66 @@
+from roughset import RoughSet, RuleClassifier
+import pandas as pd
+import numpy as np
+from numpy.testing import assert_allclose
+
+
+def test_classifier_example():
+    
+    df = pd.read_csv('example.csv')
+    feature_col = ['天氣', '事故情形', '事故原因']
+    RS = RoughSet(df, name_col="No", feature_col=feature_col, decision_col='損壞部位')
+    rules = RS.create_reduct_rules(include_empty=True)
+    
+    clf = RuleClassifier(rules, feature_col, '損壞部位')
+    assert len(clf.shapes) == 4
+    # 物件 1, 4 沒有一致的規則(只產生長度小於特徵數的規則)
+    assert list(clf.predict(df)) == [None, 0, 1, None, 1]
+    
+    proba = clf.predict_proba(df)
+    assert_allclose(proba.sum(axis=1), [0, 1, 1, 0, 1])
+    
+    # 規則中沒出現過的值不會符合任何規則
+    unseen = pd.DataFrame({'天氣': [9], '事故情形': [9], '事故原因': [9]})
+    assert list(RuleClassifier(rules, feature_col, '損壞部位', default=-1).predict(unseen)) == [-1]
+
+
+def test_classifier_same_as_loop():
+    
+    df = pd.read_csv('Mohapatra.csv')
+    feature_col = ['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)']
+    RS = RoughSet(df, name_col="Company", feature_col=feature_col, decision_col='Sales(D)')
+    RS.create_reduct_rules()
+    rules = RS.evaluate_metrics()
+    clf = RuleClassifier(rules, feature_col, 'Sales(D)')
+    
+    # 逐條規則比對的結果
+    expected = np.zeros((len(df), len(clf.classes_)))
+    for _, rule in rules.drop(columns="Company").drop_duplicates().iterrows():
+        matched = np.ones(len(df), dtype=bool)
+        for col in feature_col:
+            if rule[col] is not None:
+                matched &= (df[col] == rule[col]).to_numpy()
+        expected[matched, list(clf.classes_).index(rule['Sales(D)'])] += rule["support"] * rule["confidence"]
+    assert_allclose(clf.decision_scores(df), expected)
+    # 規則在訓練資料上都是一致的，有規則符合的物件都會被分類正確
+    prediction = clf.predict(df)
+    covered = prediction != None # noqa: E711
+    assert covered.sum() > 0
+    assert list(prediction[covered]) == list(df['Sales(D)'][covered])
+
+
+def test_classifier_missing_values():
+    
+    # 物件 b 的 f0 缺值，以它產生的規則(f0 為 NaN)不符合任何物件，support 為 0 也不會讓分數變成 NaN
+    df = pd.DataFrame({'n': list('abcde'), 'f0': [1, np.nan, 2, 1, 2], 'f1': ['p', 'q', 'q', 'p', 'p'], 'd': ['x', 'z', 'y', 'x', 'y']})
+    RS = RoughSet(df)
+    RS.create_reduct_rules()
+    rules = RS.evaluate_metrics()
+    assert pd.isna(rules["confidence"][1])
+    
+    test = pd.DataFrame({'f0': [1, 2, 3], 'f1': ['p', 'q', 'r']})
+    for clf in [RuleClassifier(rules, ['f0', 'f1'], 'd'), RuleClassifier(RS.rule_set)]:
+        assert list(clf.predict(test)) == ['x', 'y', None]
+        scores = clf.decision_scores(test)
+        assert not np.isnan(scores).any()
+        assert (scores[:, list(clf.classes_).index('z')] == 0).all()
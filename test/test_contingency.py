@@ -0,0 +1,41 @@
+from roughset import RoughSet
+from roughset.evaluate import evaluate_rules
+import numpy as np
+import pandas as pd
+
+
+def test_contingency_measures():
+
+    df = pd.DataFrame({
+        "name": ["o1", "o2", "o3", "o4", "o5", "o6", "o7"],
+        "a": ["x", "x", "y", "y", "y", "z", None],
+        "d": ["Y", "Y", "Y", "N", "N", "N", "Y"],
+    })
+    RS = RoughSet(df)
+    contingency = RS.contingency(["a"])
+    assert len(contingency) == 4
+    assert contingency.n_objects == 7
+    assert contingency.class_sizes.tolist() == [2, 3, 1]
+    assert np.array_equal(contingency.to_dense(), RS.partition(["a"]).decision_counts(RS.table.codes["d"], 2))
+
+    # Y: lower {o1, o2}, upper {o1, o2, o3, o4, o5}
+    assert contingency.approximation_sizes("Y") == (2, 5)
+    assert RS.approximation_accuracy(["a"], "Y") == 2 / 5
+    # Σ|lower| = 3, Σ|upper| = 5 + 4
+    assert RS.approximation_accuracy(["a"]) == 3 / 9
+    assert RS.classification_quality(["a"]) == RS.dependency_degree(["a"]) == 3 / 7
+    assert contingency.positive_size() == len(RS.positive_region(["a"]))
+    # β = 0.6: 類別 y 中 2/3 為 N
+    assert contingency.approximation_sizes("N", beta=0.6) == (4, 4)
+
+    # 每個 (類別, 決策值) 組合的指標與 evaluate_rules 相同
+    metrics = contingency.rule_metrics()
+    rules = pd.DataFrame({"a": ["x", "y", "y", "z"], "d": ["Y", "Y", "N", "N"]})
+    expected = evaluate_rules(rules, df, "name", ["a"], "d")
+    assert metrics["decision"].tolist() == ["Y", "Y", "N", "N"]
+    for col in ["support", "confidence", "lift"]:
+        assert np.allclose(metrics[col].to_numpy(), expected[col].to_numpy())
+
+    # 加入物件後重新計算
+    RS.add_objects(pd.DataFrame({"name": ["o8"], "a": ["x"], "d": ["N"]}))
+    assert RS.contingency(["a"]).approximation_sizes("Y") == (0, 6)
@@ -0,0 +1,64 @@
+from roughset import RoughSet
+from roughset.discretize import Discretizer, equal_frequency_cuts, mdlp_cuts
+import numpy as np
+import pandas as pd
+
+
+def test_cuts():
+
+    # 兩個決策值以 1.5 完全分開
+    values = np.array([0.1, 0.5, 0.9, 1.0, 2.0, 2.2, 2.5, 3.0] * 10)
+    decision = np.array([0, 0, 0, 0, 1, 1, 1, 1] * 10)
+    assert np.allclose(mdlp_cuts(values, decision), [1.5])
+    # 與決策無關的數值不切
+    rng = np.random.default_rng(0)
+    assert len(mdlp_cuts(rng.uniform(size=200), rng.integers(0, 2, 200))) == 0
+
+    assert np.allclose(equal_frequency_cuts(np.arange(100.0), 4), [24.5, 49.5, 74.5])
+    # 切點只會落在相異值之間
+    assert np.allclose(equal_frequency_cuts(np.array([0.0] * 90 + [1.0] * 10), 4), [0.5])
+    assert len(equal_frequency_cuts(np.array([1.0, 1.0, np.nan]), 3)) == 0
+
+
+def test_consistency_preserves_positive_region():
+
+    rng = np.random.default_rng(1)
+    for _ in range(10):
+        n = 60
+        df = pd.DataFrame({
+            "name": range(n),
+            "a": rng.normal(size=n).round(1),
+            "b": rng.choice(["x", "y"], n),
+            "c": rng.integers(0, 5, n).astype(float),
+            "d": rng.integers(0, 3, n),
+        })
+        df.loc[rng.random(n) < 0.1, "a"] = np.nan
+        df.loc[rng.random(n) < 0.1, "d"] = None
+        RS = RoughSet(df)
+        RS_discrete = RoughSet(df, discretize="consistency")
+        assert RS_discrete.df["a"].nunique() < df["a"].nunique()
+        assert RS_discrete.positive_region(["a", "b", "c"]) == RS.positive_region(["a", "b", "c"])
+
+
+def test_discretizer_reuse_on_test_data(tmp_path):
+
+    df = pd.DataFrame({
+        "name": ["o1", "o2", "o3", "o4", "o5", "o6"],
+        "t": [36.5, 36.8, 37.0, 38.5, 39.0, np.nan],
+        "c": ["a", "b", "a", "b", "a", "b"],
+        "d": ["N", "N", "N", "Y", "Y", "Y"],
+    })
+    RS = RoughSet(df, discretize=Discretizer("consistency"))
+    assert list(RS.discretizer.cuts) == ["t"]
+    assert RS.df["t"].tolist() == ["(-inf, 37.75)"] * 3 + ["[37.75, inf)"] * 2 + [None]
+    assert RS.lower_approximation(["t"], "Y") == {"o4", "o5"}
+
+    # 測試資料以相同的切點轉換，切點可以保存成 JSON
+    test = pd.DataFrame({"name": ["o7", "o8"], "t": [40.0, 36.0], "c": ["a", "a"], "d": ["Y", "N"]})
+    discretizer = Discretizer.from_dict(RS.discretizer.to_dict())
+    assert discretizer.transform(test)["t"].tolist() == ["[37.75, inf)", "(-inf, 37.75)"]
+    RS.add_objects(test)
+    assert RS.lower_approximation(["t"], "Y") == {"o4", "o5", "o7"}
+
+    RS.save(tmp_path / "rs")
+    assert RoughSet.load(tmp_path / "rs").discretizer.cuts["t"].tolist() == [37.75]
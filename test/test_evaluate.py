@@ -1,5 +1,5 @@
 #%%
-from roughset.evaluate import calculate_rules_ratio, evaluate_metrics
+from roughset.evaluate import calculate_rules_ratio, evaluate_metrics, evaluate_rules, row2dict
 import pandas as pd
 from numpy.testing import assert_allclose
 
@@ -190,4 +190,48 @@ def test_evaluate_metrics_example1():
     )
     assert_allclose(metrics["support"], 0.2)
     assert_allclose(metrics["confidence"], 1.0)
-    assert_allclose(metrics["lift"], 5/3)
\ No newline at end of file
+    assert_allclose(metrics["lift"], 5/3)
+
+
+def test_evaluate_rules_same_as_evaluate_metrics():
+    
+    df = pd.read_csv('example.csv')
+    name_col="No"
+    feature_col=['天氣', '事故情形', '事故原因']
+    decision_col='損壞部位'
+    
+    rules = pd.DataFrame([
+        {"天氣": None, "事故情形": 0, "事故原因": None, "損壞部位": 0},
+        {"天氣": 1, "事故情形": 0, "事故原因": None, "損壞部位": 0},
+        {"天氣": None, "事故情形": 1, "事故原因": 0, "損壞部位": 1},
+        {"天氣": 0, "事故情形": 0, "事故原因": None, "損壞部位": 1}, # 資料中沒有符合的物件
+        {"天氣": None, "事故情形": 5, "事故原因": None, "損壞部位": 1}, # 資料中沒有的值
+    ], dtype=object)
+    metrics = evaluate_rules(rules, df, name_col, feature_col, decision_col)
+    assert_allclose(metrics["support"], [0.2, 0.2, 0.2, 0.0, 0.0])
+    assert_allclose(metrics["confidence"][:3], [1.0, 1.0, 1.0])
+    assert_allclose(metrics["lift"][:3], [2.5, 2.5, 5/3])
+    
+    for i, rule in rules.iterrows():
+        expected = evaluate_metrics(row2dict(rule, feature_col + [decision_col]), df, name_col, feature_col, decision_col)
+        for key, value in expected.items():
+            if value is None:
+                assert pd.isna(metrics.loc[i, key])
+            else:
+                assert_allclose(metrics.loc[i, key], value)
+
+
+def test_evaluate_rules_all_missing_column():
+    
+    # 資料中整欄缺值時沒有任何等價類別，限制該欄的規則符合 0 筆
+    df = pd.DataFrame({"n": ["a", "b", "c"], "f1": [1, 2, 1], "f2": [None] * 3, "d": [0, 1, 0]})
+    rules = pd.DataFrame([
+        {"f1": 1, "f2": None, "d": 0},
+        {"f1": None, "f2": 3, "d": 1},
+        {"f1": 1, "f2": 3, "d": 0},
+    ], dtype=object)
+    metrics = evaluate_rules(rules, df, "n", ["f1", "f2"], "d")
+    assert metrics["confidence"].dtype == float
+    assert_allclose(metrics["support"], [2/3, 0.0, 0.0])
+    assert_allclose(metrics["confidence"][:1], [1.0])
+    assert metrics["confidence"][1:].isna().all() and metrics["lift"][1:].isna().all()
@@ -0,0 +1,61 @@
+from roughset import RoughSet
+import pandas as pd
+
+
+def test_from_csv_same_as_dataframe():
+    """
+        分批讀取 CSV 的結果需要與讀入整個 DataFrame 相同
+    """
+    feature_col = ['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)']
+    RS = RoughSet(pd.read_csv("Mohapatra.csv"), name_col="Company", feature_col=feature_col, decision_col='Sales(D)')
+    RS_csv = RoughSet.from_csv("Mohapatra.csv", name_col="Company", feature_col=feature_col, decision_col='Sales(D)', chunksize=4)
+    
+    assert RS_csv.df is None
+    assert len(RS_csv) == 23
+    for col in RS.table.columns:
+        assert (RS.table.codes[col] == RS_csv.table.codes[col]).all()
+        assert RS.table.categories[col].equals(RS_csv.table.categories[col])
+    
+    RS.create_reduct_rules()
+    RS_csv.create_reduct_rules()
+    pd.testing.assert_frame_equal(RS.evaluate_metrics(), RS_csv.evaluate_metrics())
+    assert RS.lower_approximation(["Mkt(a1)", "Dist(a3)"], "H") == RS_csv.lower_approximation(["Mkt(a1)", "Dist(a3)"], "H")
+    assert RS.calculate_precent({"Mkt(a1)": "H"}) == RS_csv.calculate_precent({"Mkt(a1)": "H"})
+
+
+def test_from_csv_default_columns():
+    
+    RS = RoughSet.from_csv("example.csv", chunksize=2)
+    assert RS.name_column == "No"
+    assert RS.feature_col == ['天氣', '事故情形', '事故原因']
+    assert RS.decision_col == '損壞部位'
+    assert RS[1]["損壞部位"] == 0
+
+
+def test_save_load_mmap(tmp_path):
+    
+    feature_col = ['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)']
+    target_cols = ["Mkt(a1)", "Dist(a3)"]
+    RS = RoughSet(pd.read_csv("Mohapatra.csv"), name_col="Company", feature_col=feature_col, decision_col='Sales(D)')
+    RS.lower_approximation(target_cols, "H")
+    RS.save(tmp_path / "mohapatra")
+    
+    loaded = RoughSet.load(tmp_path / "mohapatra")
+    assert loaded.df is None
+    assert loaded.feature_col == feature_col
+    for col in RS.table.columns:
+        assert (RS.table.codes[col] == loaded.table.codes[col]).all()
+        assert RS.table.categories[col].equals(loaded.table.categories[col])
+    
+    # 保存的分割直接放回快取
+    for value in ["H", "A", "L"]:
+        assert loaded.lower_approximation(target_cols, value) == RS.lower_approximation(target_cols, value)
+    assert loaded.partitions.misses == 0
+    
+    RS.create_reduct_rules()
+    loaded.create_reduct_rules()
+    pd.testing.assert_frame_equal(RS.evaluate_metrics(), loaded.evaluate_metrics())
+    
+    # 唯讀的 memory map 也可以加入/移除物件
+    loaded.remove_objects(["C1"])
+    assert len(loaded) == 22
@@ -2,6 +2,7 @@
     使用Mohapatra資料測試計算metrics：支持度、信賴度、增益
 """
 from roughset import RoughSet
+import numpy as np
 import pandas as pd
 
 def test_metrics():
@@ -31,4 +32,44 @@ def test_metrics():
     
     expect_rules_with_score = pd.read_pickle("expect/Mohapatra_rules_with_score.pkl")
     
-    pd.testing.assert_frame_equal(rules_with_score, expect_rules_with_score)
\ No newline at end of file
+    pd.testing.assert_frame_equal(rules_with_score, expect_rules_with_score)
+
+def test_metrics_selected():
+    
+    df = pd.read_csv("Mohapatra.csv")
+    
+    RS = RoughSet(
+        data=df,
+        name_col="Company",
+        feature_col=['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)'],
+        decision_col='Sales(D)',
+    )
+    
+    RS.create_reduct_rules(as_ruleset=True)
+    rules_with_score = RS.evaluate_metrics(confidence=False, lift=False)
+    
+    assert "support" in rules_with_score.columns
+    assert "confidence" not in rules_with_score.columns
+    assert "lift" not in rules_with_score.columns
+    
+    expect_rules_with_score = pd.read_pickle("expect/Mohapatra_rules_with_score.pkl")
+    rules_with_score = rules_with_score.drop(columns=['Company']).drop_duplicates()
+    rules_with_score = rules_with_score[rules_with_score['support'] > 0.25]
+    pd.testing.assert_series_equal(rules_with_score['support'], expect_rules_with_score['support'])
+
+def test_metrics_all_missing_feature():
+    
+    # 整欄缺值的特徵沒有任何等價類別，以該特徵為前提的規則符合 0 筆
+    df = pd.DataFrame({'n': ['a', 'b', 'c'], 'f1': [1, 2, 1], 'f2': [np.nan] * 3, 'd': [0, 1, 0]})
+    
+    RS = RoughSet(df)
+    RS.create_reduct_rules(as_ruleset=True)
+    rules_with_score = RS.evaluate_metrics()
+    
+    np.testing.assert_allclose(rules_with_score['support'], [2/3, 0, 1/3, 0, 2/3, 0])
+    assert rules_with_score['confidence'][1::2].isna().all()
+    
+    # 與 DataFrame 規則的結果相同
+    RS = RoughSet(df)
+    RS.create_reduct_rules()
+    pd.testing.assert_frame_equal(rules_with_score, RS.evaluate_metrics())
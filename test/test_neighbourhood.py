@@ -0,0 +1,53 @@
+from roughset import RoughSet
+from roughset.encoding import encode_table
+from roughset.neighbourhood import neighbour_counts, neighbours
+import numpy as np
+import pandas as pd
+
+
+def test_tolerance_relation_with_missing_values():
+    
+    df = pd.DataFrame({
+        "name": ["o1", "o2", "o3", "o4", "o5"],
+        "a": [1, 1, 2, None, 2],
+        "b": ["x", None, "x", "y", "y"],
+        "d": ["Y", "Y", "N", "N", "N"],
+    })
+    RS = RoughSet(df)
+    # 缺值可以與任何值相符
+    assert RS.neighbours("o2", ["a", "b"]) == {"o1", "o2", "o4"}
+    assert RS.neighbours("o4", ["a", "b"]) == {"o2", "o4", "o5"}
+    
+    assert RS.tolerance_lower_approximation(["a", "b"], "Y") == {"o1"}
+    assert RS.tolerance_upper_approximation(["a", "b"], "Y") == {"o1", "o2", "o4"}
+    regions = RS.tolerance_regions(["a", "b"])
+    assert regions["N"]["positive"] == {"o3", "o5"}
+    assert regions["N"]["negative"] == {"o1"}
+    # 數值屬性 a 的 δ 鄰域: |a(x) - a(y)| <= 1
+    assert RS.neighbours("o1", ["a", "b"], delta={"a": 1}) == {"o1", "o2", "o3"}
+
+
+def test_neighbour_counts_same_as_pairwise():
+    
+    rng = np.random.default_rng(0)
+    n = 200
+    df = pd.DataFrame({
+        "c": rng.choice(["a", "b", "c"], n),
+        "x": np.round(rng.normal(size=n), 1),
+        "z": rng.random(n) * 10,
+        "y": rng.choice(["p", "q"], n),
+    })
+    for col in ["c", "x", "z", "y"]:
+        df.loc[rng.random(n) < 0.1, col] = np.nan
+    table = encode_table(df, list(df.columns))
+    decision = table.codes["y"]
+    for attrs, delta in [(["c", "x"], None), (["c", "x"], {"x": 0.3}), (["x", "z", "c"], {"x": 0.2, "z": 1.5})]:
+        counts = neighbour_counts(table, attrs, decision, 2, delta)
+        for row in range(n):
+            found = decision[neighbours(table, attrs, row, delta)]
+            assert counts[row].tolist() == np.bincount(np.where(found < 0, 2, found), minlength=3).tolist()
+    
+    # 沒有缺值與數值屬性時，鄰域就是等價類別
+    RS = RoughSet(pd.read_csv('Mohapatra.csv'))
+    condition = ["Mkt(a1)", "Dist(a3)"]
+    assert RS.tolerance_regions(condition) == RS.regions(condition)
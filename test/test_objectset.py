@@ -0,0 +1,22 @@
+from roughset.objectset import ObjectSet
+import numpy as np
+
+
+def test_objectset_operations():
+    
+    n = 70 # 跨越兩個 uint64
+    a = ObjectSet.from_indices([0, 3, 64, 69], n)
+    b = ObjectSet.from_indices([3, 5, 69], n)
+    
+    assert a.words.dtype == np.uint64 and len(a.words) == 2
+    assert len(a) == 4
+    assert list(a | b) == [0, 3, 5, 64, 69]
+    assert list(a & b) == [3, 69]
+    assert list(a - b) == [0, 64]
+    assert 64 in a and 5 not in a
+    assert (a & b) <= a and not a <= b
+    
+    # 補集不包含論域以外的位元
+    assert len(~a) == n - 4
+    assert ~ObjectSet.empty(n) == ObjectSet.full(n)
+    assert len(ObjectSet.full(n)) == n
@@ -0,0 +1,88 @@
+from roughset import RoughSet, profiling
+from roughset.encoding import encode_table
+from roughset.partition import PartitionCache
+from roughset.relations import get_equivalence_object, get_lower_approximation, get_upper_approximation
+import pandas as pd
+
+
+def test_partition_cache_refine_from_subset():
+    
+    df = pd.read_csv('example.csv')
+    table = encode_table(df, list(df.columns))
+    cache = PartitionCache(table, maxsize=2)
+    
+    weather = cache.get(["天氣"])
+    assert weather.n_classes == 2
+    assert cache.info() == {"hits": 0, "misses": 1, "size": 1, "maxsize": 2}
+    
+    # 從 {天氣} 細分出 {天氣, 事故情形}
+    both = cache.get(["事故情形", "天氣"])
+    assert both.n_classes == 4
+    assert [list(rows) for rows in both.classes()] == [[0, 3], [1], [2], [4]]
+    
+    # 屬性順序不影響快取的鍵
+    assert cache.get(["天氣", "事故情形"]) is both
+    assert cache.hits == 1
+    
+    # 超過上限時移除最久沒有使用的分割
+    cache.get(["事故原因"])
+    assert ["天氣"] not in cache
+    assert ["天氣", "事故情形"] in cache
+    
+    
+def test_roughset_uses_partition_cache():
+    
+    df = pd.read_csv('Mohapatra.csv')
+    RS = RoughSet(
+        data=df,
+        name_col="Company",
+        feature_col=['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)'],
+        decision_col='Sales(D)',
+    )
+    target_cols = ["Mkt(a1)", "Dist(a3)"]
+    
+    assert RS.equivalence_classes(target_cols) == get_equivalence_object(df, "Company", target_cols)
+    for value in ["H", "A", "L"]:
+        assert RS.lower_approximation(target_cols, value) == get_lower_approximation(df, "Company", target_cols, "Sales(D)", value)
+        assert RS.upper_approximation(target_cols, value) == get_upper_approximation(df, "Company", target_cols, "Sales(D)", value)
+    
+    # 只有第一次需要計算分割
+    assert RS.partitions.misses == 1
+    assert RS.partitions.hits == 6
+
+
+def test_roughset_add_remove_objects():
+    
+    df = pd.read_csv('Mohapatra.csv')
+    feature_col = ['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)']
+    target_cols = ["Mkt(a1)", "Dist(a3)"]
+    RS = RoughSet(df.iloc[:15], name_col="Company", feature_col=feature_col, decision_col='Sales(D)')
+    RS.create_reduct_rules()
+    RS.evaluate_metrics()
+    RS.lower_approximation(target_cols, "H")
+    
+    # 分批加入剩下的物件，再移除其中幾個
+    RS.add_objects(df.iloc[15:20])
+    RS.add_objects(df.iloc[20:])
+    RS.remove_objects(["C2", "C10", "C21"])
+    expected_df = df[~df["Company"].isin(["C2", "C10", "C21"])].reset_index(drop=True)
+    expected = RoughSet(expected_df, name_col="Company", feature_col=feature_col, decision_col='Sales(D)')
+    expected.create_reduct_rules()
+    
+    pd.testing.assert_frame_equal(RS.reduct_rules, expected.evaluate_metrics())
+    # target_cols 的分割在加入/移除物件時被更新，不需要重新計算
+    misses = RS.partitions.misses
+    for value in ["H", "A", "L"]:
+        assert RS.lower_approximation(target_cols, value) == expected.lower_approximation(target_cols, value)
+        assert RS.upper_approximation(target_cols, value) == expected.upper_approximation(target_cols, value)
+    assert RS.equivalence_classes(target_cols) == expected.equivalence_classes(target_cols)
+    assert RS.partitions.misses == misses
+    
+    # 再次移除物件時，指標由分割維護的 decision_counts 查表，不重新計算
+    with profiling.profile() as profiler:
+        RS.remove_objects(["C23"])
+    assert profiler.counters.get("partition.decision_counts", 0) == 0
+    assert "RoughSet.evaluate_metrics" not in profiler.to_dict()["stages"]
+    expected = RoughSet(expected_df[expected_df["Company"] != "C23"].reset_index(drop=True), name_col="Company", feature_col=feature_col, decision_col='Sales(D)')
+    expected.create_reduct_rules()
+    pd.testing.assert_frame_equal(RS.reduct_rules, expected.evaluate_metrics())
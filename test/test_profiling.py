@@ -0,0 +1,44 @@
+from roughset import RoughSet, profiling
+from roughset.relations import get_lower_approximation
+import pandas as pd
+import threading
+
+
+def test_profile_stages_and_counters():
+    
+    df = pd.read_csv('Mohapatra.csv')
+    feature_col = ['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)']
+    with profiling.profile() as profiler:
+        RS = RoughSet(df, name_col="Company", feature_col=feature_col, decision_col='Sales(D)')
+        RS.create_reduct_rules()
+        RS.evaluate_metrics()
+        get_lower_approximation(df, "Company", ["Mkt(a1)"], "Sales(D)", "H")
+        get_lower_approximation(df, "Company", ["Mkt(a1)"], "Sales(D)", "L")
+    
+    stages = profiler.to_dict()["stages"]
+    assert stages["RoughSet.create_reduct_rules"]["calls"] == 1
+    assert stages["relations.get_lower_approximation"]["calls"] == 2
+    assert stages["encoding.encode_table"]["rows"] == 3 * len(df)
+    assert profiler.counters["partition.misses"] == stages["partition.compute"]["calls"]
+    assert list(profiler.to_frame().columns) == ["calls", "seconds", "rows"]
+    
+    # 離開 with 之後不再記錄
+    RS.create_reduct_rules()
+    assert profiler.to_dict()["stages"]["RoughSet.create_reduct_rules"]["calls"] == 1
+
+
+def test_profile_ignores_other_threads():
+    
+    # 其他執行緒(例如另一個 Streamlit session)的工作不會被記錄
+    df = pd.read_csv('Mohapatra.csv')
+    feature_col = ['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)']
+    RS = RoughSet(df, name_col="Company", feature_col=feature_col, decision_col='Sales(D)')
+    with profiling.profile() as profiler:
+        thread = threading.Thread(target=lambda: RoughSet(df, name_col="Company").create_reduct_rules())
+        thread.start()
+        thread.join()
+        assert profiler.to_dict() == {"stages": {}, "counters": {}}
+        
+        # 執行緒池的工作在呼叫者的 context 中執行，仍然會被記錄
+        RS.dependency_degrees([["Mkt(a1)"], ["Dist(a3)"]], n_jobs=2, backend="thread")
+    assert profiler.counters["partition.misses"] == 2
@@ -0,0 +1,78 @@
+from roughset import CancelToken, Cancelled, RoughSet
+from roughset.evaluate import evaluate_rules
+from itertools import combinations
+import numpy as np
+import pandas as pd
+import pytest
+import threading
+import time
+
+
+def _mohapatra():
+    df = pd.read_csv('Mohapatra.csv')
+    RS = RoughSet(df, name_col="Company", feature_col=['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)'], decision_col='Sales(D)')
+    return df, RS
+
+
+@pytest.mark.parametrize("minimal", [False, True])
+def test_progress_reaches_total(minimal):
+    
+    df, RS = _mohapatra()
+    events = []
+    RS.create_reduct_rules(minimal=minimal, progress=lambda *event: events.append(event))
+    assert {stage for stage, _, _ in events} == {"reduct"}
+    assert [done for _, done, _ in events] == sorted(done for _, done, _ in events)
+    assert events[-1][1] == events[-1][2]
+    
+    events.clear()
+    RS.evaluate_metrics(progress=lambda *event: events.append(event))
+    assert events[-1] == ("metrics", 3 * len(RS.rule_set), 3 * len(RS.rule_set))
+    
+    events.clear()
+    evaluate_rules(RS.reduct_rules, df, "Company", RS.feature_col, RS.decision_col, progress=lambda *event: events.append(event))
+    assert events[-1][1] == events[-1][2] == 3 * len(RS.reduct_rules)
+
+
+def test_cancel_keeps_previous_rules():
+    
+    df, RS = _mohapatra()
+    rules = RS.create_reduct_rules()
+    token = CancelToken()
+    
+    def cancel_after_first(stage, done, total):
+        token.cancel()
+    
+    with pytest.raises(Cancelled):
+        RS.create_reduct_rules(minimal=True, progress=cancel_after_first, cancel=token)
+    pd.testing.assert_frame_equal(RS.reduct_rules, rules)
+    
+    with pytest.raises(Cancelled):
+        RS.evaluate_metrics(cancel=token)
+    assert "support" not in RS.reduct_rules.columns
+    
+    token.reset()
+    assert "support" in RS.evaluate_metrics(cancel=token).columns
+
+
+@pytest.mark.parametrize("method", ["reduct", "thread", "process"])
+def test_cancel_parallel_mid_run(method):
+    
+    # 每個區塊需要數秒，取消後不應等待執行中的區塊完成
+    rng = np.random.default_rng(0)
+    n = 100_000
+    df = pd.DataFrame({f"f{i}": rng.integers(0, 4, n) for i in range(10)})
+    df["d"] = rng.integers(0, 2, n)
+    df["name"] = range(n)
+    RS = RoughSet(df, name_col="name", feature_col=[f"f{i}" for i in range(10)], decision_col="d")
+    token = CancelToken()
+    timer = threading.Timer(0.2, token.cancel)
+    
+    start = time.perf_counter()
+    timer.start()
+    with pytest.raises(Cancelled):
+        if method == "reduct":
+            RS.create_reduct_rules(n_jobs=2, cancel=token)
+        else:
+            subsets = [list(subset) for size in (3, 4) for subset in combinations(RS.feature_col, size)]
+            RS.dependency_degrees(subsets, n_jobs=2, backend=method, cancel=token)
+    assert time.perf_counter() - start < 1.5
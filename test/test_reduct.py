@@ -1,5 +1,7 @@
 #%%
-from roughset.reduct import create_reduct_rules
+from roughset.reduct import create_reduct_rules, create_decision_dict, create_reduct_dict_by_row, filter_reduct_dict_by_row, create_reduct_rules_by_row
+from roughset import RoughSet
+import numpy as np
 import pandas as pd
 
 def test_reduct_with_none():
@@ -33,4 +35,150 @@ def test_reduct_without_none():
     expect_reducts = pd.read_pickle("expect/example_reducts_without_none.pkl")
     
     pd.testing.assert_frame_equal(reducts, expect_reducts)
-    
\ No newline at end of file
+    
+def test_reduct_same_as_row_by_row():
+    
+    df = pd.read_csv('Mohapatra.csv')
+    name_col = "Company"
+    feature_col = ['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)']
+    decision_col = 'Sales(D)'
+    columns = [name_col] + feature_col + [decision_col]
+    
+    # 逐列計算的結果
+    decision_dict = create_decision_dict(df, name_col, decision_col)
+    expect_reducts = pd.DataFrame(columns=columns)
+    for index, row in df.iterrows():
+        reduct_dict = create_reduct_dict_by_row(df, row, name_col, feature_col)
+        reduct_result = filter_reduct_dict_by_row(row, name_col, decision_dict, reduct_dict)
+        row_rules = create_reduct_rules_by_row(df, row, columns, name_col, decision_col, reduct_result, True)
+        expect_reducts = pd.concat([expect_reducts, row_rules], ignore_index=True)
+    
+    reducts = create_reduct_rules(df, name_col, feature_col, decision_col, include_empty=True)
+    
+    pd.testing.assert_frame_equal(reducts, expect_reducts)
+
+def test_reduct_minimal():
+    
+    df = pd.read_csv('example.csv')
+    
+    reducts = create_reduct_rules(
+        df=df,
+        name_col="No",
+        feature_col=['天氣', '事故情形', '事故原因'],
+        decision_col='損壞部位',
+        include_empty=False,
+        minimal=True # 只保留最小的規則
+    )
+    
+    # 從所有規則中移除含有更小一致子組合的規則
+    expect_reducts = pd.read_pickle("expect/example_reducts_without_none.pkl")
+    expect_reducts = expect_reducts.iloc[[0, 3, 5, 7, 8]].reset_index(drop=True)
+    
+    pd.testing.assert_frame_equal(reducts, expect_reducts)
+    assert reducts.attrs["skipped_candidates"] == 4
+
+def test_reduct_compress():
+    
+    df = pd.read_csv('Mohapatra.csv')
+    feature_col = ['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)']
+    
+    reducts = create_reduct_rules(df, "Company", feature_col, 'Sales(D)')
+    compressed = create_reduct_rules(df, "Company", feature_col, 'Sales(D)', compress=True)
+    
+    # 23 個物件只有 6 種不同的(特徵, 決策)向量
+    assert compressed["count"].sum() == len(reducts) == 393
+    assert compressed["Company"][0] == ['C1', 'C3', 'C4', 'C5', 'C6', 'C8', 'C11', 'C12', 'C14', 'C16', 'C17', 'C18', 'C20', 'C21', 'C22', 'C23']
+    
+    # 展開後與逐一物件計算的規則相同
+    expanded = compressed.explode("Company").drop(columns=["count"])
+    expanded = expanded.sort_values("Company", key=lambda x: x.str[1:].astype(int), kind="stable").reset_index(drop=True)
+    pd.testing.assert_frame_equal(expanded, reducts)
+
+def test_reduct_ruleset():
+    
+    df = pd.read_csv('example.csv')
+    
+    rule_set = create_reduct_rules(
+        df=df,
+        name_col="No",
+        feature_col=['天氣', '事故情形', '事故原因'],
+        decision_col='損壞部位',
+        include_empty=True,
+        as_ruleset=True # 以整數編碼儲存的規則
+    )
+    
+    assert len(rule_set) == 11
+    assert rule_set.antecedents.sum() == 16
+    
+    expect_reducts = pd.read_pickle("expect/example_reducts_with_none.pkl")
+    
+    pd.testing.assert_frame_equal(rule_set.to_frame(), expect_reducts)
+
+def test_reduct_minimize():
+    
+    df = pd.read_csv('Mohapatra.csv')
+    feature_col = ['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)']
+    rule_set = create_reduct_rules(df, "Company", feature_col, 'Sales(D)', as_ruleset=True)
+    
+    # 合併相同的規則並移除被涵蓋的規則後，與不重複的最小規則相同
+    minimized = rule_set.minimize().to_frame()
+    minimal = create_reduct_rules(df, "Company", feature_col, 'Sales(D)', minimal=True)
+    minimal = minimal[feature_col + ['Sales(D)']].drop_duplicates().reset_index(drop=True)
+    pd.testing.assert_frame_equal(minimized[feature_col + ['Sales(D)']], minimal)
+    assert rule_set.minimize(subsume=False).counts.sum() == 393
+    assert minimized.attrs["merged_rules"] + minimized.attrs["subsumed_rules"] == 393 - 11
+    
+    # greedy set cover: 3 條規則涵蓋正域
+    covered = rule_set.minimize(cover=True).to_frame()
+    assert len(covered) == 3
+    assert sorted(sum(covered["Company"], [])) == sorted(['C1', 'C3', 'C4', 'C5', 'C6', 'C8', 'C9', 'C10', 'C11', 'C12', 'C13', 
+                                                          'C14', 'C16', 'C17', 'C18', 'C20', 'C21', 'C22', 'C23'])
+
+def test_reduct_cover_after_add_remove():
+    
+    # 移除物件後分割的類別會重新編號，greedy set cover 的結果需要與重新建立的 RoughSet 相同
+    for seed in range(12):
+        rng = np.random.default_rng(seed)
+        df = pd.DataFrame({"name": [f"o{i}" for i in range(30)], "d": rng.integers(0, 2, 30),
+                           **{f"f{j}": rng.integers(0, 3, 30) for j in range(3)}})
+        df = df[["name", "f0", "f1", "f2", "d"]]
+        RS = RoughSet(df.iloc[:25])
+        RS.create_reduct_rules(minimize=True, cover=True)
+        RS.add_objects(df.iloc[25:])
+        removed = list(rng.choice(df["name"], 8, replace=False))
+        RS.remove_objects(removed)
+        
+        expected = RoughSet(df[~df["name"].isin(removed)].reset_index(drop=True))
+        expected.create_reduct_rules(minimize=True, cover=True)
+        pd.testing.assert_frame_equal(RS.reduct_rules, expected.reduct_rules)
+
+def test_reduct_parallel():
+    
+    df = pd.read_csv('Mohapatra.csv')
+    feature_col = ['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)']
+    
+    # 多行程的結果(包含順序)需要與單一行程相同
+    for minimal in [False, True]:
+        reducts = create_reduct_rules(df, "Company", feature_col, 'Sales(D)', include_empty=True, minimal=minimal)
+        reducts_parallel = create_reduct_rules(df, "Company", feature_col, 'Sales(D)', include_empty=True, minimal=minimal, n_jobs=2)
+        pd.testing.assert_frame_equal(reducts, reducts_parallel)
+        assert reducts.attrs == reducts_parallel.attrs
+
+def test_reduct_all_missing_feature():
+    
+    # 整欄缺值的特徵沒有任何等價類別，結果需要與逐列計算相同
+    df = pd.DataFrame({'n': ['a', 'b', 'c'], 'f1': [1, 2, 1], 'f2': [np.nan] * 3, 'd': [0, 1, 0]})
+    columns = ['n', 'f1', 'f2', 'd']
+    
+    decision_dict = create_decision_dict(df, 'n', 'd')
+    expect_reducts = pd.DataFrame(columns=columns)
+    for index, row in df.iterrows():
+        reduct_dict = create_reduct_dict_by_row(df, row, 'n', ['f1', 'f2'])
+        reduct_result = filter_reduct_dict_by_row(row, 'n', decision_dict, reduct_dict)
+        row_rules = create_reduct_rules_by_row(df, row, columns, 'n', 'd', reduct_result, False)
+        expect_reducts = pd.concat([expect_reducts, row_rules], ignore_index=True)
+    
+    reducts = create_reduct_rules(df, 'n', ['f1', 'f2'], 'd')
+    
+    pd.testing.assert_frame_equal(reducts, expect_reducts)
+    assert len(reducts) == 6
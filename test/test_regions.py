@@ -0,0 +1,164 @@
+from roughset import RoughSet
+import numpy as np
+import pandas as pd
+from numpy.testing import assert_allclose
+
+
+def create_mohapatra_roughset():
+    df = pd.read_csv('Mohapatra.csv')
+    return RoughSet(
+        data=df,
+        name_col="Company",
+        feature_col=['Mkt(a1)', 'Advt(a2)', 'Dist(a3)', 'Misc(a4)', 'R&D(a5)'],
+        decision_col='Sales(D)',
+    )
+
+
+def test_regions_example2():
+    """
+        以範例2測試 regions
+        參考值來自於 《大數據分析與資料挖礦》 p.135
+    """
+    
+    RS = create_mohapatra_roughset()
+    condition = ["Mkt(a1)", "Dist(a3)"]
+    regions = RS.regions(condition)
+    
+    assert regions["H"]["positive"] == {'C10'}
+    assert regions["H"]["boundary"] == {'C15', 'C19', 'C2', 'C7'}
+    assert regions["A"]["positive"] == set()
+    assert regions["A"]["boundary"] == {'C15', 'C19', 'C2', 'C7'}
+    assert regions["L"]["boundary"] == set()
+    assert regions["L"]["negative"] == {'C10', 'C15', 'C19', 'C2', 'C7'}
+    
+    # 單一決策值的結果與 regions 相同
+    for value in ["H", "A", "L"]:
+        assert RS.positive_region(condition, value) == regions[value]["positive"]
+        assert RS.boundary_region(condition, value) == regions[value]["boundary"]
+        assert RS.negative_region(condition, value) == regions[value]["negative"]
+    
+    
+def test_positive_region_all_decisions():
+    
+    RS = create_mohapatra_roughset()
+    condition = ["Mkt(a1)", "Dist(a3)"]
+    
+    assert RS.positive_region(condition) == RS.lower_approximation(condition, "H") | RS.lower_approximation(condition, "L")
+    assert RS.boundary_region(condition) == {'C15', 'C19', 'C2', 'C7'}
+    assert RS.negative_region(condition) == set()
+    assert_allclose(RS.dependency_degree(condition), 19 / 23)
+    assert_allclose(RS.dependency_degree(RS.feature_col), 19 / 23)
+
+
+def test_reduct_quick_and_exact():
+    
+    RS = create_mohapatra_roughset()
+    
+    assert RS.reduct() == ["Mkt(a1)", "Dist(a3)"]
+    assert RS.reduct(method="exact") == ["Mkt(a1)", "Dist(a3)"]
+    assert RS.reduct(["Advt(a2)", "Misc(a4)", "R&D(a5)"]) == ["Advt(a2)", "Misc(a4)"]
+
+
+def test_reduct_with_missing_values():
+    
+    # 有缺值的物件不屬於任何類別，POS_B(D) 不一定包含於 POS_C(D)，約簡需要保留相同的正域，而不只是相同的數量
+    rng = np.random.default_rng(0)
+    n = 20
+    df = pd.DataFrame({"name": range(n), **{f"f{j}": rng.integers(0, 3, n).astype(float) for j in range(4)},
+                       "d": rng.integers(0, 2, n)})
+    for j in range(4):
+        df.loc[rng.random(n) < 0.2, f"f{j}"] = np.nan
+    RS = RoughSet(df)
+    features = ["f0", "f1", "f2", "f3"]
+    full = RS.positive_region(features)
+    # {f0, f1} 的正域數量與 POS_C(D) 相同，但物件不同
+    assert len(RS.positive_region(["f0", "f1"])) == len(full)
+    assert RS.positive_region(["f0", "f1"]) != full
+    
+    for method in ["quick", "exact"]:
+        assert RS.positive_region(RS.reduct(method=method)) == full
+    assert RS.reduct(method="exact") == ["f0", "f2", "f3"]
+
+
+def test_core_and_reducts_from_discernibility():
+    
+    RS = create_mohapatra_roughset()
+    discernibility = RS.discernibility()
+    
+    # 吸收律後只剩兩個子句
+    assert discernibility.to_sets() == [{'Mkt(a1)', 'Advt(a2)'}, {'Dist(a3)', 'Misc(a4)', 'R&D(a5)'}]
+    assert RS.core() == []
+    assert RS.reducts() == [
+        ['Mkt(a1)', 'Dist(a3)'], ['Mkt(a1)', 'Misc(a4)'], ['Mkt(a1)', 'R&D(a5)'],
+        ['Advt(a2)', 'Dist(a3)'], ['Advt(a2)', 'Misc(a4)'], ['Advt(a2)', 'R&D(a5)'],
+    ]
+    assert RS.reduct(method="exact") in RS.reducts()
+    
+    
+def test_core_example1():
+    
+    df = pd.read_csv('example.csv')
+    RS = RoughSet(df, "No", ['天氣', '事故情形', '事故原因'], '損壞部位')
+    
+    assert RS.discernibility().to_sets() == [{'事故情形'}, {'天氣', '事故原因'}]
+    assert RS.core() == ['事故情形']
+    assert RS.reducts() == [['天氣', '事故情形'], ['事故情形', '事故原因']]
+
+
+def test_dependency_degrees():
+    
+    RS = create_mohapatra_roughset()
+    subsets = [["Mkt(a1)"], ["Mkt(a1)", "Dist(a3)"], ['Advt(a2)', 'Misc(a4)', 'R&D(a5)'], []]
+    degrees = RS.dependency_degrees(subsets)
+    
+    assert list(degrees.columns) == ["subset", "size", "n_classes", "positive", "dependency"]
+    assert degrees["subset"][1] == ("Mkt(a1)", "Dist(a3)")
+    assert list(degrees["size"]) == [1, 2, 3, 0]
+    for subset, dependency in zip(subsets, degrees["dependency"]):
+        assert_allclose(dependency, RS.dependency_degree(subset))
+    
+    # 平行計算的結果與順序不變
+    pd.testing.assert_frame_equal(degrees, RS.dependency_degrees(subsets, n_jobs=2))
+    pd.testing.assert_frame_equal(degrees, RS.dependency_degrees(subsets, n_jobs=2, backend="thread"))
+
+
+def test_variable_precision_regions():
+    
+    RS = create_mohapatra_roughset()
+    condition = ["Mkt(a1)"]
+    # {C1, C3, ..., C23} 共 17 個物件，只有 C17 的決策值為 H
+    assert RS.lower_approximation(condition, "L") == {"C9", "C13"}
+    assert len(RS.lower_approximation(condition, "L", beta=0.9)) == 19
+    assert "C17" in RS.upper_approximation(condition, "H")
+    assert RS.upper_approximation(condition, "H", beta=0.9) == {"C2", "C7", "C15", "C19"}
+    assert RS.regions(condition, beta=0.9)["H"]["boundary"] == {"C2", "C7", "C15", "C19"}
+    
+    sizes = RS.region_sizes(condition, [0.6, 0.9, 0.95, 1.0])
+    assert sizes["positive"].tolist() == [19, 19, 2, 2]
+    assert sizes["boundary"].tolist() == [4, 4, 21, 21]
+    assert (sizes["positive"] + sizes["boundary"] + sizes["negative"] == 23).all()
+    assert_allclose(sizes["dependency"], [RS.dependency_degree(condition, beta) for beta in [0.6, 0.9, 0.95, 1.0]])
+
+
+def test_vprs_beta_boundary():
+    
+    # 類別 x 有 10 個物件，其中 7 個為 Y；類別 z 有 10 個物件，其中 3 個為 Y
+    df = pd.DataFrame({
+        "name": [f"o{i}" for i in range(20)],
+        "a": ["x"] * 10 + ["z"] * 10,
+        "d": ["Y"] * 7 + ["N"] * 3 + ["Y"] * 3 + ["N"] * 7,
+    })
+    RS = RoughSet(df)
+    x, z = set(df["name"][:10]), set(df["name"][10:])
+    # 比例剛好等於 β 時在下近似中，β 由計算得到(0.1 * 7 = 0.7000000000000001)時亦同
+    for beta in [0.7, 0.1 * 7, 7 / 10]:
+        assert RS.lower_approximation(["a"], "Y", beta=beta) == x
+        # z 中不屬於 Y 的比例剛好等於 β，不在上近似中
+        assert RS.upper_approximation(["a"], "Y", beta=beta) == x
+        assert RS.region_sizes(["a"], [beta], "Y")["positive"].tolist() == [10]
+        assert RS.region_sizes(["a"], [beta], "Y")["boundary"].tolist() == [0]
+        assert RS.contingency(["a"]).approximation_sizes("Y", beta=beta) == (10, 10)
+    # β 稍大於 7/10 時不在下近似中，z 進入上近似
+    assert RS.lower_approximation(["a"], "Y", beta=0.71) == set()
+    assert RS.upper_approximation(["a"], "Y", beta=0.71) == x | z
+    assert RS.contingency(["a"]).approximation_sizes("Y", beta=0.71) == (0, 20)